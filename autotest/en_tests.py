@@ -586,6 +586,373 @@ def mixed_par_draw_test():
     assert pst.npar == npar
 
 
+def float32_draw_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    pst = pyemu.Pst(os.path.join("en","pest.pst"))
+    cov = pyemu.Cov.from_parameter_data(pst)
+    cov = pyemu.Cov(x=cov.as_2d,names=cov.names)
+    cov.to_coo(os.path.join("temp","cov64.jcb"))
+    cov = pyemu.Cov.from_binary(os.path.join("temp","cov64.jcb"),dtype=np.float32)
+    assert cov.dtype == np.float32
+    for factor in ["eigen","cholesky","svd"]:
+        pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst,cov=cov,num_reals=10,
+                                                        factor=factor,dtype=np.float32)
+        assert all([dt == np.float32 for dt in pe._df.dtypes])
+    oe = pyemu.ObservationEnsemble.from_gaussian_draw(pst,num_reals=10,fill=True,
+                                                      dtype=np.float32)
+    assert all([dt == np.float32 for dt in oe._df.dtypes])
+
+    pe.to_csv(os.path.join("temp","pe32.csv"))
+    pe_csv = pyemu.ParameterEnsemble.from_csv(pst,os.path.join("temp","pe32.csv"),
+                                              dtype=np.float32)
+    assert all([dt == np.float32 for dt in pe_csv._df.dtypes])
+    assert list(pe_csv.index) == list(pe.index)
+    pe.to_binary(os.path.join("temp","pe32.jcb"))
+    pe_bin = pyemu.ParameterEnsemble.from_binary(pst,os.path.join("temp","pe32.jcb"),
+                                                 dtype=np.float32)
+    assert all([dt == np.float32 for dt in pe_bin._df.dtypes])
+    assert np.allclose(pe_bin._df.values,pe._df.values)
+    pe64 = pe.astype(np.float64)
+    assert isinstance(pe64,pyemu.ParameterEnsemble)
+    assert all([dt == np.float64 for dt in pe64._df.dtypes])
+
+
+def batched_gaussian_draw_test():
+    import numpy as np
+    import pandas as pd
+    import pyemu
+
+    np.random.seed(6)
+    n, num_reals = 12, 25
+    names = ["p{0}".format(i) for i in range(n)]
+    x = np.random.random((n, n))
+    cov = pyemu.Cov(x=np.dot(x, x.T) + np.identity(n), names=names)
+    mean_values = pd.Series(np.arange(n + 2, dtype=float),
+                            index=names + ["fixed1", "fixed2"])
+    grouper = {"g1": names[:5], "g2": names[5:6], "g3": names[6:][::-1]}
+
+    def reference(grouper, factor):
+        # the per-realization loop
+        np.random.seed(1)
+        reals = np.zeros((num_reals, mean_values.shape[0]))
+        reals[:, :] = mean_values.values[None, :]
+        groups = grouper if grouper is not None else {"all": names}
+        for names_grp in groups.values():
+            idxs = [list(mean_values.index).index(name) for name in names_grp]
+            snv = np.random.randn(num_reals, len(names_grp))
+            cov_grp = cov.get(names_grp)
+            if factor == "cholesky":
+                a = np.linalg.cholesky(cov_grp.as_2d)
+            elif len(names_grp) == 1:
+                a = np.sqrt(cov_grp.x)
+            else:
+                a, i = pyemu.Ensemble._get_svd_projection_matrix(cov_grp.as_2d)
+                snv[:, i:] = 0.0
+            for i in range(num_reals):
+                reals[i, idxs] = mean_values.loc[names_grp].values + np.dot(a, snv[i, :])
+        return reals
+
+    memory, workers = pyemu.Ensemble.draw_memory, pyemu.Ensemble.draw_workers
+    try:
+        # force several chunks per draw
+        pyemu.Ensemble.draw_memory = 8 * n * 4
+        for grp in [None, grouper]:
+            for factor in ["cholesky", "svd"]:
+                expected = reference(grp, factor)
+                for num_workers in [1, 3]:
+                    pyemu.Ensemble.draw_workers = num_workers
+                    np.random.seed(1)
+                    df = pyemu.Ensemble._gaussian_draw(cov, mean_values, num_reals,
+                                                       grouper=grp, fill=True,
+                                                       factor=factor)
+                    assert list(df.columns) == list(mean_values.index)
+                    assert np.allclose(df.values, expected)
+    finally:
+        pyemu.Ensemble.draw_memory, pyemu.Ensemble.draw_workers = memory, workers
+
+
+def projection_cache_test():
+    import os
+    import shutil
+    import numpy as np
+    import pandas as pd
+    import pyemu
+
+    np.random.seed(7)
+    n, num_reals = 10, 20
+    names = ["p{0}".format(i) for i in range(n)]
+    x = np.random.random((n, n))
+    x = np.dot(x, x.T) + np.identity(n)
+    mean_values = pd.Series(np.zeros(n), index=names)
+    grouper = {"g1": names[:4], "g2": names[4:]}
+
+    calls = []
+    orig_svd = pyemu.Ensemble._get_svd_projection_matrix
+    orig_eigen = pyemu.Ensemble._get_eigen_projection_matrix
+
+    def counted(func):
+        def wrapper(*args, **kwargs):
+            calls.append(func)
+            return func(*args, **kwargs)
+        return staticmethod(wrapper)
+
+    def draw(factor, grp=None):
+        np.random.seed(1)
+        cov = pyemu.Cov(x=x.copy(), names=names)
+        return pyemu.Ensemble._gaussian_draw(cov, mean_values, num_reals,
+                                             grouper=grp, factor=factor).values
+
+    cache_dir = os.path.join("temp", "projection_cache")
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+    os.makedirs(cache_dir)
+    pyemu.Ensemble._get_svd_projection_matrix = counted(orig_svd)
+    pyemu.Ensemble._get_eigen_projection_matrix = counted(orig_eigen)
+    try:
+        pyemu.Ensemble.clear_projection_cache()
+        first = draw("svd")
+        assert len(calls) == 1
+        # a new, equal Cov reuses the projection matrix
+        assert np.allclose(draw("svd"), first)
+        assert len(calls) == 1
+        grouped = draw("eigen", grouper)
+        assert len(calls) == 3
+        assert np.allclose(draw("eigen", grouper), grouped)
+        assert len(calls) == 3
+
+        # without the cache
+        pyemu.Ensemble.projection_cache_size = 0
+        assert np.allclose(draw("svd"), first)
+        assert len(calls) == 4
+        pyemu.Ensemble.projection_cache_size = 16
+
+        # bounded by bytes: the svd factor (n x n) does not fit
+        pyemu.Ensemble.clear_projection_cache()
+        pyemu.Ensemble.projection_cache_bytes = 8 * n * n - 1
+        draw("svd")
+        assert len(calls) == 5 and len(pyemu.Ensemble._projection_cache) == 0
+        # both group factors fit, but not together
+        pyemu.Ensemble.projection_cache_bytes = 8 * (6 * 6 + 4 * 4) - 1
+        draw("eigen", grouper)
+        assert len(calls) == 7 and len(pyemu.Ensemble._projection_cache) == 1
+        pyemu.Ensemble.projection_cache_bytes = 2**30
+
+        # persisted to disk
+        pyemu.Matrix.factor_cache = cache_dir
+        pyemu.Ensemble.clear_projection_cache()
+        draw("svd")
+        assert len(calls) == 8
+        assert len([f for f in os.listdir(cache_dir) if f.endswith("svd_projection.npz")]) == 1
+        pyemu.Ensemble.clear_projection_cache()
+        assert np.allclose(draw("svd"), first)
+        assert len(calls) == 8
+    finally:
+        pyemu.Ensemble._get_svd_projection_matrix = staticmethod(orig_svd)
+        pyemu.Ensemble._get_eigen_projection_matrix = staticmethod(orig_eigen)
+        pyemu.Ensemble.projection_cache_size = 16
+        pyemu.Ensemble.projection_cache_bytes = 2**30
+        pyemu.Matrix.factor_cache = False
+        pyemu.Ensemble.clear_projection_cache()
+
+
+def draw_chunks_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+
+    pst = pyemu.Pst(os.path.join("en", "pest.pst"))
+    num_reals, chunk = 23, 10
+    for how in ["gaussian", "uniform", "triangular"]:
+        np.random.seed(1)
+        blocks = list(pyemu.ParameterEnsemble.draw_chunks(pst, num_reals=num_reals,
+                                                          chunk=chunk, how=how))
+        assert [b.shape[0] for b in blocks] == [10, 10, 3]
+        df = pd.concat([b._df for b in blocks])
+        assert list(df.index) == list(range(num_reals))
+        assert all([list(b.columns) == list(df.columns) for b in blocks])
+
+        for ext in ["csv", "jcb"]:
+            fname = os.path.join("temp", "chunks.{0}".format(ext))
+            np.random.seed(1)
+            pyemu.ParameterEnsemble.draw_to_file(pst, fname, num_reals=num_reals,
+                                                 chunk=chunk, how=how)
+            if ext == "csv":
+                pe = pyemu.ParameterEnsemble.from_csv(pst, fname)
+            else:
+                pe = pyemu.ParameterEnsemble.from_binary(pst, fname)
+            assert pe.shape == df.shape
+            assert list(pe.columns) == list(df.columns)
+            assert np.allclose(pe._df.values, df.values)
+
+    how_dict = {p: "uniform" for p in pst.adj_par_names[:2]}
+    blocks = list(pyemu.ParameterEnsemble.draw_chunks(pst, num_reals=num_reals,
+                                                      chunk=chunk, how="mixed",
+                                                      how_dict=how_dict))
+    assert sum([b.shape[0] for b in blocks]) == num_reals
+
+
+def ensemble_binary_io_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+
+    np.random.seed(8)
+    nreal, npar = 37, 11
+    x = np.random.random((nreal, npar))
+    x[x < 0.2] = 0.0
+    df = pd.DataFrame(x, index=np.arange(nreal),
+                      columns=["PAR{0}".format(i) for i in range(npar)])
+    pe = pyemu.ParameterEnsemble(pst=None, df=df)
+    fname = os.path.join("temp", "pe_io.jcb")
+    chunk = pyemu.Ensemble.binary_chunk
+    try:
+        # several blocks of rows
+        pyemu.Ensemble.binary_chunk = 5 * npar
+        pe.to_binary(fname)
+    finally:
+        pyemu.Ensemble.binary_chunk = chunk
+    new = pyemu.ParameterEnsemble.from_binary(None, fname)
+    assert list(new.columns) == [c.lower() for c in df.columns]
+    assert list(new.index) == [str(i) for i in range(nreal)]
+    assert np.allclose(new._df.values, x)
+    # the same file as the Matrix path
+    mat = pyemu.Matrix.from_binary(fname)
+    assert np.allclose(mat.x, x)
+
+    fname = os.path.join("temp", "pe_io.npz")
+    for values in [x, np.asfortranarray(x)]:
+        pe = pyemu.ParameterEnsemble(pst=None, df=pd.DataFrame(values, columns=df.columns))
+        pe.to_npz(fname)
+        new = pyemu.ParameterEnsemble.from_npz(None, fname, mmap=True)
+        assert np.allclose(new._df.values, x)
+        assert not new._df.values.flags.owndata
+        # copy-on-write: edits are not written to the file
+        new._df.iloc[0, 0] = -999.0
+        again = pyemu.ParameterEnsemble.from_npz(None, fname)
+        assert np.allclose(again._df.values, x)
+        part = pyemu.ParameterEnsemble.from_npz(None, fname, real_names=["3", "1"],
+                                                names=["par2"], mmap=True)
+        assert np.allclose(part._df.values[:, 0], x[[3, 1], 2])
+
+
+def enforce_vectorized_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    pst = pyemu.Pst(os.path.join("pst", "pest.pst"))
+    par = pst.parameter_data
+    np.random.seed(4)
+    num_reals = 20
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=num_reals)
+    # columns not in control file order
+    names = list(np.random.permutation(pst.par_names))
+    pe._df = pe._df.loc[:, names]
+    pe._df.iloc[::3, :] += (par.parubnd - par.parlbnd).loc[names].values
+    pe._df.iloc[1::3, :] -= (par.parubnd - par.parlbnd).loc[names].values
+    orig = pe._df.copy()
+
+    # per-realization reference
+    ub, lb = par.parubnd.loc[names], par.parlbnd.loc[names]
+    base = par.parval1.loc[names]
+    expected = orig.copy()
+    scaled = []
+    for ridx in orig.index:
+        real = orig.loc[ridx, :]
+        facs = []
+        out = real > ub
+        facs.extend(((ub - base).abs() / (real - base).abs()).loc[out].values)
+        out = real < lb
+        facs.extend(((base - lb).abs() / (real - base).abs()).loc[out].values)
+        if len(facs) > 0:
+            expected.loc[ridx, :] = base + (real - base) * min(facs)
+            scaled.append(ridx)
+    summary = pe.enforce(how="scale", report=True)
+    assert np.allclose(pe._df.values, expected.values)
+    assert list(summary.index) == scaled
+    assert (summary.scale_factor <= 1.0).all()
+    for ridx in summary.index:
+        pname = summary.loc[ridx, "parnme"]
+        bnd = ub if summary.loc[ridx, "bound"] == "ubnd" else lb
+        assert np.isclose(pe._df.loc[ridx, pname], bnd.loc[pname])
+        # the unscaled value is reported
+        value = orig.loc[ridx, pname]
+        assert summary.loc[ridx, "value"] == value
+        assert summary.loc[ridx, "bound"] == ("ubnd" if value > ub.loc[pname] else "lbnd")
+    assert (summary.bound == "ubnd").any() and (summary.bound == "lbnd").any()
+    assert pe.enforce(how="scale") is None
+
+    pe = pyemu.ParameterEnsemble(pst=pst, df=orig.copy())
+    pe._df.iloc[2, 0] = np.nan
+    bad = [ridx for ridx in orig.index if (orig.loc[ridx, :] > ub).any() or
+           (orig.loc[ridx, :] < lb).any()] + [orig.index[2]]
+    summary = pe.enforce(how="drop", report=True)
+    assert set(summary.index) == set(bad)
+    assert pe.shape[0] == num_reals - len(set(bad))
+    assert not np.any(pe._df.values > ub.values)
+    assert not np.any(pe._df.values < lb.values)
+
+
+def project_factored_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    ev = pyemu.ErrVar(jco=os.path.join("la","pest.jcb"))
+    pst = ev.pst
+    maxsing = 3
+    np.random.seed(2)
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=30)
+    proj = ev.get_null_proj(maxsing=maxsing)
+    pe_proj = pe.project(proj, enforce_bounds=None)
+
+    # per-realization reference
+    pe.transform()
+    pst.add_transform_columns()
+    base = pst.parameter_data.parval1_trans
+    names = list(base.index)
+    expected = pe._df.copy()
+    for real in pe.index:
+        pdiff = pe._df.loc[real, names] - base
+        expected.loc[real, names] = base + np.dot(proj.get(names, names).x, pdiff.values)
+    pe.back_transform()
+    expected = pyemu.ParameterEnsemble(pst=pst, df=expected, istransformed=True)
+    expected.back_transform()
+    assert np.allclose(pe_proj._df.values, expected._df.values)
+
+    chunk = pyemu.Ensemble.draw_memory
+    try:
+        # several blocks of realizations
+        pyemu.Ensemble.draw_memory = 8 * 7 * pst.npar
+        basis, kind = ev.get_null_proj(maxsing=maxsing, factored=True)
+        assert kind == "null"
+        assert basis.shape == (pst.npar, pst.npar - maxsing)
+        pe_fac = pe.project(basis, enforce_bounds=None, factored=kind)
+        assert np.allclose(pe_fac._df.values, pe_proj._df.values)
+
+        # truncated svd: solution space basis
+        evr = pyemu.ErrVar(jco=os.path.join("la","pest.jcb"), svd_method="randomized")
+        basis, kind = evr.get_null_proj(maxsing=maxsing, factored=True)
+        assert kind == "solution"
+        assert basis.shape == (pst.npar, maxsing)
+        pe_fac = pe.project(basis, enforce_bounds=None, factored=kind)
+        pe_dense = pe.project(evr.get_null_proj(maxsing=maxsing), enforce_bounds=None)
+        assert np.allclose(pe_fac._df.values, pe_dense._df.values)
+    finally:
+        pyemu.Ensemble.draw_memory = chunk
+    try:
+        pe.project(basis, factored="range")
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+
+
 if __name__ == "__main__":
     par_gauss_draw_consistency_test()
     obs_gauss_draw_consistency_test()
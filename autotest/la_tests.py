@@ -152,6 +152,21 @@ def errvar_test():
     print(ev.get_errvar_dataframe())
 
 
+def errvar_svd_method_test():
+    import os
+    import numpy as np
+    from pyemu import ErrVar
+    w_dir = os.path.join("..","verification","henry")
+    forecasts = ["pd_ten","c_obs10_2"]
+    ev = ErrVar(jco=os.path.join(w_dir,"pest.jcb"),forecasts=forecasts)
+    evr = ErrVar(jco=os.path.join(w_dir,"pest.jcb"),forecasts=forecasts,
+                 svd_method="randomized")
+    for sv in [1, 5, 10]:
+        assert np.allclose(ev.G(sv).x, evr.G(sv).x, rtol=1.0e-4, atol=1.0e-8)
+        assert np.allclose(ev.get_null_proj(sv).x, evr.get_null_proj(sv).x,
+                           atol=1.0e-6)
+
+
 def dataworth_test():
     import os
     import numpy as np
@@ -0,0 +1,244 @@
+"""timing benchmarks for the pyemu.mat operations that dominate FOSM jobs.
+
+Each benchmark is timed (best of `repeat` runs) for each problem size and the
+results are appended to a CSV file together with the pyemu version, so that
+timings of different versions (on the same machine) can be compared::
+
+    python mat_benchmarks.py --sizes 1000 5000 10000 50000
+    python mat_benchmarks.py --compare 0.9 1.0
+
+Problem sizes are the number of observations (and of parameters for the
+diagonal and name-based benchmarks).  Jacobians have `--npar` columns.  The
+benchmarks on square matrices (SVD, pseudo inverse, `Cov.to_pearson()`,
+`Cov.from_uncfile()`) use at most `--square-cap` parameters.
+
+"""
+import os
+import sys
+import time
+import argparse
+import platform
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import pyemu
+
+SIZES = [1000, 5000, 10000, 50000]
+NPAR = 500
+SQUARE_CAP = 5000
+ASCII_NCOL = 50
+RESULTS_FILE = os.path.join("benchmarks", "mat_benchmarks.csv")
+BENCH_DIR = os.path.join("temp", "bench")
+
+
+def _names(prefix, n):
+    return ["{0}{1}".format(prefix, i) for i in range(n)]
+
+
+def _jco(nobs, npar):
+    return pyemu.Jco(x=np.random.random((nobs, npar)), row_names=_names("o", nobs),
+                     col_names=_names("p", npar))
+
+
+def _spd_cov(n):
+    x = np.random.random((n, min(n, 50)))
+    return pyemu.Cov(x=np.dot(x, x.T) + np.identity(n), names=_names("p", n))
+
+
+def bench_to_binary(n, npar=NPAR, **kwargs):
+    jco = _jco(n, npar)
+    fname = os.path.join(BENCH_DIR, "to_binary.jcb")
+    return lambda: jco.to_binary(fname)
+
+
+def bench_read_binary(n, npar=NPAR, **kwargs):
+    fname = os.path.join(BENCH_DIR, "read_binary.jcb")
+    _jco(n, npar).to_binary(fname)
+    return lambda: pyemu.Matrix.read_binary(fname)
+
+
+def bench_read_ascii(n, **kwargs):
+    fname = os.path.join(BENCH_DIR, "read_ascii.mat")
+    _jco(n, ASCII_NCOL).to_ascii(fname)
+    return lambda: pyemu.Matrix.read_ascii(fname)
+
+
+def bench_get(n, npar=NPAR, **kwargs):
+    jco = _jco(n, npar)
+    row_names = list(np.random.permutation(jco.row_names)[:n // 2])
+    col_names = list(np.random.permutation(jco.col_names)[:npar // 2])
+    return lambda: jco.get(row_names=row_names, col_names=col_names)
+
+
+def bench_align(n, npar=NPAR, **kwargs):
+    jco = _jco(n, npar)
+    row_names = list(np.random.permutation(jco.row_names))
+    return lambda: jco.copy().align(row_names, axis=0)
+
+
+def bench_mul_diagonal(n, npar=NPAR, **kwargs):
+    jco = _jco(n, npar)
+    obscov = pyemu.Cov(x=np.random.random((n, 1)), names=jco.row_names,
+                       isdiagonal=True)
+    return lambda: jco.T * obscov * jco
+
+
+def bench_mul_dense(n, npar=NPAR, **kwargs):
+    jco = _jco(n, npar)
+    parcov = _spd_cov(npar)
+    return lambda: parcov * (jco.T * jco)
+
+
+def bench_svd(n, square_cap=SQUARE_CAP, **kwargs):
+    cov = _spd_cov(min(n, square_cap))
+
+    def run():
+        cov.copy().s
+    return run
+
+
+def bench_pseudo_inv(n, square_cap=SQUARE_CAP, **kwargs):
+    cov = _spd_cov(min(n, square_cap))
+    return lambda: cov.copy().pseudo_inv(maxsing=cov.shape[0] // 2)
+
+
+def bench_to_pearson(n, square_cap=SQUARE_CAP, **kwargs):
+    cov = _spd_cov(min(n, square_cap))
+    return lambda: cov.to_pearson()
+
+
+def bench_from_uncfile(n, square_cap=SQUARE_CAP, **kwargs):
+    # a standard deviation block for all names and a covariance
+    # matrix block for the first (at most `square_cap`) of them
+    nmat = min(n // 10, square_cap)
+    names = _names("p", n)
+    mat_file = os.path.join(BENCH_DIR, "uncfile.mat")
+    _spd_cov(nmat).to_ascii(mat_file)
+    unc_file = os.path.join(BENCH_DIR, "bench.unc")
+    with open(unc_file, 'w') as f:
+        f.write("START STANDARD_DEVIATION\n")
+        for name in names[nmat:]:
+            f.write("{0} 1.0\n".format(name))
+        f.write("END STANDARD_DEVIATION\n")
+        f.write("START COVARIANCE_MATRIX\n")
+        f.write("file {0}\n".format(mat_file))
+        f.write("variance_multiplier 1.0\n")
+        f.write("END COVARIANCE_MATRIX\n")
+    return lambda: pyemu.Cov.from_uncfile(unc_file)
+
+
+BENCHMARKS = [bench_to_binary, bench_read_binary, bench_read_ascii, bench_get,
+              bench_align, bench_mul_diagonal, bench_mul_dense, bench_svd,
+              bench_pseudo_inv, bench_to_pearson, bench_from_uncfile]
+
+
+def run_benchmarks(sizes=SIZES, names=None, repeat=3, npar=NPAR,
+                   square_cap=SQUARE_CAP, results_file=RESULTS_FILE, label=None):
+    """time the benchmarks and append the results to `results_file`
+
+    Args:
+        sizes ([`int`]): problem sizes
+        names ([`str`]): benchmarks to run, with or without the "bench_"
+            prefix.  If None, all benchmarks are run
+        repeat (`int`): number of timed runs.  The best is recorded
+        npar (`int`): number of Jacobian columns
+        square_cap (`int`): largest dimension for the square matrix benchmarks
+        results_file (`str`): CSV file the results are appended to.  If None,
+            the results are not saved
+        label (`str`): version label.  Default is `pyemu.__version__`
+
+    Returns:
+        `pandas.DataFrame`: the timings of this run
+
+    """
+    if not os.path.exists(BENCH_DIR):
+        os.makedirs(BENCH_DIR)
+    if label is None:
+        label = pyemu.__version__
+    benchmarks = BENCHMARKS
+    if names is not None:
+        names = ["bench_" + name if not name.startswith("bench_") else name
+                 for name in names]
+        benchmarks = [b for b in BENCHMARKS if b.__name__ in names]
+    stamp = datetime.now().isoformat(timespec="seconds")
+    records = []
+    for bench in benchmarks:
+        for n in sizes:
+            np.random.seed(0)
+            func = bench(n, npar=npar, square_cap=square_cap)
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+            name = bench.__name__.replace("bench_", "")
+            print("{0:<16s} {1:>8d} {2:12.4f} sec".format(name, n, min(times)))
+            records.append({"version": label, "timestamp": stamp,
+                            "machine": platform.node(),
+                            "python": platform.python_version(),
+                            "numpy": np.__version__, "benchmark": name,
+                            "size": n, "seconds": min(times)})
+    df = pd.DataFrame(records)
+    if results_file is not None:
+        if os.path.dirname(results_file) != "" and \
+                not os.path.exists(os.path.dirname(results_file)):
+            os.makedirs(os.path.dirname(results_file))
+        df.to_csv(results_file, mode='a', index=False,
+                  header=not os.path.exists(results_file))
+    return df
+
+
+def compare(base, new, results_file=RESULTS_FILE, machine=None, tol=1.1):
+    """compare the (latest) timings of two versions
+
+    Args:
+        base (`str`): version label of the reference timings
+        new (`str`): version label of the timings to check
+        results_file (`str`): CSV file written by `run_benchmarks()`
+        machine (`str`): only compare timings from this machine.  Default
+            is the current machine
+        tol (`float`): ratio new/base above which a timing is flagged as
+            a regression.  Default is 1.1
+
+    Returns:
+        `pandas.DataFrame`: base and new timings, their ratio and a
+        "regression" flag for each benchmark and size
+
+    """
+    if machine is None:
+        machine = platform.node()
+    df = pd.read_csv(results_file, dtype={"version": str})
+    df = df.loc[df.machine == machine, :]
+    df = df.sort_values("timestamp").groupby(["version", "benchmark", "size"]).last()
+    df = df.seconds.unstack("version")
+    for version in [base, new]:
+        if version not in df.columns:
+            raise Exception("compare(): no timings for version {0} on {1}".\
+                            format(version, machine))
+    df = df.loc[:, [base, new]].dropna().copy()
+    df["ratio"] = df.loc[:, new] / df.loc[:, base]
+    df["regression"] = df.ratio > tol
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pyemu.mat benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--benchmarks", nargs="+", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--npar", type=int, default=NPAR)
+    parser.add_argument("--square-cap", type=int, default=SQUARE_CAP)
+    parser.add_argument("--results", default=RESULTS_FILE)
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), default=None)
+    parser.add_argument("--tol", type=float, default=1.1)
+    args = parser.parse_args()
+    if args.compare is not None:
+        result = compare(args.compare[0], args.compare[1],
+                         results_file=args.results, tol=args.tol)
+        print(result.to_string())
+        sys.exit(1 if result.regression.any() else 0)
+    run_benchmarks(sizes=args.sizes, names=args.benchmarks, repeat=args.repeat,
+                   npar=args.npar, square_cap=args.square_cap,
+                   results_file=args.results, label=args.label)
@@ -245,6 +245,7 @@ def to_pearson_test():
     import os
     import numpy as np
     import pandas as pd
+    import pyemu
     from pyemu import Schur
     #w_dir = os.path.join("..","..","verification","10par_xsec","master_opt0")
     w_dir = "la"
@@ -252,6 +253,24 @@ def to_pearson_test():
     sc = Schur(jco=os.path.join(w_dir,"pest.jcb"))
     sc.posterior_parameter.to_pearson()
 
+    np.random.seed(3)
+    a = np.random.random((20, 20))
+    a = np.dot(a, a.T)
+    names = ["p{0}".format(i) for i in range(20)]
+    cov = pyemu.Cov(x=a, names=names)
+    std = np.sqrt(np.diag(a))
+    expected = a / np.outer(std, std)
+    pearson = cov.to_pearson()
+    assert not pearson.issparse and np.allclose(pearson.x, expected)
+    assert np.allclose(np.diag(pearson.x), 1.0)
+    pearson = cov.to_pearson(sparse=True)
+    assert pearson.issparse and np.allclose(pearson.as_2d, expected)
+    pearson = cov.to_sparse().to_pearson()
+    assert pearson.issparse and np.allclose(pearson.as_2d, expected)
+    assert not cov.to_sparse().to_pearson(sparse=False).issparse
+    diag = pyemu.Cov(x=np.diag(a)[:, None], names=names, isdiagonal=True)
+    assert np.allclose(diag.to_pearson().x, np.identity(20))
+
 def sigma_range_test():
     import pyemu
     cov8 = pyemu.la.Cov.from_parbounds(os.path.join("mat", "base_pest.pst"), sigma_range=8.0)
@@ -483,6 +502,857 @@ def df_tests():
 
 
 
+def sparse_storage_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    nrow, ncol = 50, 30
+    rnames = ["row_{0}".format(i) for i in range(nrow)]
+    cnames = ["col_{0}".format(i) for i in range(ncol)]
+    x = np.random.random((nrow, ncol))
+    x[x < 0.8] = 0.0
+    m = pyemu.Jco(x=x, row_names=rnames, col_names=cnames)
+
+    mname = os.path.join("temp", "sparse.jcb")
+    m.to_coo(mname)
+    s = pyemu.Jco.from_binary(mname, sparse=True)
+    assert s.issparse
+    assert np.allclose(s.as_2d, x)
+    m.to_binary(mname)
+    s = pyemu.Jco.from_binary(mname, sparse=True)
+    assert s.issparse
+    assert np.allclose(s.as_2d, x)
+
+    cov = pyemu.Cov(x=np.ones((ncol, 1)) * 2.0, names=cnames[::-1], isdiagonal=True)
+    r = s * cov
+    assert r.issparse
+    assert np.allclose(r.as_2d, 2.0 * x)
+    r = s.T * s
+    assert r.issparse
+    assert np.allclose(r.as_2d, np.dot(x.T, x))
+    r = m.T * s
+    assert np.allclose(r.as_2d, np.dot(x.T, x))
+
+    g = s.get(row_names=rnames[:5], col_names=cnames[::-1])
+    assert g.issparse
+    assert np.allclose(g.as_2d, x[:5, ::-1])
+
+    h = s.hadamard_product(m)
+    assert h.issparse
+    assert np.allclose(h.as_2d, x * x)
+
+    s.to_coo(mname, chunk=7)
+    mm = pyemu.Matrix.from_binary(mname)
+    assert np.allclose(mm.x, x)
+    os.remove(mname)
+
+
+def open_binary_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    nrow, ncol = 60, 40
+    rnames = ["row_{0}".format(i) for i in range(nrow)]
+    cnames = ["col_{0}".format(i) for i in range(ncol)]
+    x = np.random.random((nrow, ncol))
+    x[x < 0.7] = 0.0
+    m = pyemu.Jco(x=x, row_names=rnames, col_names=cnames)
+    mname = os.path.join("temp", "lazy.jcb")
+    for write in [m.to_coo, m.to_binary]:
+        write(mname)
+        handle = pyemu.Jco.open_binary(mname, chunk=17)
+        assert handle.shape == m.shape
+        assert handle.row_names == rnames
+        sub = handle.get(row_names=["row_5", "row_1", "row_59"], col_names=["col_3", "col_0"])
+        assert isinstance(sub, pyemu.Jco)
+        assert np.allclose(sub.x, x[[5, 1, 59], :][:, [3, 0]])
+        sub = handle.get(col_names=["col_5", "col_1"], sparse=True)
+        assert sub.issparse
+        assert np.allclose(sub.as_2d, x[:, [5, 1]])
+        assert np.allclose(handle.to_matrix().x, x)
+        handle.close()
+    os.remove(mname)
+
+
+def out_of_core_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    nrow, ncol = 50, 30
+    rnames = ["row_{0}".format(i) for i in range(nrow)]
+    cnames = ["col_{0}".format(i) for i in range(ncol)]
+    x = np.random.random((nrow, ncol))
+    x[x < 0.5] = 0.0
+    m = pyemu.Jco(x=x, row_names=rnames, col_names=cnames)
+    parcov = pyemu.Cov(x=np.random.random((ncol, 1)) + 0.1, names=cnames[::-1],
+                       isdiagonal=True)
+    q = np.random.random((nrow, nrow))
+    obscov = pyemu.Cov(x=q.dot(q.T) + np.eye(nrow), names=rnames)
+    obsdiag = pyemu.Cov(x=np.random.random((nrow, 1)) + 0.1, names=rnames,
+                        isdiagonal=True)
+    other = pyemu.Matrix(x=np.random.random((ncol, 3)), row_names=cnames,
+                         col_names=["a", "b", "c"])
+    mname = os.path.join("temp", "ooc.jcb")
+    tname = os.path.join("temp", "ooc_t.jcb")
+    pname = os.path.join("temp", "ooc_p.jcb")
+    # PEST-style, column-major sorted records
+    jj, ii = np.nonzero(x.T)
+    to_pest = lambda f: m._write_binary_records(f, ii, jj, x[ii, jj])
+    for write, lead_axis in zip([m.to_coo, m.to_binary, to_pest], [0, None, 1]):
+        write(mname)
+        # tiny budget to force many tiles
+        handle = pyemu.Jco.open_binary(mname, chunk=23, memory=8 * ncol * 7)
+        assert handle.lead_axis == lead_axis
+        assert sum([t.shape[0] for t in handle.tiles(axis=0)]) == nrow
+        assert sum([t.shape[1] for t in handle.tiles(axis=1)]) == ncol
+
+        t = handle.transpose(tname)
+        assert np.allclose(t.to_matrix().x, x.T)
+        assert t.row_names == cnames
+
+        for o in [parcov, other]:
+            d = (m * o).x
+            assert np.allclose(handle.dot(o).x, d)
+            assert np.allclose(handle.dot(o, filename=pname).to_matrix().x, d)
+
+        assert np.allclose(handle.xtqx().x, x.T.dot(x))
+        for cov in [obsdiag, obscov]:
+            assert np.allclose(handle.xtqx(obscov=cov).x, (m.T * cov.inv * m).x)
+        # the transposed file is sorted column-major for its own transpose
+        tt = t.transpose(pname)
+        assert np.allclose(tt.xtqx(obscov=obscov).x, (m.T * obscov.inv * m).x)
+    for fname in [mname, tname, pname]:
+        os.remove(fname)
+
+
+def name_index_cache_test():
+    import numpy as np
+    import pyemu
+
+    rnames = ["row_{0}".format(i) for i in range(10)]
+    cnames = ["col_{0}".format(i) for i in range(5)]
+    m = pyemu.Matrix(x=np.random.random((10, 5)), row_names=rnames, col_names=cnames)
+    assert m.indices(["row_3"], 0)[0] == 3
+    assert m.row_idxs is m.row_idxs
+    m.drop(["row_0", "row_1"], 0)
+    assert m.indices(["row_3"], 0)[0] == 1
+    m.row_names = rnames[::-1][:8]
+    assert m.indices(["row_9"], 0)[0] == 0
+    m.align(cnames[::-1], axis=1)
+    assert m.col_names == cnames[::-1]
+    assert m.indices(["col_4"], 1)[0] == 0
+    try:
+        m.indices(["row_0"], 0)
+    except:
+        pass
+    else:
+        raise Exception("should have failed")
+
+
+def alignment_plan_test():
+    import numpy as np
+    import pyemu
+    from pyemu.mat import mat_handler
+
+    onames = ["obs_{0}".format(i) for i in range(20)]
+    pnames = ["par_{0}".format(i) for i in range(10)]
+    jco = pyemu.Jco(x=np.random.random((20, 10)), row_names=onames, col_names=pnames)
+    cov = pyemu.Cov(x=np.random.random((10, 1)), names=pnames[::-1], isdiagonal=True)
+    mat_handler._alignment_plans.clear()
+    r1 = jco * cov
+    assert len(mat_handler._alignment_plans) == 1
+    r2 = jco * cov
+    assert len(mat_handler._alignment_plans) == 1
+    truth = jco.x * cov.x[::-1, 0]
+    assert np.allclose(r1.x, truth)
+    assert np.allclose(r2.x, truth)
+
+    other = jco.get(row_names=onames[::-1], col_names=pnames[:5])
+    d = jco - other
+    assert d.shape == (20, 5)
+    assert np.abs(d.x).max() == 0.0
+    d = jco + other
+    assert np.allclose(d.x, 2.0 * jco.x[:, :5])
+    h = jco.hadamard_product(other)
+    assert np.allclose(h.x, jco.x[:, :5] ** 2)
+
+    # a fingerprint collision does not reuse the plan of other names
+    mat_handler._alignment_plans.clear()
+    r1 = jco * cov
+    rotated = pnames[1:] + pnames[:1]
+    forged = pyemu.Cov(x=cov.x.copy(), names=rotated, isdiagonal=True)
+    forged._Matrix__row_key = cov._names_key(0)
+    forged._Matrix__col_key = cov._names_key(1)
+    d = np.array([forged.x[rotated.index(name), 0] for name in pnames])
+    assert np.allclose((jco * forged).x, jco.x * d)
+
+    # names edited in place
+    for names in [cov.row_names, cov.col_names]:
+        names[0], names[1] = names[1], names[0]
+    d = np.array([cov.x[cov.row_names.index(name), 0] for name in pnames])
+    assert np.allclose((jco * cov).x, jco.x * d)
+
+    # reassigned names drop the stale plans
+    r1 = jco * cov
+    nplans = len(mat_handler._alignment_plans)
+    jco.col_names = list(jco.col_names)
+    assert len(mat_handler._alignment_plans) < nplans
+
+
+def read_ascii_fortran_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    mname = os.path.join("temp", "fortran.mat")
+    with open(mname, 'w') as f:
+        f.write(" 2 3 2\n1.0 -1.23455+300 2.0E-05\n 3.0 1.2-300 +4.5\n")
+        f.write("* row names\nr1\nr2\n* column names\nc1\nc2\nc3\n")
+    truth = np.array([[1.0, 1.0e+30, 2.0e-05], [3.0, 0.0, 4.5]])
+    m = pyemu.Matrix.from_ascii(mname)
+    assert np.allclose(m.x, truth)
+    assert m.row_names == ["r1", "r2"]
+    assert m.col_names == ["c1", "c2", "c3"]
+
+    chunk = pyemu.Matrix.ascii_chunk
+    pyemu.Matrix.ascii_chunk = 2
+    try:
+        m = pyemu.Matrix.from_ascii(mname)
+    finally:
+        pyemu.Matrix.ascii_chunk = chunk
+    assert np.allclose(m.x, truth)
+
+    x = np.random.random((30, 20))
+    m = pyemu.Matrix(x=x, row_names=["r{0}".format(i) for i in range(30)],
+                     col_names=["c{0}".format(i) for i in range(20)])
+    m.to_ascii(mname)
+    mm = pyemu.Matrix.from_ascii(mname)
+    assert np.allclose(mm.x, x)
+    os.remove(mname)
+
+
+def uncfile_blocks_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    blocks = pyemu.Cov.read_uncfile_blocks(os.path.join("mat", "param.unc"))
+    assert len(blocks) == 4
+    assert blocks[-1].isdiagonal
+    assert blocks[-1].row_names == ["mass", "enthalpy", "heat"]
+    cov_full = pyemu.Cov.from_uncfile(os.path.join("mat", "param.unc"))
+    assert cov_full.shape[0] == sum([b.shape[0] for b in blocks])
+    assert pyemu.Cov._get_uncfile_dimensions(os.path.join("mat", "param.unc")) == \
+           cov_full.shape[0]
+    for block in blocks:
+        sub = cov_full.get(block.row_names)
+        assert np.abs((sub.as_2d - block.as_2d)).max() == 0.0
+
+    cov_por = pyemu.Cov.from_ascii(os.path.join("mat", "cov_por.mat"))
+    assert np.allclose(blocks[2].x, cov_por.x * 0.0625)
+
+
+def block_diagonal_cov_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    np.random.seed(0)
+    blocks = []
+    for ib, n in enumerate([4, 3, 5]):
+        a = np.random.random((n, n))
+        blocks.append(pyemu.Cov(x=np.dot(a, a.T) + np.identity(n),
+                                names=["b{0}_{1}".format(ib, i) for i in range(n)]))
+    diag = pyemu.Cov(x=np.random.random((6, 1)) + 0.1,
+                     names=["d_{0}".format(i) for i in range(6)], isdiagonal=True)
+    bcov = pyemu.BlockDiagonalCov(blocks=blocks, diagonal=diag)
+    names = bcov.names
+    dense = pyemu.Cov(x=bcov.as_2d, names=names)
+    assert bcov.shape == (18, 18)
+    assert bcov.nblocks == 3
+    assert bcov.diagonal.shape == (6, 6)
+    assert np.allclose(bcov.inv.as_2d, dense.inv.as_2d)
+    assert np.allclose(bcov.sqrt.as_2d, dense.sqrt.as_2d)
+    assert np.allclose((bcov * 2.0).as_2d, dense.as_2d * 2.0)
+
+    # reordered and partial get
+    rnames = names[::-1][::2]
+    sub = bcov.get(rnames)
+    assert isinstance(sub, pyemu.BlockDiagonalCov)
+    assert sub.names == rnames
+    assert np.allclose(sub.as_2d, dense.get(rnames).as_2d)
+    off = bcov.get(names[:5], names[3:9])
+    assert np.allclose(off.x, dense.get(names[:5], names[3:9]).x)
+
+    # products with Jco on both sides, with auto alignment
+    jco = pyemu.Jco(x=np.random.random((7, 18)),
+                    row_names=["o_{0}".format(i) for i in range(7)],
+                    col_names=names[::-1])
+    jcov = jco * bcov
+    assert isinstance(jcov, pyemu.Jco)
+    assert np.allclose(jcov.get(col_names=names).x, (jco * dense).get(col_names=names).x)
+    covj = bcov * jco.T
+    assert np.allclose(covj.x, (dense * jco.T).x)
+    assert np.allclose((jco * bcov * jco.T).x, (jco * dense * jco.T).x)
+
+    # binary files
+    bcov.to_binary(os.path.join("temp", "bcov.jcb"))
+    new = pyemu.Cov.from_binary(os.path.join("temp", "bcov.jcb"))
+    assert new.names == names
+    assert np.allclose(new.x, dense.x)
+    bcov.to_coo(os.path.join("temp", "bcov_coo.jcb"))
+    coo = pyemu.Cov.from_binary(os.path.join("temp", "bcov_coo.jcb"))
+    assert np.allclose(coo.x, dense.x)
+
+    # drop; x and inherited operations use a temporary dense copy
+    cp = bcov.copy()
+    cp.drop(names[:2], 0)
+    assert cp.names == names[2:]
+    assert np.allclose(cp.as_2d, dense.get(names[2:]).as_2d)
+    before = cp.as_2d
+    cp.x[0, 0] = 100.0
+    assert cp.nblocks == 3 and cp.diagonal is not None
+    assert np.allclose(cp.as_2d, before)
+    assert np.allclose(cp.to_dataframe().values, before)
+    assert np.allclose(cp.to_pearson().x, pyemu.Cov(x=before, names=cp.names).to_pearson().x)
+    assert cp.nblocks == 3
+    try:
+        cp.replace(diag)
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+
+    # block-wise addition of a diagonal, dense otherwise
+    full_diag = pyemu.Cov(x=np.arange(1.0, 19.0)[:, None], names=names[::-1],
+                          isdiagonal=True)
+    added = bcov + full_diag
+    assert isinstance(added, pyemu.BlockDiagonalCov) and added.nblocks == 3
+    assert np.allclose(added.as_2d, (dense + full_diag).as_2d)
+    subbed = bcov - full_diag
+    assert isinstance(subbed, pyemu.BlockDiagonalCov)
+    assert np.allclose(subbed.as_2d, (dense - full_diag).as_2d)
+    added = bcov + dense
+    assert not isinstance(added, pyemu.BlockDiagonalCov)
+    assert np.allclose(added.as_2d, 2.0 * dense.as_2d)
+    assert bcov.nblocks == 3
+
+    # block-wise conditioning
+    cond = [names[0], names[5], names[-1]]
+    conditioned = bcov.condition_on(cond)
+    assert isinstance(conditioned, pyemu.BlockDiagonalCov)
+    expected = dense.condition_on(list(cond))
+    assert conditioned.names == expected.names
+    assert np.allclose(conditioned.as_2d, expected.as_2d)
+    assert bcov.nblocks == 3 and bcov.names == names
+
+    cov = pyemu.BlockDiagonalCov.from_uncfile(os.path.join("mat", "param.unc"))
+    assert np.allclose(cov.get_diagonal_vector().x,
+                       pyemu.Cov.from_uncfile(os.path.join("mat", "param.unc")).
+                       get_diagonal_vector().x)
+
+
+def cov_factorize_test():
+    import numpy as np
+    import pyemu
+
+    np.random.seed(1)
+    n = 30
+    a = np.random.random((n, n))
+    names = ["p{0}".format(i) for i in range(n)]
+    cov = pyemu.Cov(x=np.dot(a, a.T) + np.identity(n), names=names)
+    l = cov.factorize()
+    assert np.allclose(np.triu(l.x, 1), 0.0)
+    assert np.allclose((l * l.T).x, cov.x)
+    # the factor is cached and reused
+    assert cov._factor("cholesky") is cov._factor("cholesky")
+    assert np.allclose(cov.inv.x, np.linalg.inv(cov.x))
+    assert np.isclose(cov.logdet, np.linalg.slogdet(cov.x)[1])
+    e = cov.factorize(method="eigh")
+    assert np.allclose((e * e.T).x, cov.x)
+
+    # conditioning uses the Cholesky-based inverse
+    cond = cov.condition_on(names[:5])
+    x = cov.x
+    c12 = x[5:, :5]
+    expected = x[5:, 5:] - np.dot(np.dot(c12, np.linalg.inv(x[:5, :5])), c12.T)
+    assert np.allclose(cond.x, expected)
+
+    # replacing values resets the cache
+    cov.drop(names[-1], 0)
+    assert cov.factorize().shape == (n - 1, n - 1)
+
+    # not positive definite - falls back to eigh and numpy.linalg.inv
+    x = np.dot(a[:, :n - 2], a[:, :n - 2].T)
+    x[0, 0] -= 100.0
+    npd = pyemu.Cov(x=x, names=names)
+    assert npd._factor("cholesky") is None
+    assert np.allclose(npd.inv.x, np.linalg.inv(x))
+
+    dcov = pyemu.Cov(x=np.ones((n, 1)) * 2.0, names=names, isdiagonal=True)
+    assert np.isclose(dcov.logdet, n * np.log(2.0))
+    assert np.allclose(dcov.factorize().x, np.identity(n) * np.sqrt(2.0))
+
+    blocks = [cov.get(names[:10]), cov.get(names[10:20])]
+    bcov = pyemu.BlockDiagonalCov(blocks=blocks, diagonal=dcov.get(names[20:]))
+    dense = bcov.to_dense()
+    assert np.isclose(bcov.logdet, dense.logdet)
+    bl = bcov.factorize()
+    assert bl is bcov.factorize()
+    assert np.allclose((bl * bl.T.as_2d).x, dense.x)
+
+
+def truncated_svd_test():
+    import numpy as np
+    import pyemu
+
+    np.random.seed(2)
+    nrow, ncol, rank = 80, 60, 25
+    x = np.dot(np.random.random((nrow, rank)), np.random.random((rank, ncol)))
+    mat = pyemu.Matrix(x=x, row_names=["r{0}".format(i) for i in range(nrow)],
+                       col_names=["c{0}".format(i) for i in range(ncol)])
+    full = pyemu.Matrix(x=x.copy(), row_names=mat.row_names, col_names=mat.col_names)
+    k = 10
+    for method in ["randomized", "lanczos"]:
+        u, s, v = mat.svd(k=k, method=method, seed=0)
+        assert u.shape == (nrow, k) and s.shape == (k, k) and v.shape == (ncol, k)
+        assert np.allclose(s.x[:, 0], full.s.x[:k, 0])
+        # the best rank-k approximation
+        err = np.linalg.norm(x - np.dot(u.x * s.x[:, 0], v.x.T))
+        assert np.isclose(err, np.sqrt((full.s.x[k:, 0]**2).sum()))
+        # the cached components are reused for a smaller k
+        u2, s2, v2 = mat.svd(k=5, method=method)
+        assert np.allclose(s2.x, s.x[:5])
+
+    pinv = mat.pseudo_inv(maxsing=rank, method="randomized")
+    assert np.allclose(pinv.x, np.linalg.pinv(x), atol=1.0e-6)
+    u, s, v = mat.pseudo_inv_components(maxsing=k, method="randomized")
+    assert s.shape == (k, k)
+    try:
+        mat.pseudo_inv_components(method="randomized")
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+    # full method slices the numpy svd
+    u, s, v = full.svd(k=k)
+    assert np.allclose(u.x, full.u.x[:, :k])
+
+
+def chain_product_test():
+    import numpy as np
+    import pyemu
+
+    np.random.seed(3)
+    nobs, npar = 30, 12
+    pnames = ["p{0}".format(i) for i in range(npar)]
+    onames = ["o{0}".format(i) for i in range(nobs)]
+    jco = pyemu.Jco(x=np.random.random((nobs, npar)), row_names=onames,
+                    col_names=pnames)
+    obscov = pyemu.Cov(x=np.random.random(nobs)[:, None] + 0.1, names=onames,
+                       isdiagonal=True)
+    parcov = pyemu.Cov(x=np.random.random(npar)[:, None] + 0.1, names=pnames,
+                       isdiagonal=True)
+    chain = [jco.T, obscov.inv, jco, parcov, parcov]
+    seq = chain[0]
+    for mat in chain[1:]:
+        seq = seq * mat
+    prod = pyemu.mat.chain_product(chain)
+    assert type(prod) == type(seq)
+    assert prod.row_names == seq.row_names and prod.col_names == seq.col_names
+    assert np.allclose(prod.x, seq.x)
+
+    # name-based alignment
+    obscov_shuff = obscov.get(onames[::-1])
+    prod = pyemu.mat.chain_product([jco.T, obscov_shuff, jco])
+    seq = jco.T * obscov_shuff * jco
+    assert np.allclose(prod.x, seq.x)
+    sub = jco.get(col_names=pnames[:5])
+    prod = pyemu.mat.chain_product([jco.T, sub, parcov])
+    seq = jco.T * sub * parcov
+    assert prod.col_names == seq.col_names
+    assert np.allclose(prod.x, seq.x)
+
+    # all-diagonal chains stay diagonal
+    prod = pyemu.mat.chain_product([parcov, parcov.inv, parcov])
+    assert prod.isdiagonal
+    assert np.allclose(prod.x, parcov.x)
+
+    # sparse operands
+    jco_sp = jco.copy()
+    jco_sp.to_sparse()
+    prod = pyemu.mat.chain_product([jco.T, obscov, jco_sp])
+    assert np.allclose(prod.as_2d, (jco.T * obscov * jco).x)
+
+    # inner diagonals over a reordered subset of the names stay diagonal
+    taken = []
+    orig = pyemu.Matrix._take
+
+    def take(self, *args, **kwargs):
+        new = orig(self, *args, **kwargs)
+        taken.append((self.isdiagonal, new.isdiagonal))
+        return new
+    sub = obscov.get(onames[::-2])
+    sub_mat = pyemu.Matrix(x=sub.x.copy(), row_names=sub.row_names,
+                           col_names=sub.col_names, isdiagonal=True)
+    pyemu.Matrix._take = take
+    try:
+        for chain in [[jco.T, sub.inv, jco], [jco.T, sub_mat, jco],
+                      [jco.T, sub, sub.inv, jco]]:
+            del taken[:]
+            prod = pyemu.mat.chain_product(chain)
+            assert len(taken) > 0
+            assert all([new for old, new in taken if old])
+            seq = chain[0]
+            for mat in chain[1:]:
+                seq = seq * mat
+            assert prod.row_names == seq.row_names and prod.col_names == seq.col_names
+            assert np.allclose(prod.x, seq.x)
+    finally:
+        pyemu.Matrix._take = orig
+
+
+def packed_cov_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    np.random.seed(1)
+    n = 37
+    names = ["p{0}".format(i) for i in range(n)]
+    a = np.random.random((n, n))
+    a = np.dot(a, a.T) + np.identity(n)
+    cov = pyemu.Cov(x=a.copy(), names=names)
+    pcov = pyemu.PackedCov(x=a.copy(), names=names)
+    assert pcov.packed.shape[0] == n * (n + 1) // 2
+    assert np.allclose(pcov.as_2d, a)
+    assert np.allclose(pcov.inv.as_2d, np.linalg.inv(a))
+    assert np.isclose(pcov.logdet, cov.logdet)
+    assert np.allclose(pcov.get_diagonal_vector().x[:, 0], np.diag(a))
+
+    # products, with and without alignment and row tiling
+    mat = pyemu.Matrix(x=np.random.random((n, 4)), row_names=names,
+                       col_names=["a", "b", "c", "d"])
+    vec = mat.get(col_names="a")
+    sub = names[::-1][:20]
+    for tile_size in [pyemu.PackedCov.tile_size, 50]:
+        pyemu.PackedCov.tile_size = tile_size
+        assert np.allclose((pcov * mat).x, (cov * mat).x)
+        assert np.allclose((pcov * vec).x, (cov * vec).x)
+        assert np.allclose((mat.T * pcov).x, (mat.T * cov).x)
+        assert np.allclose((pcov * mat.get(sub)).x, (cov * mat.get(sub)).x)
+    pyemu.PackedCov.tile_size = 2**22
+    assert np.allclose((cov * pcov).x, (cov * cov).x)
+
+    sub_cov = pcov.get(sub)
+    assert isinstance(sub_cov, pyemu.PackedCov)
+    assert np.allclose(sub_cov.as_2d, cov.get(sub).x)
+    assert np.allclose(pcov.get(sub, names[:5]).x, cov.get(sub, names[:5]).x)
+    dropped = pcov.copy()
+    dropped.drop(names[:3])
+    assert dropped.row_names == names[3:]
+    assert np.allclose(dropped.as_2d, a[3:, 3:])
+
+    diag = pyemu.Cov(x=np.ones((n, 1)), names=names[::-1], isdiagonal=True)
+    assert np.allclose((pcov + diag).as_2d, a + np.identity(n))
+    assert np.allclose((pcov - diag).as_2d, a - np.identity(n))
+    inplace = pcov.copy()
+    inplace += diag
+    assert np.allclose(inplace.as_2d, a + np.identity(n))
+
+    # x and inherited operations use a temporary dense copy, assigned
+    # values are packed
+    cp = pcov.copy()
+    packed = cp.packed
+    cp.x[0, 0] = -1.0
+    assert cp.packed is packed and cp.packed[0] != -1.0
+    assert np.allclose(cp.to_dataframe().values, a)
+    assert np.allclose(cp.to_pearson().x, pyemu.Cov(x=a, names=cp.names).to_pearson().x)
+    assert cp.packed is packed
+    x = cp.as_2d
+    x[0, 0] = -1.0
+    cp.reset_x(x)
+    assert cp.packed is not packed and cp.packed[0] == -1.0
+    cp = pcov.copy()
+    rep = pyemu.Cov(x=np.array([[-2.0]]), names=[cp.names[1]])
+    cp.replace(rep)
+    expected = a.copy()
+    expected[1, 1] = -2.0
+    assert np.allclose(cp.as_2d, expected)
+
+    # triangle binary files
+    fname = os.path.join("temp", "packed.jcb")
+    fname2 = os.path.join("temp", "packed2.jcb")
+    for triangle in [True, False]:
+        pcov.to_binary(fname, triangle=triangle, chunk=100)
+        new = pyemu.PackedCov.from_binary(fname)
+        assert new.row_names == names
+        assert np.allclose(new.as_2d, a)
+        new = pyemu.Cov.from_binary(fname, triangle=triangle)
+        assert np.allclose(new.x, a)
+    cov.to_binary(fname2, triangle=True)
+    pcov.to_binary(fname, triangle=True)
+    assert open(fname, "rb").read() == open(fname2, "rb").read()
+    new = pyemu.Cov.from_binary(fname2, sparse=True, triangle=True)
+    assert np.allclose(new.x.toarray(), a)
+    pcov.to_coo(fname)
+    assert np.allclose(pyemu.PackedCov.from_binary(fname).as_2d, a)
+
+
+def float32_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    np.random.seed(1)
+    n = 15
+    names = ["p{0}".format(i) for i in range(n)]
+    a = np.random.random((n, n))
+    a = np.dot(a, a.T) + np.identity(n)
+    cov = pyemu.Cov(x=a, names=names)
+    cov32 = cov.astype(np.float32)
+    assert isinstance(cov32, pyemu.Cov)
+    assert cov32.dtype == np.float32 and cov.dtype == np.float64
+    # solves are in double precision, results are single precision
+    assert cov32.inv.dtype == np.float32
+    assert np.allclose(cov32.inv.x, np.linalg.inv(a), rtol=1.0e-4)
+    assert cov32.factorize().dtype == np.float32
+    assert cov32.s.dtype == np.float32 and cov32.u.dtype == np.float32
+    u, s, v = cov32.svd(k=3, method="randomized")
+    assert u.dtype == np.float32
+    assert (cov32 * cov32).dtype == np.float32
+    assert (cov32 * 2.0).dtype == np.float32
+    diag32 = pyemu.Cov(x=np.diag(a)[:, None], names=names,
+                       isdiagonal=True).astype(np.float32)
+    assert diag32.isdiagonal and diag32.inv.dtype == np.float32
+
+    fname = os.path.join("temp", "f32.jcb")
+    cov.to_binary(fname)
+    assert pyemu.Cov.from_binary(fname, dtype=np.float32).dtype == np.float32
+    assert pyemu.Matrix.from_binary(fname, sparse=True,
+                                    dtype=np.float32).dtype == np.float32
+    pcov32 = pyemu.PackedCov.from_binary(fname, dtype=np.float32)
+    assert pcov32.dtype == np.float32 and pcov32.inv.dtype == np.float32
+    assert (pcov32 * cov32.get_diagonal_vector()).dtype == np.float32
+    bcov32 = pyemu.BlockDiagonalCov(blocks=[cov.get(names[:5])],
+                                    diagonal=diag32.get(names[5:])).astype(np.float32)
+    assert bcov32.dtype == np.float32 and bcov32.inv.dtype == np.float32
+    cov32.to_ascii(os.path.join("temp", "f32.mat"))
+    assert pyemu.Cov.from_ascii(os.path.join("temp", "f32.mat"),
+                                dtype=np.float32).dtype == np.float32
+
+    # the global default
+    pyemu.Matrix.default_dtype = np.float32
+    try:
+        assert pyemu.Cov.from_binary(fname).dtype == np.float32
+    finally:
+        pyemu.Matrix.default_dtype = np.float64
+    assert pyemu.Cov.from_binary(fname).dtype == np.float64
+
+
+def binary_names_test():
+    import os
+    import warnings
+    import numpy as np
+    import pyemu
+
+    nrow, ncol = 7, 4
+    row_names = ["Obs{0}".format(i) for i in range(nrow)]
+    row_names[2] = "o" * 25
+    col_names = ["Par{0}".format(i) for i in range(ncol)]
+    col_names[1] = "p" * 15
+    m = pyemu.Matrix(x=np.random.random((nrow, ncol)),
+                     row_names=row_names, col_names=col_names)
+    for write, par_length, obs_length in [(m.to_binary, 12, 20), (m.to_coo, 200, 200)]:
+        fname = os.path.join("temp", "names.jcb")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            write(fname)
+        mm = pyemu.Matrix.from_binary(fname)
+        expected = [n.lower() if len(n) <= obs_length else n[:obs_length - 1]
+                    for n in row_names]
+        assert mm.row_names == expected
+        expected = [n.lower() if len(n) <= par_length else n[:par_length - 1]
+                    for n in col_names]
+        assert mm.col_names == expected
+        assert np.allclose(mm.x, m.x)
+        if par_length == 12:
+            assert len([x for x in w if "greater than" in str(x.message)]) == 2
+        handle = pyemu.Matrix.open_binary(fname)
+        assert handle.row_names == mm.row_names
+        assert handle.col_names == mm.col_names
+
+
+def npz_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    np.random.seed(2)
+    nrow, ncol = 30, 12
+    row_names = ["obs_with_a_long_name_{0}".format(i) for i in range(nrow)]
+    col_names = ["p{0}".format(j) for j in range(ncol)]
+    x = np.random.random((nrow, ncol)).astype(np.float32)
+    x[x < 0.6] = 0.0
+    m = pyemu.Matrix(x=x, row_names=row_names, col_names=col_names)
+    rows = row_names[::-3]
+    cols = col_names[1:5]
+    for mat in [m, m.to_sparse()]:
+        for compress in [False, True]:
+            fname = os.path.join("temp", "mat.npz")
+            mat.to_npz(fname, compress=compress)
+            assert pyemu.Matrix.read_npz_names(fname) == (row_names, col_names)
+            mm = pyemu.Jco.from_npz(fname)
+            assert isinstance(mm, pyemu.Jco)
+            assert mm.issparse == mat.issparse and mm.dtype == np.float32
+            assert mm.row_names == row_names and np.allclose(mm.as_2d, x)
+            mm = pyemu.Matrix.from_npz(fname, row_names=rows, col_names=cols,
+                                       sparse=False, dtype=np.float64)
+            assert not mm.issparse and mm.dtype == np.float64
+            assert mm.row_names == rows and mm.col_names == cols
+            assert np.allclose(mm.x, m.get(rows, cols).x)
+            mm = pyemu.Matrix.from_npz(fname, row_names=rows, sparse=True)
+            assert mm.issparse and np.allclose(mm.as_2d, m.get(row_names=rows).x)
+            mm = pyemu.Matrix.from_npz(fname, col_names=cols)
+            assert np.allclose(mm.as_2d, m.get(col_names=cols).x)
+
+    names = ["p{0}".format(i) for i in range(10)]
+    cov = pyemu.Cov(x=np.arange(1.0, 11.0)[:, None], names=names, isdiagonal=True)
+    fname = os.path.join("temp", "cov.npz")
+    cov.to_npz(fname)
+    new = pyemu.Cov.from_npz(fname)
+    assert new.isdiagonal and np.allclose(new.x, cov.x)
+    new = pyemu.Cov.from_npz(fname, row_names=names[3:6])
+    assert new.isdiagonal and np.allclose(new.x, cov.x[3:6])
+
+    pe = pyemu.ParameterEnsemble(pst=None, df=m.to_dataframe())
+    pe.to_npz(fname)
+    new = pyemu.ParameterEnsemble.from_npz(None, fname, real_names=rows,
+                                           names=cols)
+    assert np.allclose(new._df.values, m.get(rows, cols).x)
+    assert list(new._df.index) == rows
+
+
+def concat_assembly_test():
+    import numpy as np
+    import pyemu
+
+    np.random.seed(4)
+    obs = ["o{0}".format(i) for i in range(6)]
+    m1 = pyemu.Matrix(x=np.random.random((6, 3)), row_names=obs,
+                      col_names=["p0", "p1", "p2"])
+    shuffled = obs[::-1]
+    x2 = np.random.random((6, 2)).astype(np.float32)
+    m2 = pyemu.Matrix(x=x2, row_names=shuffled, col_names=["p3", "p4"])
+    m3 = pyemu.Cov(x=np.arange(1.0, 7.0)[:, None], names=shuffled, isdiagonal=True)
+    expected = np.hstack([m1.x, m2.get(row_names=obs).x, m3.get(obs, shuffled).as_2d])
+
+    cat = pyemu.mat.concat([m1, m2, m3])
+    assert cat.row_names == obs
+    assert cat.col_names == ["p0", "p1", "p2", "p3", "p4"] + shuffled
+    assert cat.dtype == np.float64 and np.allclose(cat.x, expected)
+    # members are not re-ordered
+    assert m2.row_names == shuffled and m3.row_names == shuffled
+    cat = pyemu.mat.concat([m1, m2.to_sparse(), m3])
+    assert cat.issparse and np.allclose(cat.as_2d, expected)
+
+    t1, t2, t3 = m1.T, m2.T, m3.T
+    cat = pyemu.mat.concat([t1, t2, t3])
+    assert cat.col_names == obs and np.allclose(cat.x, expected.T)
+    assert cat.row_names == ["p0", "p1", "p2", "p3", "p4"] + shuffled
+    cat = pyemu.mat.concat([t1.to_sparse(), t2, t3])
+    assert cat.issparse and np.allclose(cat.as_2d, expected.T)
+
+    d1 = pyemu.Cov(x=np.ones((3, 1)), names=["a", "b", "c"], isdiagonal=True)
+    d2 = pyemu.Cov(x=np.ones((2, 1)) * 2.0, names=["d", "e"], isdiagonal=True)
+    ext = d1.extend(d2)
+    assert ext.isdiagonal and ext.shape == (5, 5)
+    assert np.allclose(ext.as_2d, np.diag([1.0, 1.0, 1.0, 2.0, 2.0]))
+    full = pyemu.Cov(x=np.ones((2, 2)), names=["d", "e"])
+    ext = d1.to_sparse().extend(full)
+    assert ext.issparse and np.allclose(ext.as_2d[3:, 3:], 1.0)
+    assert np.allclose(ext.as_2d[:3, :3], np.identity(3))
+    ext = d1.extend(full)
+    assert not ext.isdiagonal and np.allclose(ext.x[:3, 3:], 0.0)
+
+
+def factor_cache_test():
+    import os
+    import shutil
+    import numpy as np
+    import pyemu
+
+    np.random.seed(5)
+    n = 12
+    names = ["p{0}".format(i) for i in range(n)]
+    a = np.random.random((n, n))
+    a = np.dot(a, a.T) + np.identity(n)
+    cov = pyemu.Cov(x=a, names=names)
+    same = pyemu.Cov(x=a.copy(), names=names)
+    assert cov.fingerprint() == same.fingerprint()
+    assert cov.fingerprint(sample=10) == same.fingerprint(sample=10)
+    assert cov.fingerprint() != cov.astype(np.float32).fingerprint()
+    assert cov.fingerprint() != cov.to_sparse().fingerprint()
+    b = a.copy()
+    b[3, 4] += 1.0
+    assert cov.fingerprint() != pyemu.Cov(x=b, names=names).fingerprint()
+    renamed = pyemu.Cov(x=a, names=["q{0}".format(i) for i in range(n)])
+    assert cov.fingerprint() != renamed.fingerprint()
+
+    cache_dir = os.path.join("temp", "factor_cache")
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+    os.makedirs(cache_dir)
+    pyemu.Matrix.factor_cache = cache_dir
+    try:
+        u, l, w = cov.u.x, cov.factorize().x, cov.factorize(method="eigh").x
+        key = cov.fingerprint()
+        for kind in ["svd", "cholesky", "eigh"]:
+            assert os.path.exists(os.path.join(cache_dir, "{0}.{1}.npz".format(key, kind)))
+        assert np.allclose(same.u.x, u) and np.allclose(same.s.x[:, 0], cov.s.x[:, 0])
+        assert np.allclose(same.factorize().x, l)
+        assert np.allclose(same.factorize(method="eigh").x, w)
+        assert np.allclose(same.inv.x, np.linalg.inv(a))
+        # not positive definite is cached too
+        c = pyemu.Cov(x=-a, names=names)
+        c.factorize()
+        c = pyemu.Cov(x=-a, names=names)
+        assert c._factor("cholesky") is None
+
+        # next to the source file
+        pyemu.Matrix.factor_cache = True
+        fname = os.path.join(cache_dir, "source", "cov.jcb")
+        os.makedirs(os.path.dirname(fname))
+        cov.to_binary(fname)
+        new = pyemu.Cov.from_binary(fname)
+        assert new.filename == fname
+        new.factorize()
+        assert os.path.exists(os.path.join(os.path.dirname(fname),
+                                           "{0}.cholesky.npz".format(new.fingerprint())))
+    finally:
+        pyemu.Matrix.factor_cache = False
+
+
+def benchmarks_test():
+    import os
+    import mat_benchmarks
+
+    fname = os.path.join("temp", "bench_results.csv")
+    if os.path.exists(fname):
+        os.remove(fname)
+    for label in ["base", "new"]:
+        df = mat_benchmarks.run_benchmarks(sizes=[40, 80], repeat=1, npar=10,
+                                           square_cap=30, results_file=fname,
+                                           label=label)
+        assert df.shape[0] == 2 * len(mat_benchmarks.BENCHMARKS)
+    result = mat_benchmarks.compare("base", "new", results_file=fname)
+    assert result.shape[0] == 2 * len(mat_benchmarks.BENCHMARKS)
+    assert "regression" in result.columns
+
+
 if __name__ == "__main__":
     #df_tests()
     # cov_scale_offset_test()
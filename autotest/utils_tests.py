@@ -185,6 +185,11 @@ def ppcov_simple_test():
         print(str_mat.row_names)
         delt = mat.x - str_mat.x
         assert np.abs(delt).max() < 1.0e-7
+        packed_mat = struct.covariance_matrix(x=pts.x,y=pts.y,names=pts.name,
+                                              packed=True)
+        assert isinstance(packed_mat,pyemu.PackedCov)
+        delt = mat.x - packed_mat.as_2d
+        assert np.abs(delt).max() < 1.0e-7
 
 
 
@@ -409,6 +414,7 @@ def master_and_workers():
 
 def first_order_pearson_regul_test():
     import os
+    import numpy as np
     from pyemu import Schur
     from pyemu.utils.helpers import first_order_pearson_tikhonov,zero_order_tikhonov
     w_dir = "la"
@@ -422,6 +428,14 @@ def first_order_pearson_regul_test():
     assert sc.pst.control_data.pestmode == "regularization"
     sc.pst.write(os.path.join('temp','test.pst'))
 
+    # the sparse path gives the same equations
+    first_order_pearson_tikhonov(sc.pst,pt,reset=True,abs_drop_tol=0.1)
+    pi = sc.pst.prior_information.copy()
+    assert pi.shape[0] > 0
+    first_order_pearson_tikhonov(sc.pst,pt.to_sparse(),reset=True,abs_drop_tol=0.1)
+    assert list(sc.pst.prior_information.equation) == list(pi.equation)
+    assert np.allclose(sc.pst.prior_information.weight.values, pi.weight.values)
+
 def zero_order_regul_test():
     import os
     import pyemu
@@ -695,6 +709,16 @@ def geostat_prior_builder_test():
     d2 = np.diag(cov.x)
     assert np.array_equiv(d1, d2)
 
+    bcov = pyemu.helpers.geostatistical_prior_builder(pst_file,{str_file:tpl_file},
+                                                      block_diagonal=True)
+    assert isinstance(bcov, pyemu.BlockDiagonalCov)
+    dcov = pyemu.helpers.geostatistical_prior_builder(pst_file,{str_file:tpl_file})
+    assert bcov.names == dcov.names
+    assert np.allclose(bcov.as_2d, dcov.x)
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pyemu.Pst(pst_file), cov=bcov,
+                                                    num_reals=10)
+    assert pe.shape == (10, pst.npar)
+
     pst.parameter_data.loc[pst.par_names[1:10], "partrans"] = "tied"
     pst.parameter_data.loc[pst.par_names[1:10], "partied"] = pst.par_names[0]
     cov = pyemu.helpers.geostatistical_prior_builder(pst, {gs: df},
@@ -1,11 +1,15 @@
 import os
 import copy
 import warnings
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 
 import pyemu
 from .pyemu_warnings import PyemuWarning
+from .mat.mat_handler import _factor_cache_file, _load_factors, _save_factors,\
+    _CooTileWriter
 
 SEED = 358183147 #from random.org on 5 Dec 2016
 
@@ -75,6 +79,27 @@ class Ensemble(object):
         pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst)
 
     """
+    #: approximate number of bytes of realizations computed by a single
+    #: matrix product in `Ensemble._gaussian_draw()`
+    draw_memory = 2**28
+    #: number of values written in a single pass by `Ensemble.to_binary()`
+    binary_chunk = 1000000
+    #: number of threads used to draw the groups of a grouped
+    #: `Ensemble._gaussian_draw()`.  Each group draw is a (BLAS) factorization
+    #: and matrix product that releases the GIL
+    draw_workers = 1
+    #: number of covariance factors and projection matrices kept in memory
+    #: by `Ensemble._gaussian_draw()` for reuse by later draws.  0 disables
+    #: the cache.  Use `Ensemble.clear_projection_cache()` to release them
+    projection_cache_size = 16
+    #: approximate number of bytes of covariance factors and projection
+    #: matrices kept in memory by `Ensemble._gaussian_draw()`.  The least
+    #: recently used are released first and a factor larger than this is
+    #: not kept (see `Matrix.factor_cache` for an on-disk cache)
+    projection_cache_bytes = 2**30
+    _projection_cache = OrderedDict()
+    _projection_lock = threading.Lock()
+
     def __init__(self,pst,df,istransformed=False):
         self._df = df
         """`pandas.DataFrame`: the underlying dataframe that stores the realized values"""
@@ -141,6 +166,26 @@ class Ensemble(object):
                           df=self._df.copy(),
                           istransformed=self.istransformed)
 
+    def astype(self, dtype):
+        """get a copy of `Ensemble` with the values cast to `dtype`
+
+        Args:
+            dtype (`numpy.dtype`): the new dtype, for example `numpy.float32`
+
+        Returns:
+            `Ensemble`: copy of this `Ensemble` with `dtype` values
+
+        Example::
+
+            pst = pyemu.Pst("my.pst")
+            pe = pyemu.ParameterEnsemble.from_csv(pst,"prior.csv")
+            pe32 = pe.astype(np.float32)
+
+        """
+        return type(self)(pst=self.pst,
+                          df=self._df.astype(dtype),
+                          istransformed=self.istransformed)
+
     @property
     def istransformed(self):
         """the parameter transformation status
@@ -249,12 +294,14 @@ class Ensemble(object):
                         filename=filename)
 
     @classmethod
-    def from_binary(cls, pst, filename):
+    def from_binary(cls, pst, filename, dtype=None):
         """ create an `Ensemble` from a PEST-style binary file
 
         Args:
             pst (`pyemu.Pst`): a control file instance
             filename (`str`): filename containing binary ensemble
+            dtype (`numpy.dtype`): dtype of the values.  Default is None
+                (`pyemu.Matrix.default_dtype`)
 
         Returns:
             `Ensemble`: the ensembled loaded from the binary file
@@ -266,7 +313,11 @@ class Ensemble(object):
 
 
         """
-        df = pyemu.Matrix.from_binary(filename).to_dataframe()
+        x, row_names, col_names = pyemu.Matrix.read_binary(filename, dtype=dtype)
+        if np.any(np.isnan(x)):
+            warnings.warn("Ensemble.from_binary(): nans in ensemble", PyemuWarning)
+        # wrap the values without a copy
+        df = pd.DataFrame(x, index=row_names, columns=col_names, copy=False)
         return cls(pst=pst, df=df)
 
 
@@ -285,7 +336,9 @@ class Ensemble(object):
             `Ensemble`
         Note:
             uses `pandas.read_csv()` to load numeric values from
-            CSV file
+            CSV file.  A single (not per-column) `dtype` keyword argument,
+            for example `dtype=numpy.float32`, is applied to the values but
+            not to the realization names
 
         Example::
 
@@ -298,6 +351,10 @@ class Ensemble(object):
 
         if "index_col" not in kwargs:
             kwargs["index_col"] = 0
+        if kwargs.get("dtype", None) is not None and not isinstance(kwargs["dtype"], dict):
+            names = pd.read_csv(filename, *args, nrows=0,
+                                **{k: v for k, v in kwargs.items() if k != "dtype"}).columns
+            kwargs["dtype"] = {name: kwargs["dtype"] for name in names}
         df = pd.read_csv(filename,*args,**kwargs)
         return cls(pst=pst, df=df)
 
@@ -354,9 +411,87 @@ class Ensemble(object):
         if self.istransformed:
             self.back_transform()
             retrans = True
-        if self.isnull().values.any():
+        x = self._df.values
+        if pd.isnull(x).any():
+            warnings.warn("NaN in ensemble",PyemuWarning)
+        # write the records straight from the values, a block of rows at a time
+        writer = _CooTileWriter(filename, x.shape[0], x.shape[1])
+        nrow = max(1, Ensemble.binary_chunk // max(1, x.shape[1]))
+        for start in range(0, x.shape[0], nrow):
+            writer.write_dense(x[start:start + nrow, :], row_offset=start)
+        writer.close([str(r).lower() for r in self._df.index],
+                     [str(c).lower() for c in self._df.columns])
+        if retrans:
+            self.transform()
+
+    @classmethod
+    def from_npz(cls, pst, filename, real_names=None, names=None, dtype=None,
+                 mmap=False):
+        """ create an `Ensemble` from a container written by `Ensemble.to_npz()`
+
+        Args:
+            pst (`pyemu.Pst`): a control file instance
+            filename (`str`): filename of the container
+            real_names ([`str`]): realizations to load.  If None, all
+                realizations are loaded
+            names ([`str`]): parameter/observation names to load. If None,
+                all names are loaded
+            dtype (`numpy.dtype`): dtype of the values.  If None, the
+                dtype of the container is kept
+            mmap (`bool`): flag to wrap a copy-on-write memory map of the
+                values in the `Ensemble` instead of reading them.  Only used
+                for all realizations and names of an uncompressed container.
+                Default is False
+
+        Returns:
+            `Ensemble`: the ensemble loaded from the container
+
+        Example::
+
+            pst = pyemu.Pst("my.pst")
+            oe = pyemu.ObservationEnsemble.from_npz(pst, "obs.npz",
+                                                    names=pst.nnz_obs_names)
+
+        """
+        x, row_names, col_names, _ = pyemu.Matrix.read_npz(
+            filename, row_names=real_names, col_names=names, sparse=False,
+            dtype=dtype, mmap=mmap)
+        df = pd.DataFrame(x, index=row_names, columns=col_names, copy=False)
+        return cls(pst=pst, df=df)
+
+    def to_npz(self, filename, compress=False):
+        """write `Ensemble` to a pyemu-native numpy `.npz` container (see
+        `pyemu.Matrix.to_npz()`)
+
+        Args:
+            filename (`str`): file to write
+            compress (`bool`): flag to deflate the container. Default is False
+
+        Example::
+
+            pst = pyemu.Pst("my.pst")
+            oe = pyemu.ObservationEnsemble.from_gaussian_draw(pst)
+            oe.to_npz("obs.npz")
+
+        Note:
+            back transforms `ParameterEnsemble` before writing so that
+            values are in arithmatic space
+
+            the values are written as they are laid out in memory, without
+            a copy.  Use `Ensemble.from_npz(mmap=True)` to load them without
+            a copy
+
+        """
+        retrans = False
+        if self.istransformed:
+            self.back_transform()
+            retrans = True
+        x = self._df.values
+        if pd.isnull(x).any():
             warnings.warn("NaN in ensemble",PyemuWarning)
-        pyemu.Matrix.from_dataframe(self._df).to_coo(filename)
+        pyemu.Matrix.write_npz(filename, x, [str(r).lower() for r in self._df.index],
+                               [str(c).lower() for c in self._df.columns],
+                               compress=compress)
         if retrans:
             self.transform()
 
@@ -369,10 +504,13 @@ class Ensemble(object):
 
 
     @staticmethod
-    def _gaussian_draw(cov,mean_values,num_reals,grouper=None,fill=True, factor="eigen"):
+    def _gaussian_draw(cov,mean_values,num_reals,grouper=None,fill=True, factor="eigen",
+                       dtype=None):
 
+        if dtype is None:
+            dtype = pyemu.Matrix.default_dtype
         factor = factor.lower()
-        if factor not in ["eigen","svd"]:
+        if factor not in ["eigen","svd","cholesky"]:
             raise Exception("Ensemble._gaussian_draw() error: unrecognized"+\
                             "'factor': {0}".format(factor))
         # make sure all cov names are found in mean_values
@@ -382,10 +520,38 @@ class Ensemble(object):
         if len(missing) > 0:
             raise Exception("Ensemble._gaussian_draw() error: the following cov names are not in "
                             "mean_values: {0}".format(','.join(missing)))
-        if cov.isdiagonal:
+        if isinstance(cov, pyemu.BlockDiagonalCov):
+            reals = np.zeros((num_reals, mean_values.shape[0]), dtype=dtype)
+            reals[:, :] = np.NaN
+            if fill:
+                reals[:, :] = mean_values.values[None, :]
+            mv_map = {n: i for n, i in zip(mean_values.index, np.arange(mean_values.shape[0]))}
+            if factor == "svd":
+                # the blocks are independent, so draw each block separately
+                for block in cov.blocks:
+                    idxs = [mv_map[name] for name in block.row_names]
+                    snv = np.random.randn(num_reals, block.shape[0])
+                    a, i = Ensemble._projection_matrix(block, "svd")
+                    snv[:, i:] = 0.0
+                    reals[:, idxs] = mean_values.loc[block.row_names].values[None, :] +\
+                                     np.dot(snv, a.transpose())
+                diagonal = cov.diagonal
+                if diagonal is not None:
+                    idxs = [mv_map[name] for name in diagonal.row_names]
+                    snv = np.random.randn(num_reals, diagonal.shape[0])
+                    reals[:, idxs] = mean_values.loc[diagonal.row_names].values[None, :] +\
+                                     snv * np.sqrt(diagonal.x[:, 0])[None, :]
+            else:
+                # the (cached) block-wise factor
+                a = cov.factorize(method="eigh" if factor == "eigen" else "cholesky")
+                snv = np.random.randn(num_reals, cov.shape[0])
+                idxs = [mv_map[name] for name in cov.row_names]
+                reals[:, idxs] = mean_values.loc[cov.row_names].values[None, :] +\
+                                 (a * snv.transpose()).x.transpose()
+        elif cov.isdiagonal:
             stds = {name: std for name, std in zip(cov.row_names, np.sqrt(cov.x.flatten()))}
             snv = np.random.randn(num_reals, mean_values.shape[0])
-            reals = np.zeros_like(snv)
+            reals = np.zeros(snv.shape, dtype=dtype)
             reals[:, :] = np.NaN
             for i, name in enumerate(mean_values.index):
                 if name in cov_names:
@@ -393,61 +559,158 @@ class Ensemble(object):
                 elif fill:
                    reals[:, i] = mean_values.loc[name]
         else:
-            reals = np.zeros((num_reals, mean_values.shape[0]))
+            reals = np.zeros((num_reals, mean_values.shape[0]), dtype=dtype)
             reals[:, :] = np.NaN
             if fill:
-                for i,v in enumerate(mean_values.values):
-                   reals[:,i] = v
-            cov_map = {n:i for n,i in zip(cov.row_names,np.arange(cov.shape[0]))}
+                reals[:, :] = mean_values.values[None, :]
             mv_map = {n: i for n, i in zip(mean_values.index, np.arange(mean_values.shape[0]))}
             if grouper is not None:
+                # draw the standard normal values in group order so that the
+                # realizations do not depend on how the groups are dispatched
+                groups = [(grp_name, names, np.random.randn(num_reals, len(names)))
+                          for grp_name, names in grouper.items()]
 
-                for grp_name,names in grouper.items():
+                def draw_group(grp_name, names, snv):
                     print("drawing from group",grp_name)
                     idxs = [mv_map[name] for name in names]
-                    snv = np.random.randn(num_reals, len(names))
                     cov_grp = cov.get(names)
                     if len(names) == 1:
                         std = np.sqrt(cov_grp.x)
                         reals[:, idxs] = mean_values.loc[names].values[0] + (snv * std)
-                    else:
-                        if factor == "eigen":
-                            try:
-                                cov_grp.inv
-                            except:
-                                covname = "trouble_{0}.cov".format(grp_name)
-                                cov_grp.to_ascii(covname)
-                                raise Exception("error inverting cov for group '{0}'," + \
-                                                "saved trouble cov to {1}".
-                                                format(grp_name, covname))
-
-
-                            a, i = Ensemble._get_eigen_projection_matrix(cov_grp.as_2d)
-                        elif factor == "svd":
-                            a, i = Ensemble._get_svd_projection_matrix(cov_grp.as_2d)
-                            snv[:,i:] = 0.0
-                        # process each realization
-                        group_mean_values = mean_values.loc[names]
-                        for i in range(num_reals):
-                            reals[i, idxs] = group_mean_values + np.dot(a, snv[i, :])
+                        return
+                    if factor == "eigen":
+                        a, i = Ensemble._projection_matrix(cov_grp, "eigen",
+                                                           grp_name=grp_name)
+                    elif factor == "cholesky":
+                        a, i = Ensemble._projection_matrix(cov_grp, "cholesky")
+                    elif factor == "svd":
+                        a, i = Ensemble._projection_matrix(cov_grp, "svd")
+                        snv[:,i:] = 0.0
+                    Ensemble._project_draws(reals, idxs, mean_values.loc[names].values,
+                                            a, snv)
+
+                if Ensemble.draw_workers > 1 and len(groups) > 1:
+                    from concurrent.futures import ThreadPoolExecutor
+                    with ThreadPoolExecutor(max_workers=Ensemble.draw_workers) as pool:
+                        futures = [pool.submit(draw_group, *group) for group in groups]
+                        for future in futures:
+                            future.result()
+                else:
+                    for group in groups:
+                        draw_group(*group)
 
             else:
                 snv = np.random.randn(num_reals, cov.shape[0])
-                if factor == "eigen":
-                    a, i = Ensemble._get_eigen_projection_matrix(cov.as_2d)
+                if factor in ["eigen", "cholesky"]:
+                    # reuse the factor of cov across draws
+                    a, i = Ensemble._projection_matrix(cov, "eigh" if factor == "eigen"
+                                                       else "cholesky")
                 elif factor == "svd":
-                    a, i = Ensemble._get_svd_projection_matrix(cov.as_2d)
+                    a, i = Ensemble._projection_matrix(cov, "svd")
                     snv[:,i:] = 0.0
                 cov_mean_values = mean_values.loc[cov.row_names].values
                 idxs = [mv_map[name] for name in cov.row_names]
-                for i in range(num_reals):
-                    reals[i, idxs] = cov_mean_values + np.dot(a, snv[i, :])
+                Ensemble._project_draws(reals, idxs, cov_mean_values, a, snv)
 
         df = pd.DataFrame(reals,columns=mean_values.index.values)
         df.dropna(inplace=True,axis=1)
         return df
 
 
+    @staticmethod
+    def _projection_matrix(cov, method, grp_name=None):
+        """get the projection matrix `a` (draws are `snv` * `a`.T) of `cov`
+        and the number of retained components.  "eigen" and "svd" use
+        `Ensemble._get_eigen_projection_matrix()` and
+        `Ensemble._get_svd_projection_matrix()`, "eigh" and "cholesky" use
+        `Cov.factorize()`.  Results are cached by `Matrix.fingerprint()` (which
+        includes the names, so group blocks are keyed by their members) and,
+        if `Matrix.factor_cache` is set, on disk.  For group draws (`grp_name`),
+        "eigen" first checks that `cov` can be inverted
+        """
+        if Ensemble.projection_cache_size < 1 or Ensemble.projection_cache_bytes < 1:
+            return Ensemble._compute_projection_matrix(cov, method, grp_name)
+        key = (cov.fingerprint(), method)
+        with Ensemble._projection_lock:
+            if key in Ensemble._projection_cache:
+                Ensemble._projection_cache.move_to_end(key)
+                return Ensemble._projection_cache[key]
+        result = Ensemble._compute_projection_matrix(cov, method, grp_name)
+        if result[0].nbytes > Ensemble.projection_cache_bytes:
+            return result
+        with Ensemble._projection_lock:
+            Ensemble._projection_cache[key] = result
+            nbytes = sum([a.nbytes for a, _ in Ensemble._projection_cache.values()])
+            while len(Ensemble._projection_cache) > Ensemble.projection_cache_size or \
+                    nbytes > Ensemble.projection_cache_bytes:
+                a, _ = Ensemble._projection_cache.popitem(last=False)[1]
+                nbytes -= a.nbytes
+        return result
+
+    @staticmethod
+    def _compute_projection_matrix(cov, method, grp_name=None):
+        """compute (or load from `Matrix.factor_cache`) the projection matrix
+        and number of retained components of `cov`
+        """
+        if method in ["eigh", "cholesky"]:
+            # Cov.factorize() has its own on-disk cache
+            a = cov.factorize(method=method).x
+            return a, a.shape[1]
+        if method not in ["eigen", "svd"]:
+            raise Exception("Ensemble._projection_matrix(): unrecognized " +
+                            "method: {0}".format(method))
+        cache_file = _factor_cache_file(cov, method + "_projection")
+        factors = _load_factors(cache_file)
+        if factors is not None:
+            return factors[0], int(factors[1])
+        if method == "eigen":
+            if grp_name is not None:
+                try:
+                    cov.inv
+                except:
+                    covname = "trouble_{0}.cov".format(grp_name)
+                    cov.to_ascii(covname)
+                    raise Exception("error inverting cov for group '{0}'," + \
+                                    "saved trouble cov to {1}".
+                                    format(grp_name, covname))
+            a, i = Ensemble._get_eigen_projection_matrix(cov.as_2d)
+        else:
+            a, i = Ensemble._get_svd_projection_matrix(cov.as_2d)
+        _save_factors(cache_file, [a, np.array(i)])
+        return a, i
+
+    @staticmethod
+    def clear_projection_cache():
+        """empty the in-memory cache of covariance factors and projection
+        matrices used by `Ensemble._gaussian_draw()`
+
+        Note:
+            the cache is bounded by `Ensemble.projection_cache_size` entries
+            and `Ensemble.projection_cache_bytes` bytes
+
+            files written to `pyemu.Matrix.factor_cache` are not removed
+
+        """
+        with Ensemble._projection_lock:
+            Ensemble._projection_cache.clear()
+
+    @staticmethod
+    def _project_draws(reals, idxs, mean_values, a, snv):
+        """fill the `idxs` columns of `reals` with `mean_values` + `snv` * `a`.T,
+        one matrix product per chunk of `Ensemble.draw_memory` bytes of
+        realizations
+        """
+        idxs = np.asarray(idxs)
+        chunk = max(1, int(Ensemble.draw_memory //
+                           (reals.itemsize * max(1, idxs.shape[0]))))
+        if idxs.shape[0] > 0 and np.all(np.diff(idxs) == 1):
+            # contiguous columns - write the products in place
+            idxs = slice(idxs[0], idxs[-1] + 1)
+        for start in range(0, snv.shape[0], chunk):
+            end = min(snv.shape[0], start + chunk)
+            reals[start:end, idxs] = mean_values[None, :] + \
+                                     np.dot(snv[start:end, :], a.transpose())
+
     @staticmethod
     def _get_svd_projection_matrix(x,maxsing=None,eigthresh=1.0e-7):
         if x.shape[0] != x.shape[1]:
@@ -463,7 +726,7 @@ class Ensemble(object):
 
         # fill in full size svd component matrices
         s_full = np.zeros(x.shape)
-        s_full[:s.shape[0], :s.shape[1]] = np.sqrt(s)  # sqrt since sing vals are eigvals**2
+        s_full[np.arange(s.shape[0]), np.arange(s.shape[0])] = np.sqrt(s)  # sqrt since sing vals are eigvals**2
         v_full = np.zeros_like(s_full)
         v_full[:v.shape[0], :v.shape[1]] = v
         # form the projection matrix
@@ -619,7 +882,7 @@ class ObservationEnsemble(Ensemble):
 
     @classmethod
     def from_gaussian_draw(cls,pst,cov=None,num_reals=100,by_groups=True,fill=False,
-                           factor="eigen"):
+                           factor="eigen",dtype=None):
         """generate an `ObservationEnsemble` from a (multivariate) gaussian
         distribution
 
@@ -637,9 +900,14 @@ class ObservationEnsemble(Ensemble):
             fill (`bool`): flag to fill in zero-weighted observations with control file
                 values.  Default is False.
             factor (`str`): how to factorize `cov` to form the projectin matrix.  Can
-                be "eigen" or "svd". The "eigen" option is default and is faster.  But
-                for (nearly) singular cov matrices (such as those generated empirically
+                be "eigen", "cholesky" or "svd". The "eigen" option is default.  "cholesky"
+                is the fastest for positive definite `cov` (it falls back to "eigen" otherwise).
+                But for (nearly) singular cov matrices (such as those generated empirically
                 from ensembles), "svd" is the only way.  Ignored for diagonal `cov`.
+                A `pyemu.BlockDiagonalCov` is always drawn block by block (`by_groups`
+                is ignored).
+            dtype (`numpy.dtype`): dtype of the realized values, for example
+                `numpy.float32`.  Default is None (`pyemu.Matrix.default_dtype`)
 
         Returns:
             `ObservationEnsemble`: the realized `ObservationEnsemble` instance
@@ -689,10 +957,11 @@ class ObservationEnsemble(Ensemble):
                 grouper[grp] = list(grouper[grp])
         df = Ensemble._gaussian_draw(cov=nz_cov,mean_values=mean_values,
                                      num_reals=num_reals,grouper=grouper,
-                                     fill=fill, factor=factor)
+                                     fill=fill, factor=factor, dtype=dtype)
         if fill:
             df.loc[:,pst.zero_weight_obs_names] = pst.observation_data.loc[pst.zero_weight_obs_names,
-                                                                           "obsval"].values
+                                                                           "obsval"].values.astype(
+                pyemu.Matrix.default_dtype if dtype is None else dtype)
         return cls(pst,df,istransformed=False)
 
     @property
@@ -769,7 +1038,7 @@ class ParameterEnsemble(Ensemble):
 
     @classmethod
     def from_gaussian_draw(cls,pst,cov=None,num_reals=100,by_groups=True,
-                           fill=True, factor="eigen"):
+                           fill=True, factor="eigen", dtype=None):
         """generate a `ParameterEnsemble` from a (multivariate) (log) gaussian
         distribution
 
@@ -789,9 +1058,14 @@ class ParameterEnsemble(Ensemble):
             fill (`bool`): flag to fill in fixed and/or tied parameters with control file
                 values.  Default is True.
             factor (`str`): how to factorize `cov` to form the projectin matrix.  Can
-                be "eigen" or "svd". The "eigen" option is default and is faster.  But
-                for (nearly) singular cov matrices (such as those generated empirically
+                be "eigen", "cholesky" or "svd". The "eigen" option is default.  "cholesky"
+                is the fastest for positive definite `cov` (it falls back to "eigen" otherwise).
+                But for (nearly) singular cov matrices (such as those generated empirically
                 from ensembles), "svd" is the only way.  Ignored for diagonal `cov`.
+                A `pyemu.BlockDiagonalCov` is always drawn block by block (`by_groups`
+                is ignored).
+            dtype (`numpy.dtype`): dtype of the realized values, for example
+                `numpy.float32`.  Default is None (`pyemu.Matrix.default_dtype`)
 
         Returns:
             `ParameterEnsemble`: the parameter ensemble realized from the gaussian
@@ -835,7 +1109,7 @@ class ParameterEnsemble(Ensemble):
                 grouper[grp] = list(grouper[grp])
         df = Ensemble._gaussian_draw(cov=cov,mean_values=mean_values,
                                      num_reals=num_reals,grouper=grouper,
-                                     fill=fill)
+                                     fill=fill, factor=factor, dtype=dtype)
         df.loc[:,li] = 10.0**df.loc[:,li]
         return cls(pst,df,istransformed=False)
 
@@ -1087,6 +1361,111 @@ class ParameterEnsemble(Ensemble):
             pe.enforce()
         return pe
 
+    @classmethod
+    def draw_chunks(cls, pst, num_reals=100, chunk=100, how="gaussian", **kwargs):
+        """generate a `ParameterEnsemble` one block of realizations at a time
+
+        Args:
+            pst (`pyemu.Pst`): a control file instance
+            num_reals (`int`): total number of realizations.  Default is 100
+            chunk (`int`): number of realizations in each block.  Default is 100
+            how (`str`): the draw to use: "gaussian"
+                (`ParameterEnsemble.from_gaussian_draw()`), "uniform"
+                (`ParameterEnsemble.from_uniform_draw()`), "triangular"
+                (`ParameterEnsemble.from_triangular_draw()`) or "mixed"
+                (`ParameterEnsemble.from_mixed_draws()`).  Default is "gaussian"
+            **kwargs ({`str`:`object`}): keyword arguments to pass to the draw,
+                for example `cov` or `how_dict`
+
+        Yields:
+            `ParameterEnsemble`: blocks of at most `chunk` realizations.  The
+            realizations are named (numbered) across blocks
+
+        Note:
+            the blocks are independent draws, so only one block is held in
+            memory at a time.  Factorizations of `cov` are reused across blocks
+            if they fit in `Ensemble.projection_cache_bytes`.  Set
+            `pyemu.Matrix.factor_cache` to reuse larger factorizations from disk
+
+        Example::
+
+            pst = pyemu.Pst("my.pst")
+            for pe in pyemu.ParameterEnsemble.draw_chunks(pst, num_reals=5000,
+                                                           chunk=250, cov=cov):
+                process(pe)
+
+        """
+        draws = {"gaussian": cls.from_gaussian_draw, "uniform": cls.from_uniform_draw,
+                 "triangular": cls.from_triangular_draw, "mixed": cls.from_mixed_draws}
+        if how not in draws:
+            raise Exception("ParameterEnsemble.draw_chunks() error: unrecognized " +
+                            "'how': {0}".format(how))
+        if chunk < 1:
+            raise Exception("ParameterEnsemble.draw_chunks() error: 'chunk' must " +
+                            "be at least 1")
+        columns = None
+        for start in range(0, num_reals, chunk):
+            end = min(num_reals, start + chunk)
+            pe = draws[how](pst, num_reals=end - start, **kwargs)
+            df = pe._df
+            # every block has the same columns as the first
+            if columns is None:
+                columns = df.columns
+            elif not df.columns.equals(columns):
+                df = df.reindex(columns=columns)
+            df.index = np.arange(start, end, dtype=np.int64)
+            yield cls(pst=pst, df=df, istransformed=pe.istransformed)
+
+    @classmethod
+    def draw_to_file(cls, pst, filename, num_reals=100, chunk=100, how="gaussian",
+                     **kwargs):
+        """draw a `ParameterEnsemble` block by block and write each block
+        straight to `filename` (see `ParameterEnsemble.draw_chunks()`)
+
+        Args:
+            pst (`pyemu.Pst`): a control file instance
+            filename (`str`): file to write.  Written as CSV if `filename` ends
+                with ".csv", otherwise as a PEST-style (coo) binary file
+            num_reals (`int`): total number of realizations.  Default is 100
+            chunk (`int`): number of realizations in each block.  Default is 100
+            how (`str`): the draw to use ("gaussian", "uniform", "triangular"
+                or "mixed").  Default is "gaussian"
+            **kwargs ({`str`:`object`}): keyword arguments to pass to the draw
+
+        Note:
+            the files are the same as `Ensemble.to_csv()` and `Ensemble.to_binary()`
+            write, and can be loaded with `ParameterEnsemble.from_csv()` and
+            `ParameterEnsemble.from_binary()`.  Values are in arithmetic space
+
+        Example::
+
+            pst = pyemu.Pst("my.pst")
+            pyemu.ParameterEnsemble.draw_to_file(pst, "prior.jcb", num_reals=5000,
+                                                 chunk=250, how="uniform")
+
+        """
+        blocks = cls.draw_chunks(pst, num_reals=num_reals, chunk=chunk, how=how,
+                                 **kwargs)
+        if filename.lower().endswith(".csv"):
+            for i, pe in enumerate(blocks):
+                pe._df.to_csv(filename, mode='w' if i == 0 else 'a', header=i == 0)
+            return
+        writer = None
+        try:
+            for pe in blocks:
+                if pe.isnull().values.any():
+                    warnings.warn("NaN in ensemble",PyemuWarning)
+                if writer is None:
+                    writer = _CooTileWriter(filename, num_reals, pe.shape[1])
+                    columns = list(pe.columns)
+                writer.write_dense(pe._df.values, row_offset=pe.index[0])
+        except:
+            if writer is not None:
+                writer.f.close()
+            raise
+        if writer is not None:
+            writer.close([str(i) for i in range(num_reals)], columns)
+
 
     @classmethod
     def from_parfiles(cls, pst, parfile_names, real_names=None):
@@ -1276,11 +1655,12 @@ class ParameterEnsemble(Ensemble):
         return isfixed.values
 
     def project(self,projection_matrix,center_on=None,
-                log=None,enforce_bounds="reset"):
+                log=None,enforce_bounds="reset",factored=None):
         """ project the ensemble using the null-space Monte Carlo method
 
         Args:
-            projection_matrix (`pyemu.Matrix`): null-space projection operator.
+            projection_matrix (`pyemu.Matrix`): null-space projection operator
+                (V2V2^T) or, with `factored`, the basis it is formed from.
             center_on (`str`): the name of the realization to use as the centering
                 point for the null-space differening operation.  If `center_on` is `None`,
                 the `ParameterEnsemble` mean vector is used.  Default is `None`
@@ -1288,10 +1668,20 @@ class ParameterEnsemble(Ensemble):
             enforce_bounds (`str`): parameter bound enforcement option to pass to
                 `ParameterEnsemble.enforce()`.  Valid options are `reset`, `drop`,
                 `scale` or `None`.  Default is `reset`.
+            factored (`str`): form of `projection_matrix`. If None, the (npar X npar)
+                projection operator. If "null", the null-space basis V2 (npar X k),
+                applied as V2(V2^T d).  If "solution", the solution-space basis V1,
+                applied as d - V1(V1^T d).  The factored forms never build
+                the (npar X npar) operator.  `ErrVar.get_null_proj(factored=True)`
+                returns the basis and its form.  Default is None
 
         Returns:
             `ParameterEnsemble`: untransformed, null-space projected ensemble.
 
+        Note:
+            all realizations are projected with a matrix product per chunk
+            of `Ensemble.draw_memory` bytes of realizations
+
         Example::
 
             ev = pyemu.ErrVar(jco="my.jco") #assumes my.pst exists
@@ -1322,21 +1712,41 @@ class ParameterEnsemble(Ensemble):
             else:
                 raise Exception("error processing 'center_on' arg.  should be realization names, par file, or series")
         names = list(base.index)
-        projection_matrix = projection_matrix.get(names,names)
+        if factored is None:
+            projection_matrix = projection_matrix.get(names,names).x
+        elif factored in ["null", "solution"]:
+            projection_matrix = projection_matrix.get(row_names=names).x
+        else:
+            raise Exception("ParameterEnsemble.project(): unrecognized 'factored' arg: " +\
+                            "{0}, should be None, 'null' or 'solution'".format(factored))
 
         new_en = self.copy()
+        if log is not None:
+            log("projecting {0} realizations".format(self.shape[0]))
+
+        # null space projection of the difference vectors, a block of
+        # realizations at a time
+        base_vals = base.values.astype(float)
+        icol = self._df.columns.get_indexer(names)
+        if np.any(icol < 0):
+            raise Exception("ParameterEnsemble.project(): names not in ensemble: " +\
+                            "{0}".format(list(np.array(names)[icol < 0])))
+        x = self._df.values
+        projected = np.empty((x.shape[0], len(names)))
+        nrow = max(1, Ensemble.draw_memory // (8 * max(1, len(names))))
+        for start in range(0, x.shape[0], nrow):
+            pdiff = x[start:start + nrow, icol] - base_vals
+            if factored is None:
+                pdiff = np.dot(pdiff, projection_matrix.T)
+            elif factored == "null":
+                pdiff = np.dot(np.dot(pdiff, projection_matrix), projection_matrix.T)
+            else:
+                pdiff -= np.dot(np.dot(pdiff, projection_matrix), projection_matrix.T)
+            projected[start:start + nrow, :] = base_vals + pdiff
+        new_en._df.loc[:, names] = projected
 
-        for real in new_en.index:
-            if log is not None:
-                log("projecting realization {0}".format(real))
-
-            # null space projection of difference vector
-            pdiff = self._df.loc[real,names] - base
-            pdiff = np.dot(projection_matrix.x,pdiff.values)
-            new_en.loc[real,names] = base + pdiff
-
-            if log is not None:
-                log("projecting realization {0}".format(real))
+        if log is not None:
+            log("projecting {0} realizations".format(self.shape[0]))
 
         new_en.enforce(enforce_bounds)
 
@@ -1345,13 +1755,23 @@ class ParameterEnsemble(Ensemble):
             self.transform()
         return new_en
 
-    def enforce(self,how="reset",bound_tol=0.0):
+    def enforce(self,how="reset",bound_tol=0.0,report=False):
         """ entry point for bounds enforcement.  This gets called for the
         draw method(s), so users shouldn't need to call this
 
         Args:
-            enforce_bounds (`str`): can be 'reset' to reset offending values or 'drop' to drop
-                offending realizations
+            enforce_bounds (`str`): can be 'reset' to reset offending values, 'drop' to drop
+                offending realizations or 'scale' to shrink offending realizations
+                towards `parval1` until they are within the bounds.  If None,
+                bounds are not enforced
+            bound_tol (`float`): fractional distance inside the bounds that is
+                enforced.  Default is 0.0
+            report (`bool`): flag to return a summary of the realizations that
+                were scaled or dropped.  Default is False
+
+        Returns:
+            `pandas.DataFrame`: if `report` is True and `how` is "scale" or "drop",
+            a summary of the scaled or dropped realizations.  Otherwise None
 
         Example::
 
@@ -1363,93 +1783,137 @@ class ParameterEnsemble(Ensemble):
 
         """
 
+        if how is None:
+            return
         if how.lower().strip() == "reset":
             self._enforce_reset(bound_tol=bound_tol)
         elif how.lower().strip() == "drop":
-            self._enforce_drop(bound_tol=bound_tol)
+            summary = self._enforce_drop(bound_tol=bound_tol)
+            if report:
+                return summary
         elif how.lower().strip() == "scale":
-            self._enforce_scale(bound_tol=bound_tol)
+            summary = self._enforce_scale(bound_tol=bound_tol)
+            if report:
+                return summary
         else:
             raise Exception("unrecognized enforce_bounds arg:"+\
-                            "{0}, should be 'reset' or 'drop'".\
-                            format(enforce_bounds))
+                            "{0}, should be 'reset', 'drop' or 'scale'".\
+                            format(how))
+
+    def _enforce_bounds(self, bound_tol):
+        """(tolerance adjusted) upper and lower bounds aligned with the
+        columns of the ensemble
+        """
+        ub = (self.ubnd * (1.0 - bound_tol)).reindex(self._df.columns).values
+        lb = (self.lbnd * (1.0 + bound_tol)).reindex(self._df.columns).values
+        return ub.astype(float), lb.astype(float)
+
+    def _enforce_rows(self):
+        """number of realizations processed at a time by the whole-array
+        bounds enforcement
+        """
+        return max(1, Ensemble.draw_memory // (8 * max(1, self._df.shape[1])))
 
     def _enforce_scale(self, bound_tol):
+        """ enforce parameter bounds on the ensemble by scaling the
+        deviation of each violating realization from `parval1` with the
+        smallest factor that brings all of its values within the bounds
+
+        Returns:
+            `pandas.DataFrame`: the controlling parameter, bound, scale factor
+            and (unscaled) value of the controlling parameter for each scaled
+            realization
+
+        """
         retrans = False
         if self.istransformed:
             self.back_transform()
             retrans = True
-        ub = self.ubnd * (1.0 - bound_tol)
-        lb = self.lbnd * (1.0 + bound_tol)
-        base_vals = self.pst.parameter_data.loc[self._df.columns,"parval1"].copy()
-        ub_dist = (ub - base_vals).apply(np.abs)
-        lb_dist = (base_vals - lb).apply(np.abs)
+        ub, lb = self._enforce_bounds(bound_tol)
+        names = self._df.columns
+        base_vals = self.pst.parameter_data.loc[names,"parval1"].values.astype(float)
+        ub_dist = np.abs(ub - base_vals)
+        lb_dist = np.abs(base_vals - lb)
 
-        if ub_dist.min() <= 0.0:
+        if np.nanmin(ub_dist) <= 0.0:
             raise Exception("Ensemble._enforce_scale() error: the following parameter" +\
-                            "are at or over ubnd: {0}".format(ub_dist.loc[ub_dist<=0.0].index.values))
-        if lb_dist.min() <= 0.0:
+                            "are at or over ubnd: {0}".format(names[ub_dist<=0.0].values))
+        if np.nanmin(lb_dist) <= 0.0:
             raise Exception("Ensemble._enforce_scale() error: the following parameter" +\
-                            "are at or under lbnd: {0}".format(lb_dist.loc[ub_dist<=0.0].index.values))
-        for ridx in self._df.index:
-            real = self._df.loc[ridx,:]
-            real_dist = (real - base_vals).apply(np.abs)
-            out_ubnd = (real - ub)
-            out_ubnd = out_ubnd.loc[out_ubnd>0.0]
-            ubnd_facs = ub_dist.loc[out_ubnd.index] / real_dist.loc[out_ubnd.index]
-
-            out_lbnd = (lb - real)
-            out_lbnd = out_lbnd.loc[out_lbnd > 0.0]
-            lbnd_facs = lb_dist.loc[out_lbnd.index] / real_dist.loc[out_lbnd.index]
-
-            if ubnd_facs.shape[0] == 0 and lbnd_facs.shape[0] == 0:
+                            "are at or under lbnd: {0}".format(names[lb_dist<=0.0].values))
+
+        x = self._df.values
+        nrow = self._enforce_rows()
+        iscaled, icontrol, factors, values, bounds = [], [], [], [], []
+        for start in range(0, x.shape[0], nrow):
+            real = x[start:start + nrow, :].astype(float, copy=False)
+            diff = real - base_vals
+            real_dist = np.abs(diff)
+            # the factor that puts each out-of-bounds value on its bound,
+            # inf for values within the bounds
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fac = np.where(real > ub, ub_dist / real_dist, np.inf)
+                fac = np.where(real < lb, lb_dist / real_dist, fac)
+            icol = fac.argmin(axis=1)
+            min_fac = fac[np.arange(fac.shape[0]), icol]
+            irow = np.where(np.isfinite(min_fac))[0]
+            if irow.shape[0] == 0:
                 continue
-            lmin = 1.0
-            umin = 1.0
-            sign = np.ones((self.pst.npar_adj))
-            sign[real.loc[self.pst.adj_par_names] < base_vals.loc[self.pst.adj_par_names]] = -1.0
-            if ubnd_facs.shape[0] > 0:
-                umin = ubnd_facs.min()
-                umin_idx = ubnd_facs.idxmin()
-                print("enforce_scale ubnd controlling parameter, scale factor, " + \
-                      "current value for realization {0}: {1}, {2}, {3}". \
-                      format(ridx, umin_idx, umin, real.loc[umin_idx]))
-
-            if lbnd_facs.shape[0] > 0:
-                lmin = lbnd_facs.min()
-                lmin_idx = lbnd_facs.idxmin()
-                print("enforce_scale lbnd controlling parameter, scale factor, " + \
-                      "current value for realization {0}: {1}, {2}. {3}". \
-                      format(ridx, lmin_idx, lmin, real.loc[lmin_idx]))
-            min_fac = min(umin, lmin)
-
-            self._df.loc[ridx,:] = base_vals + (sign * real_dist * min_fac)
+            min_fac = np.minimum(min_fac[irow], 1.0)
+            # record the controlling values before the (possible) view
+            # of them is overwritten with the scaled realizations
+            value = real[irow, icol[irow]].copy()
+            iscaled.append(start + irow)
+            icontrol.append(icol[irow])
+            factors.append(min_fac)
+            values.append(value)
+            bounds.append(np.where(value > ub[icol[irow]], "ubnd", "lbnd"))
+            self._df.iloc[start + irow, :] = base_vals + diff[irow, :] * min_fac[:, None]
 
         if retrans:
             self.transform()
 
+        if len(iscaled) == 0:
+            return pd.DataFrame(columns=["parnme", "bound", "scale_factor", "value"])
+        iscaled = np.concatenate(iscaled)
+        return pd.DataFrame({"parnme": names[np.concatenate(icontrol)].values,
+                             "bound": np.concatenate(bounds),
+                             "scale_factor": np.concatenate(factors),
+                             "value": np.concatenate(values)},
+                            index=self._df.index[iscaled])
+
     def _enforce_drop(self, bound_tol):
         """ enforce parameter bounds on the ensemble by dropping
         violating realizations
 
+        Returns:
+            `pandas.DataFrame`: the number of out-of-bounds values of
+            each dropped realization
+
         Note:
             with a large (realistic) number of parameters, the
             probability that any one parameter is out of
             bounds is large, meaning most realization will
             be dropped.
 
+            realizations with missing values are also dropped
+
         """
-        ub = self.ubnd * (1.0 - bound_tol)
-        lb = self.lbnd * (1.0 + bound_tol)
-        drop = []
-        for ridx in self._df.index:
-            #mx = (ub - self.loc[id,:]).min()
-            #mn = (lb - self.loc[id,:]).max()
-            if (ub - self._df.loc[ridx,:]).min() < 0.0 or\
-                            (lb - self._df.loc[ridx,:]).max() > 0.0:
-                drop.append(ridx)
-        self.loc[drop,:] = np.NaN
-        self.dropna(inplace=True)
+        ub, lb = self._enforce_bounds(bound_tol)
+        x = self._df.values
+        nrow = self._enforce_rows()
+        num_out = np.zeros(x.shape[0], dtype=int)
+        drop = np.zeros(x.shape[0], dtype=bool)
+        for start in range(0, x.shape[0], nrow):
+            real = x[start:start + nrow, :]
+            out = np.logical_or(real > ub, real < lb)
+            num_out[start:start + nrow] = out.sum(axis=1)
+            drop[start:start + nrow] = np.isnan(real).any(axis=1)
+        drop |= num_out > 0
+        summary = pd.DataFrame({"num_out_of_bounds": num_out[drop]},
+                               index=self._df.index[drop])
+        self._df.drop(index=self._df.index[drop], inplace=True)
+        return summary
 
     def _enforce_reset(self, bound_tol):
         """enforce parameter bounds on the ensemble by resetting
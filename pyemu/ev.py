@@ -2,7 +2,7 @@ from __future__ import print_function, division
 import numpy as np
 import pandas as pd
 from pyemu.la import LinearAnalysis
-from pyemu.mat.mat_handler import Matrix, Jco, Cov
+from pyemu.mat.mat_handler import Matrix, Jco, Cov, chain_product
 
 class ErrVar(LinearAnalysis):
     """FOSM-based error variance analysis
@@ -51,6 +51,10 @@ class ErrVar(LinearAnalysis):
         kl (`bool`, optional): flag to perform Karhunen-Loeve scaling on the jacobian before error variance
             calculations. If `True`, the `pyemu.ErrVar.jco` and `pyemu.ErrVar.parcov` are altered in place.
             Default is `False`.
+        svd_method (`str`, optional): SVD method for XtQX used by `ErrVar.R()`, `ErrVar.I_minus_R()`,
+            `ErrVar.G()` and `ErrVar.get_null_proj()` (see `pyemu.Matrix.svd()`).  "randomized" or
+            "lanczos" only compute the leading singular components needed at each singular value.
+            Default is "full".
 
     Example::
 
@@ -91,6 +95,11 @@ class ErrVar(LinearAnalysis):
             kl = bool(kwargs["kl"])
             kwargs.pop("kl")
 
+        self.svd_method = "full"
+        if "svd_method" in kwargs.keys():
+            self.svd_method = kwargs["svd_method"].lower()
+            kwargs.pop("svd_method")
+
 
         self.__qhalfx = None
         self.__R = None
@@ -383,7 +392,7 @@ class ErrVar(LinearAnalysis):
         else:
             self.log("calc R @" + str(singular_value))
             #v1 = self.qhalfx.v[:, :singular_value]
-            v1 = self.xtqx.v[:, :singular_value]
+            v1, _ = self._v1_s1(singular_value)
             self.__R = v1 * v1.T
             self.__R_sv = singular_value
             self.log("calc R @" + str(singular_value))
@@ -406,11 +415,31 @@ class ErrVar(LinearAnalysis):
                 return self.parcov.zero
             else:
                 #v2 = self.qhalfx.v[:, singular_value:]
-                v2 = self.xtqx.v[:, singular_value:]
-                self.__I_R = v2 * v2.T
+                self.__I_R = self._v2_proj(singular_value)
                 self.__I_R_sv = singular_value
                 return self.__I_R
 
+    def _v1_s1(self, singular_value):
+        """the leading `singular_value` right singular vectors and singular
+        values of XtQX, using `ErrVar.svd_method`
+        """
+        if self.svd_method == "full":
+            return self.xtqx.v[:, :singular_value], self.xtqx.s[:singular_value]
+        _, s1, v1 = self.xtqx.svd(k=singular_value, method=self.svd_method)
+        return v1, s1
+
+    def _v2_proj(self, singular_value):
+        """the null space projection (V_2 * V_2^T) of XtQX.  For truncated
+        `ErrVar.svd_method`, formed as I - V_1 * V_1^T
+        """
+        if self.svd_method == "full":
+            v2 = self.xtqx.v[:, singular_value:]
+            return v2 * v2.T
+        v1, _ = self._v1_s1(singular_value)
+        v2_proj = v1 * v1.T
+        v2_proj.reset_x(np.identity(v2_proj.shape[0]) - v2_proj.x, copy=False)
+        return v2_proj
+
     def G(self, singular_value):
         """get the parameter solution Matrix at a given singular value
 
@@ -443,10 +472,10 @@ class ErrVar(LinearAnalysis):
             singular_value = min(self.pst.npar_adj, self.pst.nnz_obs)
         self.log("calc G @" + str(singular_value))
         #v1 = self.qhalfx.v[:, :singular_value]
-        v1 = self.xtqx.v[:, :singular_value]
         #s1 = ((self.qhalfx.s[:singular_value]) ** 2).inv
-        s1 = (self.xtqx.s[:singular_value]).inv
-        self.__G = v1 * s1 * v1.T * self.jco.T * self.obscov.inv
+        v1, s1 = self._v1_s1(singular_value)
+        s1 = s1.inv
+        self.__G = chain_product([v1, s1, v1.T, self.jco.T, self.obscov.inv])
         self.__G_sv = singular_value
         self.__G.row_names = self.jco.col_names
         self.__G.col_names = self.jco.row_names
@@ -681,7 +710,7 @@ class ErrVar(LinearAnalysis):
         self.log("calc third term parameter @" + str(singular_value))
         return result
 
-    def get_null_proj(self, maxsing=None, eigthresh=1.0e-6 ):
+    def get_null_proj(self, maxsing=None, eigthresh=1.0e-6, factored=False):
         """ get a null-space projection matrix of XTQX
 
         Args:
@@ -692,12 +721,28 @@ class ErrVar(LinearAnalysis):
             eigthresh (`float`, optional): the ratio of smallest to largest singular
                 value to keep in the range (solution) space of XtQX.  Not used if
                 `maxsing` is not `None`.  Default is 1.0e-6
+            factored (`bool`, optional): flag to return the basis the projection
+                matrix is formed from, and its kind, instead of the (npar X npar)
+                projection matrix.  The basis is V2 ("null") if `ErrVar.svd_method`
+                is "full" and V1 ("solution") otherwise.  Default is False
 
         Note:
             used for null-space monte carlo operations.
 
+            if `ErrVar.svd_method` is not "full", only the leading `maxsing` singular
+            components are computed and the projection is formed as I - V1V1^T
+
         Returns:
-            `pyemu.Matrix` the null-space projection matrix (V2V2^T)
+            `pyemu.Matrix` the null-space projection matrix (V2V2^T) or, if
+            `factored`, a (`pyemu.Matrix`, `str`) pair of the basis and its kind
+            ("null" or "solution") to pass to `ParameterEnsemble.project()`
+
+        Example::
+
+            ev = pyemu.ErrVar(jco="my.jco")
+            pe = pyemu.ParameterEnsemble.from_gaussian_draw(ev.pst)
+            basis, kind = ev.get_null_proj(maxsing=25, factored=True)
+            pe_proj = pe.project(basis, factored=kind)
 
         """
         if maxsing is None:
@@ -706,7 +751,12 @@ class ErrVar(LinearAnalysis):
         self.log("forming null space projection matrix with " + \
                  "{0} of {1} singular components".format(maxsing, self.jco.shape[1]))
 
-        v2_proj = (self.xtqx.v[:, maxsing:] * self.xtqx.v[:, maxsing:].T)
+        if not factored:
+            v2_proj = self._v2_proj(maxsing)
+        elif self.svd_method == "full":
+            v2_proj = self.xtqx.v[:, maxsing:], "null"
+        else:
+            v2_proj = self._v1_s1(maxsing)[0], "solution"
         self.log("forming null space projection matrix with " + \
                  "{0} of {1} singular components".format(maxsing, self.jco.shape[1]))
 
@@ -8,7 +8,7 @@ import copy
 from datetime import datetime
 import numpy as np
 import pandas as pd
-from pyemu.mat.mat_handler import Matrix, Jco, Cov
+from pyemu.mat.mat_handler import Matrix, Jco, Cov, chain_product
 from pyemu.pst.pst_handler import Pst
 from pyemu.utils.os_utils import _istextfile
 from .logger import Logger
@@ -160,8 +160,8 @@ class LinearAnalysis(object):
                 self.resfile = None
                 self.res = None
             self.log("scaling obscov by residual phi components")
-        assert type(self.parcov) == Cov
-        assert type(self.obscov) == Cov
+        assert isinstance(self.parcov, Cov)
+        assert isinstance(self.obscov, Cov)
 
     def __fromfile(self, filename, astype=None):
         """a private method to deduce and load a filename into a matrix object.
@@ -686,7 +686,7 @@ class LinearAnalysis(object):
         """
         if self.__xtqx is None:
             self.log("xtqx")
-            self.__xtqx = self.jco.T * (self.obscov ** -1) * self.jco
+            self.__xtqx = chain_product([self.jco.T, self.obscov ** -1, self.jco])
             self.log("xtqx")
         return self.__xtqx
 
@@ -1,8 +1,11 @@
 from __future__ import print_function, division
 import os
+import re
 import copy
-import struct
+import bisect
+import hashlib
 import warnings
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 #import scipy.linalg as la
@@ -11,6 +14,255 @@ import pandas as pd
 from pyemu.pst.pst_handler import Pst
 from ..pyemu_warnings import PyemuWarning
 
+def _issparse(x):
+    """check if `x` is a scipy.sparse matrix without requiring scipy
+    """
+    try:
+        import scipy.sparse as sps
+    except Exception as e:
+        return False
+    return sps.issparse(x)
+
+
+def _sparse_module():
+    """get the scipy.sparse module or raise an informative exception
+    """
+    try:
+        import scipy.sparse as sps
+    except Exception as e:
+        raise Exception("sparse Matrix storage requires scipy: {0}".format(str(e)))
+    return sps
+
+
+def _dot(x1, x2):
+    """dot product of two numeric blocks where either (or both)
+    could be a scipy.sparse matrix.  Sparse-sparse products stay sparse
+    """
+    if _issparse(x1):
+        return x1.dot(x2)
+    elif _issparse(x2):
+        return np.asarray(x2.T.dot(x1.T)).T
+    return np.dot(x1, x2)
+
+
+def _delete(x, idxs, axis):
+    """`numpy.delete` that also works for scipy.sparse matrices
+    """
+    if not _issparse(x):
+        return np.delete(x, idxs, axis)
+    keep = np.setdiff1d(np.arange(x.shape[axis]), idxs)
+    if axis == 0:
+        return x.tocsr()[keep, :]
+    return x.tocsc()[:, keep].tocsr()
+
+
+def _upcast(x):
+    """`x` in double precision for numerically sensitive solves.  No copy
+    if `x` is already double precision (or not floating point)
+    """
+    if x.dtype.kind == 'f' and x.dtype.itemsize < 8:
+        return x.astype(np.float64)
+    return x
+
+
+def _cholesky(x):
+    """lower-triangular Cholesky factor of `x` (in double precision).  `None`
+    if `x` is not (numerically) symmetric positive definite
+    """
+    if x.shape[0] != x.shape[1] or not np.allclose(x, x.transpose()):
+        return None
+    x = _upcast(x)
+    try:
+        return np.linalg.cholesky(x)
+    except np.linalg.LinAlgError:
+        return None
+
+
+def _cholesky_inv(l):
+    """inverse of l * l.T from the lower-triangular Cholesky factor `l`.
+    Uses LAPACK dpotri through scipy if available
+    """
+    try:
+        from scipy.linalg import lapack
+    except Exception as e:
+        lapack = None
+    if lapack is not None:
+        inv, info = lapack.dpotri(l, lower=1)
+        if info == 0:
+            return np.tril(inv) + np.tril(inv, -1).transpose()
+    linv = np.linalg.solve(l, np.identity(l.shape[0]))
+    return np.dot(linv.transpose(), linv)
+
+
+def _eigen_factor(w, v, eigthresh=1.0e-10):
+    """the factor v * sqrt(w) from a symmetric eigen decomposition.
+    Eigen values less than `eigthresh` are treated as zero
+    """
+    w = w.copy()
+    w[w <= eigthresh] = 0.0
+    return v * np.sqrt(w)[None, :]
+
+
+def _factor_cache_file(mat, kind):
+    """the on-disk cache file for the `kind` factorization of `mat`, or
+    `None` if `Matrix.factor_cache` is off or there is nowhere to put it
+    """
+    cache = Matrix.factor_cache
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        if getattr(mat, "filename", None) is None:
+            return None
+        cache = os.path.dirname(os.path.abspath(mat.filename))
+    return os.path.join(cache, "{0}.{1}.npz".format(mat.fingerprint(), kind))
+
+
+def _load_factors(filename):
+    """the arrays saved by `_save_factors()` to `filename`.  `None` if
+    there is no usable cache file
+    """
+    if filename is None or not os.path.exists(filename):
+        return None
+    try:
+        with np.load(filename) as npz:
+            return [npz["arr_{0}".format(i)] for i in range(len(npz.files))]
+    except Exception as e:
+        warnings.warn("unable to read factor cache file '{0}': {1}".\
+                      format(filename, str(e)), PyemuWarning)
+        return None
+
+
+def _save_factors(filename, arrays):
+    """write `arrays` to the factor cache file `filename`.  Written to a
+    temporary file first so that concurrent jobs never see a partial file
+    """
+    if filename is None:
+        return
+    tmp = "{0}.{1}.tmp".format(filename, os.getpid())
+    try:
+        with open(tmp, 'wb') as f:
+            np.savez(f, *arrays)
+        os.replace(tmp, filename)
+    except Exception as e:
+        warnings.warn("unable to write factor cache file '{0}': {1}".\
+                      format(filename, str(e)), PyemuWarning)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _randomized_svd(x, k, oversample=10, n_iter=4, seed=None):
+    """leading `k` singular triplets of `x` (dense or scipy.sparse) by
+    randomized range finding with `n_iter` power iterations
+    (Halko, Martinsson and Tropp, 2011)
+    """
+    rng = np.random.RandomState(seed)
+    nsamp = min(k + oversample, min(x.shape))
+    q, _ = np.linalg.qr(_dot(x, rng.standard_normal((x.shape[1], nsamp))))
+    for _ in range(n_iter):
+        z, _ = np.linalg.qr(_dot(x.T, q))
+        q, _ = np.linalg.qr(_dot(x, z))
+    # q.T * x, formed as (x.T * q).T to keep sparse x on the left
+    b = _dot(x.T, q).transpose()
+    ub, s, vt = np.linalg.svd(b, full_matrices=False)
+    return np.dot(q, ub[:, :k]), s[:k], vt[:k, :].transpose()
+
+
+def _lanczos_svd(x, k):
+    """leading `k` singular triplets of `x` (dense or scipy.sparse) with
+    the implicitly restarted Lanczos method in `scipy.sparse.linalg.svds`
+    """
+    try:
+        from scipy.sparse.linalg import svds
+    except Exception as e:
+        raise Exception("Lanczos SVD requires scipy: {0}".format(str(e)))
+    u, s, vt = svds(x, k=k)
+    order = np.argsort(s)[::-1]
+    return u[:, order], s[order], vt[order, :].transpose()
+
+
+# a fortran float with a 3-digit exponent that leaves out the base
+_fortran_exponent = re.compile(r"(?<!\S)[+-]?(?:\d+\.?\d*|\.\d+)[+-]\d+(?!\S)")
+
+
+def _fortran_exponent_sub(match):
+    # overflow
+    if '+' in match.group(0):
+        return "1.0e+30"
+    # underflow
+    return "0.0"
+
+
+def _ascii_tokens_to_array(tokens):
+    """convert a list of ASCII float tokens to an array.  Tries a bulk
+    conversion first, then a regex pre-pass for fortran exponents that leave
+    out the base (e.g. "-1.23455+300"), then the slow token-by-token path
+    """
+    try:
+        return np.array(tokens, dtype=Matrix.double)
+    except ValueError:
+        pass
+    fixed = _fortran_exponent.sub(_fortran_exponent_sub, ' '.join(tokens)).split()
+    try:
+        return np.array(fixed, dtype=Matrix.double)
+    except ValueError:
+        pass
+    x = []
+    for r in tokens:
+        try:
+            x.append(float(r))
+        except Exception as e:
+            # overflow
+            if '+' in r:
+                x.append(1.0e+30)
+            # underflow
+            elif '-' in r:
+                x.append(0.0)
+            else:
+                raise Exception("Matrix.from_ascii() error: " +
+                                " can't cast " + r + " to float")
+    return np.array(x, dtype=Matrix.double)
+
+
+def _npz_member(filename, npz, name, mode='r'):
+    """get the array `name` from the open `numpy.NpzFile` `npz`.  Members that
+    are stored uncompressed are memory-mapped (with `numpy.memmap` `mode`) in
+    place so that slicing only reads the requested values; compressed members
+    are read in full
+    """
+    import zipfile
+    info = npz.zip.getinfo(name + ".npy")
+    if info.compress_type == zipfile.ZIP_STORED:
+        readers = {(1, 0): np.lib.format.read_array_header_1_0,
+                   (2, 0): np.lib.format.read_array_header_2_0}
+        with open(filename, 'rb') as f:
+            # skip the zip local file header
+            f.seek(info.header_offset)
+            local = f.read(30)
+            fname_len, extra_len = np.frombuffer(local[26:30], dtype="<u2")
+            f.seek(info.header_offset + 30 + int(fname_len) + int(extra_len))
+            version = np.lib.format.read_magic(f)
+            if version in readers:
+                shape, fortran_order, dtype = readers[version](f)
+                if not dtype.hasobject and int(np.prod(shape)) > 0:
+                    return np.memmap(filename, dtype=dtype, mode=mode,
+                                     offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return npz[name]
+
+
+def _csr_take_rows(data, indices, indptr, row_idxs):
+    """gather the CSR components of rows `row_idxs`, reading only the
+    stored values of those rows
+    """
+    starts = indptr[row_idxs].astype(np.int64)
+    lengths = indptr[row_idxs + 1].astype(np.int64) - starts
+    new_indptr = np.zeros(row_idxs.shape[0] + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_indptr[1:])
+    take = np.repeat(starts - new_indptr[:-1], lengths) + \
+        np.arange(new_indptr[-1], dtype=np.int64)
+    return data[take], indices[take], new_indptr
+
+
 def save_coo(x, row_names, col_names,  filename, chunk=None):
     """write a PEST-compatible binary file.  The data format is
     [int,int,float] for i,j,value.  It is autodetected during
@@ -38,20 +290,8 @@ def save_coo(x, row_names, col_names,  filename, chunk=None):
     data = np.core.records.fromarrays([x.row, x.col, x.data], dtype=Matrix.coo_rec_dt)
     data.tofile(f)
 
-    for name in col_names:
-        if len(name) > Matrix.new_par_length:
-            name = name[:Matrix.new_par_length - 1]
-        elif len(name) < Matrix.new_par_length:
-            for _ in range(len(name), Matrix.new_par_length):
-                name = name + ' '
-        f.write(name.encode())
-    for name in row_names:
-        if len(name) > Matrix.new_obs_length:
-            name = name[:Matrix.new_obs_length - 1]
-        elif len(name) < Matrix.new_obs_length:
-            for i in range(len(name), Matrix.new_obs_length):
-                name = name + ' '
-        f.write(name.encode())
+    Matrix._write_binary_names(f, col_names, Matrix.new_par_length, "par")
+    Matrix._write_binary_names(f, row_names, Matrix.new_obs_length, "obs")
     f.close()
 
 
@@ -63,11 +303,14 @@ def concat(mats):
 
     Returns:
         `pyemu.Matrix`: a concatenated `Matrix` instance
-    """
-    for mat in mats:
-        if mat.isdiagonal:
-            raise NotImplementedError("concat not supported for diagonal mats")
 
+    Note:
+        the result is allocated once and each member is copied into place,
+        aligned to the shared names of the first member.  Members are not
+        modified.  Diagonal members are supported; if any member has
+        `scipy.sparse` storage, the result is sparse
+
+    """
     row_match = True
     col_match = True
     for mat in mats[1:]:
@@ -83,28 +326,208 @@ def concat(mats):
         raise Exception("mat_handler.concat(): all Matrix objects"+\
                         "share both rows and cols")
 
+    # axis is the shared axis, the members are stacked along the other
+    axis = 0 if row_match else 1
+    shared = mats[0].row_names if row_match else mats[0].col_names
+    # for each member, the positions of the shared names
+    gathers = [np.arange(len(shared))] + \
+              [mat.indices(shared, axis=axis) for mat in mats[1:]]
+    stacked = []
+    for mat in mats:
+        stacked.extend(mat.col_names if row_match else mat.row_names)
     if row_match:
-        row_names = copy.deepcopy(mats[0].row_names)
-        col_names = []
-        for mat in mats:
-            col_names.extend(copy.deepcopy(mat.col_names))
-        x = mats[0].newx.copy()
+        row_names, col_names = list(shared), stacked
+    else:
+        row_names, col_names = stacked, list(shared)
+    dtype = np.result_type(*[mat.dtype for mat in mats])
+
+    if any([mat.issparse for mat in mats]):
+        sps = _sparse_module()
+        blocks = []
+        for mat, idxs in zip(mats, gathers):
+            x = mat._sparse_operand()
+            blocks.append(x.tocsr()[idxs, :] if row_match else x.tocsc()[:, idxs])
+        if row_match:
+            x = sps.hstack(blocks, format="csr", dtype=dtype)
+        else:
+            x = sps.vstack(blocks, format="csr", dtype=dtype)
+        return Matrix(x=x, row_names=row_names, col_names=col_names)
+
+    x = np.zeros((len(row_names), len(col_names)), dtype=dtype)
+    start = 0
+    for mat, idxs in zip(mats, gathers):
+        end = start + (mat.shape[1] if row_match else mat.shape[0])
+        block = x[:, start:end] if row_match else x[start:end, :]
+        if mat.isdiagonal:
+            # the only nonzero of each shared name is on the diagonal
+            vals = mat.x[idxs, 0]
+            if row_match:
+                block[np.arange(idxs.shape[0]), idxs] = vals
+            else:
+                block[idxs, np.arange(idxs.shape[0])] = vals
+        elif mat.dtype == dtype:
+            np.take(mat.x, idxs, axis=axis, out=block, mode="clip")
+        else:
+            block[:] = np.take(mat.x, idxs, axis=axis)
+        start = end
+    return Matrix(x=x, row_names=row_names, col_names=col_names)
+
+
+def _scale(x, d, axis):
+    """scale the rows (`axis` = 0) or columns (`axis` = 1) of `x` (dense or
+    scipy.sparse) by the vector `d`.  Returns a new array
+    """
+    if _issparse(x):
+        sps = _sparse_module()
+        if axis == 0:
+            return sps.diags(d).dot(x).tocsr()
+        return x.dot(sps.diags(d)).tocsr()
+    if axis == 0:
+        return x * d[:, None]
+    return x * d[None, :]
+
+
+def _chain_order(dims):
+    """split points of the cheapest evaluation order of a chain of dense
+    matrix products, where matrix i has shape (dims[i], dims[i+1]).  The
+    classic O(n^3) dynamic program over the number of multiply-adds
+    """
+    n = len(dims) - 1
+    cost = [[0] * n for _ in range(n)]
+    split = [[0] * n for _ in range(n)]
+    for length in range(1, n):
+        for i in range(n - length):
+            j = i + length
+            cost[i][j] = None
+            for k in range(i, j):
+                c = cost[i][k] + cost[k + 1][j] + dims[i] * dims[k + 1] * dims[j + 1]
+                if cost[i][j] is None or c < cost[i][j]:
+                    cost[i][j] = c
+                    split[i][j] = k
+    return split
+
+
+def _chain_eval(xs, split, i, j):
+    if i == j:
+        return xs[i]
+    k = split[i][j]
+    return _dot(_chain_eval(xs, split, i, k), _chain_eval(xs, split, k + 1, j))
+
+
+def chain_product(mats):
+    """dot product of a chain of `Matrix` objects, evaluated all at once.
+    The result is the same as `mats[0] * mats[1] * ... * mats[-1]` (including
+    the name-based alignment), but diagonal operands are folded into
+    row/column scaling of a neighbouring operand and the remaining products
+    are evaluated in the cheapest order, so that fewer (and smaller)
+    intermediate matrices are formed
+
+    Args:
+        mats ([`Matrix`]): list of Matrix objects to multiply, left to right
+
+    Returns:
+        `Matrix`: the product, the same type as `mats[0]`
+
+    Example::
+
+        jco = pyemu.Jco.from_binary("my.jcb")
+        obscov = pyemu.Cov.from_observation_data(pst)
+        xtqx = pyemu.mat.chain_product([jco.T, obscov.inv, jco])
+
+    Note:
+        chains that include a `BlockDiagonalCov` or `PackedCov` are evaluated left
+        to right with the `*` operator
+
+    """
+    if len(mats) == 0:
+        raise Exception("chain_product(): no Matrix objects passed")
+    for mat in mats:
+        if not isinstance(mat, Matrix):
+            raise Exception("chain_product(): all items must be Matrix, not " +\
+                            str(type(mat)))
+    if len(mats) == 1:
+        return mats[0].copy()
+    if any([isinstance(mat, (BlockDiagonalCov, PackedCov)) for mat in mats]):
+        result = mats[0]
         for mat in mats[1:]:
-            mat.align(mats[0].row_names, axis=0)
-            other_x = mat.newx
-            x = np.append(x, other_x, axis=1)
+            result = result * mat
+        return result
+
+    # name-based alignment, the same as repeated Matrix.__mul__()
+    ops = [mats[0]]
+    for imat, mat in enumerate(mats[1:]):
+        first = ops[-1]
+        if first.autoalign and mat.autoalign and not first.mult_isaligned(mat):
+            common, first_idxs, mat_idxs = get_alignment_plan(first, 1, mat, 0)
+            if len(common) == 0:
+                raise Exception("chain_product(): col_names and row_names " +\
+                                "don't share any common elements.  first 10: " +\
+                                ','.join(first.col_names[:9]) + '...and..' +\
+                                ','.join(mat.row_names[:9]))
+            if len(ops) == 1 and isinstance(first, Cov):
+                ops[-1] = first._take(first_idxs, first_idxs, common, common)
+            else:
+                _take_chain_cols(ops, len(ops) - 1, first_idxs, common)
+            if isinstance(mat, Cov) or (mat.isdiagonal and imat < len(mats) - 2):
+                # dropping the zero cols of an inner diagonal
+                # does not change the product
+                mat = mat._take(mat_idxs, mat_idxs, common, common)
+            else:
+                mat = mat._take(row_idxs=mat_idxs, row_names=common)
+        elif ops[-1].shape[1] != mat.shape[0]:
+            raise Exception("chain_product(): matrices are not aligned: " +\
+                            str(ops[-1].shape) + ' ' + str(mat.shape))
+        ops.append(mat)
+    row_names, col_names = ops[0].row_names, ops[-1].col_names
+
+    # merge neighbouring diagonals
+    terms = []
+    for mat in ops:
+        if mat.isdiagonal and len(terms) > 0 and terms[-1][1]:
+            terms[-1][0] = terms[-1][0] * mat.x[:, 0]
+        elif mat.isdiagonal:
+            terms.append([mat.x[:, 0], True])
+        else:
+            terms.append([mat.x, False])
+    if len(terms) == 1 and terms[0][1]:
+        return type(mats[0])(x=terms[0][0].reshape(-1, 1), row_names=row_names,
+                             col_names=col_names, isdiagonal=True,
+                             autoalign=mats[0].autoalign)
+
+    # fold each diagonal into the cheaper neighbour
+    xs = []
+    for i, (x, isdiagonal) in enumerate(terms):
+        if not isdiagonal:
+            xs.append(x)
+            continue
+        right = terms[i + 1][0] if i + 1 < len(terms) else None
+        if len(xs) > 0 and (right is None or np.prod(xs[-1].shape) <=
+                            np.prod(right.shape)):
+            xs[-1] = _scale(xs[-1], x, 1)
+        else:
+            terms[i + 1][0] = _scale(right, x, 0)
+
+    dims = [xs[0].shape[0]] + [x.shape[1] for x in xs]
+    x = _chain_eval(xs, _chain_order(dims), 0, len(xs) - 1)
+    if not _issparse(x):
+        x = np.atleast_2d(x)
+    return type(mats[0])(x=x, row_names=row_names, col_names=col_names,
+                         autoalign=mats[0].autoalign)
+
 
+def _take_chain_cols(ops, k, idxs, names):
+    """take the `idxs` cols of `ops[k]` in a chain of aligned operands.  An
+    inner diagonal operand is taken along both axes, so it stays diagonal,
+    and the cols of the operands to its left are taken to match
+    """
+    op = ops[k]
+    if op.isdiagonal and k > 0:
+        ops[k] = op._take(idxs, idxs, names, names)
+        _take_chain_cols(ops, k - 1, idxs, names)
+    elif op.isdiagonal and isinstance(op, Cov):
+        ops[k] = op._take(idxs, idxs, names, names)
     else:
-        col_names = copy.deepcopy(mats[0].col_names)
-        row_names = []
-        for mat in mats:
-            row_names.extend(copy.deepcopy(mat.row_names))
-        x = mats[0].newx.copy()
-        for mat in mats[1:]:
-            mat.align(mats[0].col_names, axis=1)
-            other_x = mat.newx
-            x = np.append(x, other_x, axis=0)
-    return Matrix(x=x, row_names=row_names, col_names=col_names)
+        ops[k] = op._take(col_idxs=idxs, col_names=names)
 
 
 def get_common_elements(list1, list2):
@@ -128,6 +551,67 @@ def get_common_elements(list1, list2):
     return result
 
 
+#: the maximum number of alignment plans kept by `get_alignment_plan()`
+ALIGNMENT_PLAN_CACHE_SIZE = 32
+_alignment_plans = OrderedDict()
+
+
+def get_alignment_plan(mat1, axis1, mat2, axis2):
+    """get the (cached) common names and gather indices that align one axis
+    of `mat1` with one axis of `mat2`.  Used to support auto align
+
+    Args:
+        mat1 (`Matrix`): the first matrix
+        axis1 (`int`): the axis of `mat1` to align (0 for rows, 1 for cols)
+        mat2 (`Matrix`): the second matrix
+        axis2 (`int`): the axis of `mat2` to align (0 for rows, 1 for cols)
+
+    Returns:
+        tuple containing
+
+        - **[`str`]**: the common names, ordered as in `mat1`
+        - **numpy.ndarray**: indices of the common names along `axis1` of `mat1`
+        - **numpy.ndarray**: indices of the common names along `axis2` of `mat2`
+
+    Note:
+        plans are keyed by a fingerprint (hash and length) of the two name lists,
+        so repeated products of matrices with the same names skip the name work.
+        A plan is only used if its names equal the current names.  Up to
+        `ALIGNMENT_PLAN_CACHE_SIZE` plans are retained
+
+    """
+    names1 = mat1.row_names if axis1 == 0 else mat1.col_names
+    names2 = mat2.row_names if axis2 == 0 else mat2.col_names
+    key = (mat1._names_key(axis1), mat2._names_key(axis2))
+    plan = _alignment_plans.get(key, None)
+    if plan is not None and plan[0] == names1 and plan[1] == names2:
+        return plan[2:]
+    if plan is not None:
+        # names edited in place (or a fingerprint collision): rebuild the
+        # name lookups and fingerprints of both matrices
+        for mat, axis in [(mat1, axis1), (mat2, axis2)]:
+            if axis == 0:
+                mat.row_names = mat.row_names
+            else:
+                mat.col_names = mat.col_names
+        key = (mat1._names_key(axis1), mat2._names_key(axis2))
+    common = get_common_elements(names1, names2)
+    lookup1 = mat1.row_idxs if axis1 == 0 else mat1.col_idxs
+    lookup2 = mat2.row_idxs if axis2 == 0 else mat2.col_idxs
+    idx1 = np.array([lookup1[name] for name in common], dtype=np.int64)
+    idx2 = np.array([lookup2[name] for name in common], dtype=np.int64)
+    _alignment_plans[key] = (list(names1), list(names2), common, idx1, idx2)
+    while len(_alignment_plans) > ALIGNMENT_PLAN_CACHE_SIZE:
+        _alignment_plans.popitem(last=False)
+    return common, idx1, idx2
+
+
+def _drop_alignment_plans(names_key):
+    """remove the alignment plans of a (stale) name fingerprint"""
+    for key in [key for key in _alignment_plans if names_key in key]:
+        del _alignment_plans[key]
+
+
 class Matrix(object):
     """Easy linear algebra in the PEST(++) realm
 
@@ -152,9 +636,23 @@ class Matrix(object):
         this class makes heavy use of property decorators to encapsulate
         private attributes
 
+        `x` can also be a `scipy.sparse` matrix (see `Matrix.from_binary(sparse=True)`),
+        in which case sparse storage is preserved through `Matrix.T`, `Matrix.get()`,
+        dot products, `Matrix.hadamard_product()` and `Matrix.to_coo()`
+
+        the dtype of `x` (for example `numpy.float32`, see `Matrix.astype()` and
+        `Matrix.default_dtype`) is preserved through arithmetic.  Inversion,
+        SVD and Cholesky factorization are computed in double precision and the
+        results are cast back to the dtype of `x`
+
     """
     integer = np.int32
     double = np.float64
+    #: numeric dtype of the values created by the readers (`Matrix.from_binary()`,
+    #: `Matrix.from_ascii()`) and by `Ensemble` draws when no `dtype` is passed.
+    #: Set to `numpy.float32` to keep values in single precision.  The binary
+    #: file records are always double precision
+    default_dtype = np.float64
     char = np.uint8
 
     binary_header_dt = np.dtype([('itemp1', integer),
@@ -165,6 +663,16 @@ class Matrix(object):
     coo_rec_dt = np.dtype([('i', integer),('j', integer),
                           ('dtemp', double)])
 
+    #: number of values converted in a single pass by `Matrix.read_ascii()`
+    ascii_chunk = 1000000
+
+    #: on-disk cache of the SVD (`Matrix.u`, `Matrix.s`, `Matrix.v`) and the
+    #: Cholesky and eigen factorizations of `Cov`, keyed by `Matrix.fingerprint()`.
+    #: False disables the cache, True writes the cache files next to the file
+    #: a `Matrix` was loaded from (`Matrix.filename`) and a directory name
+    #: writes all cache files to that directory
+    factor_cache = False
+
     par_length = 12
     obs_length = 20
     new_par_length = 200
@@ -173,13 +681,17 @@ class Matrix(object):
     def __init__(self, x=None, row_names=[], col_names=[], isdiagonal=False,
                  autoalign=True):
 
-        self.col_names, self.row_names = [], []
-        _ = [self.col_names.append(str(c).lower()) for c in col_names]
-        _ = [self.row_names.append(str(r).lower()) for r in row_names]
+        self.__row_idxs = None
+        self.__col_idxs = None
+        self.__row_key = None
+        self.__col_key = None
+        self.col_names = [str(c).lower() for c in col_names]
+        self.row_names = [str(r).lower() for r in row_names]
         self.__x = None
         self.__u = None
         self.__s = None
         self.__v = None
+        self.__svds = {}
         if x is not None:
             if x.ndim != 2:
                 raise Exception("ndim != 2")
@@ -211,6 +723,155 @@ class Matrix(object):
 
         self.isdiagonal = bool(isdiagonal)
         self.autoalign = bool(autoalign)
+        self.filename = None
+        """`str`: the file `Matrix` was loaded from, if any.  Used to place
+        `Matrix.factor_cache` files"""
+
+    @property
+    def row_names(self):
+        """the row names of `Matrix`
+
+        Returns:
+            [`str`]: list of row names
+
+        Note:
+            the name-to-index lookup used by `Matrix.indices()` is cached and
+            rebuilt when `row_names` is reassigned.  Reassign rather than
+            modify elements in place
+
+        """
+        return self.__row_names
+
+    @row_names.setter
+    def row_names(self, names):
+        if self.__row_key is not None:
+            _drop_alignment_plans(self.__row_key)
+        self.__row_names = names
+        self.__row_idxs = None
+        self.__row_key = None
+
+    @property
+    def col_names(self):
+        """the column names of `Matrix`
+
+        Returns:
+            [`str`]: list of column names
+
+        Note:
+            the name-to-index lookup used by `Matrix.indices()` is cached and
+            rebuilt when `col_names` is reassigned.  Reassign rather than
+            modify elements in place
+
+        """
+        return self.__col_names
+
+    @col_names.setter
+    def col_names(self, names):
+        if self.__col_key is not None:
+            _drop_alignment_plans(self.__col_key)
+        self.__col_names = names
+        self.__col_idxs = None
+        self.__col_key = None
+
+    @property
+    def row_idxs(self):
+        """cached row name to row index lookup
+
+        Returns:
+            `dict`: row name keys and integer index values
+
+        """
+        if self.__row_idxs is None or len(self.__row_idxs) != len(self.__row_names):
+            self.__row_idxs = {name: i for i, name in enumerate(self.__row_names)}
+        return self.__row_idxs
+
+    @property
+    def col_idxs(self):
+        """cached column name to column index lookup
+
+        Returns:
+            `dict`: column name keys and integer index values
+
+        """
+        if self.__col_idxs is None or len(self.__col_idxs) != len(self.__col_names):
+            self.__col_idxs = {name: i for i, name in enumerate(self.__col_names)}
+        return self.__col_idxs
+
+    def _names_key(self, axis):
+        """cached fingerprint (hash, length) of the row (axis 0) or
+        column (axis 1) names.  Used to key alignment plans
+        """
+        if axis == 0:
+            if self.__row_key is None or self.__row_key[1] != len(self.__row_names):
+                self.__row_key = (hash(tuple(self.__row_names)), len(self.__row_names))
+            return self.__row_key
+        if self.__col_key is None or self.__col_key[1] != len(self.__col_names):
+            self.__col_key = (hash(tuple(self.__col_names)), len(self.__col_names))
+        return self.__col_key
+
+    def _take(self, row_idxs=None, col_idxs=None, row_names=None, col_names=None):
+        """extract a sub-matrix by integer indices.  Used by the auto-align
+        operators with the gather indices from `get_alignment_plan()`
+
+        Args:
+            row_idxs (`numpy.ndarray`): row indices. If None, all rows are kept
+            col_idxs (`numpy.ndarray`): col indices. If None, all cols are kept
+            row_names ([`str`]): names of the extracted rows, if already known
+            col_names ([`str`]): names of the extracted cols, if already known
+
+        Returns:
+            `Matrix`: new sub-matrix.  Diagonal matrices stay diagonal if the
+            same indices are taken along both axes
+
+        """
+        if row_names is None:
+            row_names = self.row_names if row_idxs is None else \
+                [self.row_names[i] for i in row_idxs]
+        if col_names is None:
+            col_names = self.col_names if col_idxs is None else \
+                [self.col_names[i] for i in col_idxs]
+        isdiagonal = False
+        if self.isdiagonal:
+            if row_idxs is not None and col_idxs is not None and \
+                    np.array_equal(row_idxs, col_idxs):
+                x = self.__x[row_idxs].copy()
+                isdiagonal = True
+            else:
+                x = np.diag(self.__x[:, 0])
+                if row_idxs is not None:
+                    x = x[row_idxs, :]
+                if col_idxs is not None:
+                    x = x[:, col_idxs]
+        else:
+            x = self.__x
+            if row_idxs is not None:
+                x = x[row_idxs, :]
+            if col_idxs is not None:
+                if self.issparse:
+                    x = x.tocsc()[:, col_idxs].tocsr()
+                else:
+                    x = x[:, col_idxs]
+            if x is self.__x:
+                x = x.copy()
+        # names came from self so they are already lower case
+        new = type(self)(x=x, isdiagonal=isdiagonal, autoalign=self.autoalign)
+        new.row_names = list(row_names)
+        new.col_names = list(col_names)
+        return new
+
+    def _element_aligned_pair(self, other, caller):
+        """align self and other for element-wise operations using
+        cached alignment plans
+        """
+        common_rows, self_ridxs, other_ridxs = get_alignment_plan(self, 0, other, 0)
+        common_cols, self_cidxs, other_cidxs = get_alignment_plan(self, 1, other, 1)
+        if len(common_rows) == 0:
+            raise Exception("Matrix.{0} error: no common rows".format(caller))
+        if len(common_cols) == 0:
+            raise Exception("Matrix.{0} error: no common cols".format(caller))
+        first = self._take(self_ridxs, self_cidxs, common_rows, common_cols)
+        second = other._take(other_ridxs, other_cidxs, common_rows, common_cols)
+        return first, second
 
     def reset_x(self,x,copy=True):
         """reset self.__x private attribute
@@ -345,20 +1006,7 @@ class Matrix(object):
             elif isinstance(other, Matrix):
                 if self.autoalign and other.autoalign \
                         and not self.element_isaligned(other):
-                    common_rows = get_common_elements(self.row_names,
-                                                      other.row_names)
-                    common_cols = get_common_elements(self.col_names,
-                                                      other.col_names)
-
-                    if len(common_rows) == 0:
-                        raise Exception("Matrix.__sub__ error: no common rows")
-
-                    if len(common_cols) == 0:
-                        raise Exception("Matrix.__sub__ error: no common cols")
-                    first = self.get(row_names=common_rows,
-                                     col_names=common_cols)
-                    second = other.get(row_names=common_rows,
-                                       col_names=common_cols)
+                    first, second = self._element_aligned_pair(other, "__sub__")
                 else:
                     assert self.shape == other.shape, \
                         "Matrix.__sub__():shape mismatch: " +\
@@ -426,18 +1074,7 @@ class Matrix(object):
         elif isinstance(other, Matrix):
             if self.autoalign and other.autoalign \
                     and not self.element_isaligned(other):
-                common_rows = get_common_elements(self.row_names,
-                                                  other.row_names)
-                common_cols = get_common_elements(self.col_names,
-                                                  other.col_names)
-                if len(common_rows) == 0:
-                    raise Exception("Matrix.__add__ error: no common rows")
-
-                if len(common_cols) == 0:
-                    raise Exception("Matrix.__add__ error: no common cols")
-
-                first = self.get(row_names=common_rows, col_names=common_cols)
-                second = other.get(row_names=common_rows, col_names=common_cols)
+                first, second = self._element_aligned_pair(other, "__add__")
             else:
                 assert self.shape == other.shape, \
                     "Matrix.__add__(): shape mismatch: " +\
@@ -499,24 +1136,16 @@ class Matrix(object):
             if self.isdiagonal:
                 raise NotImplementedError("Matrix.hadamard_product() not supported for" +
                                           "diagonal self")
+            elif self.issparse:
+                return type(self)(x=self.x.multiply(other).tocsr(), row_names=self.row_names,
+                                  col_names=self.col_names)
             else:
                 return type(self)(x=self.x * other, row_names=self.row_names,
                                   col_names=self.col_names)
         elif isinstance(other, Matrix):
             if self.autoalign and other.autoalign \
                     and not self.element_isaligned(other):
-                common_rows = get_common_elements(self.row_names,
-                                                  other.row_names)
-                common_cols = get_common_elements(self.col_names,
-                                                  other.col_names)
-                if len(common_rows) == 0:
-                    raise Exception("Matrix.hadamard_product error: no common rows")
-
-                if len(common_cols) == 0:
-                    raise Exception("Matrix.hadamard_product error: no common cols")
-
-                first = self.get(row_names=common_rows, col_names=common_cols)
-                second = other.get(row_names=common_rows, col_names=common_cols)
+                first, second = self._element_aligned_pair(other, "hadamard_product")
             else:
                 if other.shape != self.shape:
                     raise Exception("Matrix.hadamard_product(): shape mismatch: " + \
@@ -540,6 +1169,13 @@ class Matrix(object):
             #     #    x[j, j] *= second.x[j]
             #     return type(self)(x=first.x * second.as_2d, row_names=first.row_names,
             #                       col_names=first.col_names)
+            elif first.issparse or second.issparse:
+                if first.issparse:
+                    x = first.x.multiply(second._sparse_operand())
+                else:
+                    x = second.x.multiply(first._sparse_operand())
+                return type(self)(x=x.tocsr(), row_names=first.row_names,
+                                  col_names=first.col_names)
             else:
                 return type(self)(x=first.as_2d * second.as_2d,
                                   row_names=first.row_names,
@@ -569,6 +1205,10 @@ class Matrix(object):
         if isinstance(other, pd.DataFrame):
             other = Matrix.from_dataframe(other)
 
+        if isinstance(other, (BlockDiagonalCov, PackedCov)) and \
+                not isinstance(self, (BlockDiagonalCov, PackedCov)):
+            return other.__rmul__(self)
+
         if np.isscalar(other):
             return type(self)(x=self.x.copy() * other,
                               row_names=self.row_names,
@@ -583,12 +1223,14 @@ class Matrix(object):
             if self.isdiagonal:
                 return type(self)(x=np.dot(np.diag(self.__x.flatten()).transpose(),
                                            other))
+            elif self.issparse:
+                return type(self)(x=np.atleast_2d(_dot(self.__x, other)))
             else:
                 return type(self)(x=np.atleast_2d(np.dot(self.__x, other)))
         elif isinstance(other, Matrix):
             if self.autoalign and other.autoalign\
                and not self.mult_isaligned(other):
-                common = get_common_elements(self.col_names, other.row_names)
+                common, self_idxs, other_idxs = get_alignment_plan(self, 1, other, 0)
                 if len(common) == 0:
                     raise Exception("Matrix.__mult__():self.col_names " +\
                                        "and other.row_names" +\
@@ -597,14 +1239,13 @@ class Matrix(object):
                                        ','.join(other.row_names[:9]))
                 # these should be aligned
                 if isinstance(self, Cov):
-                    first = self.get(row_names=common, col_names=common)
+                    first = self._take(self_idxs, self_idxs, common, common)
                 else:
-                    first = self.get(row_names=self.row_names, col_names=common)
+                    first = self._take(col_idxs=self_idxs, col_names=common)
                 if isinstance(other, Cov):
-                    second = other.get(row_names=common, col_names=common)
+                    second = other._take(other_idxs, other_idxs, common, common)
                 else:
-                    second = other.get(row_names=common,
-                                       col_names=other.col_names)
+                    second = other._take(row_idxs=other_idxs, row_names=common)
 
             else:
                 if self.shape[1] != other.shape[0]:
@@ -618,6 +1259,14 @@ class Matrix(object):
                                    col_names=second.col_names)
                 elem_prod.isdiagonal = True
                 return elem_prod
+            elif first.isdiagonal and second.issparse:
+                return type(self)(x=_dot(first._sparse_operand(), second.x).tocsr(),
+                                  row_names=first.row_names,
+                                  col_names=second.col_names)
+            elif second.isdiagonal and first.issparse:
+                return type(self)(x=_dot(first.x, second._sparse_operand()).tocsr(),
+                                  row_names=first.row_names,
+                                  col_names=second.col_names)
             elif first.isdiagonal:
                 ox = second.newx
                 for j in range(first.shape[0]):
@@ -632,7 +1281,7 @@ class Matrix(object):
                 return type(self)(x=x, row_names=first.row_names,
                               col_names=second.col_names)
             else:
-                return type(self)(np.dot(first.x, second.x),
+                return type(self)(_dot(first.x, second.x),
                               row_names=first.row_names,
                               col_names=second.col_names)
         else:
@@ -672,7 +1321,7 @@ class Matrix(object):
                 return type(self)(x=np.dot(other,np.diag(self.__x.flatten()).\
                                            transpose()))
             else:
-                return type(self)(x=np.dot(other,self.__x))
+                return type(self)(x=_dot(other,self.__x))
         elif isinstance(other, Matrix):
             if self.autoalign and other.autoalign \
                     and not self.mult_isaligned(other):
@@ -704,6 +1353,14 @@ class Matrix(object):
                                    col_names=second.col_names)
                 elem_prod.isdiagonal = True
                 return elem_prod
+            elif first.isdiagonal and second.issparse:
+                return type(self)(x=_dot(first._sparse_operand(), second.x).tocsr(),
+                                  row_names=first.row_names,
+                                  col_names=second.col_names)
+            elif second.isdiagonal and first.issparse:
+                return type(self)(x=_dot(first.x, second._sparse_operand()).tocsr(),
+                                  row_names=first.row_names,
+                                  col_names=second.col_names)
             elif first.isdiagonal:
                 ox = second.newx
                 for j in range(first.shape[0]):
@@ -718,7 +1375,7 @@ class Matrix(object):
                 return type(self)(x=x, row_names=first.row_names,
                               col_names=second.col_names)
             else:
-                return type(self)(np.dot(first.x, second.x),
+                return type(self)(_dot(first.x, second.x),
                               row_names=first.row_names,
                               col_names=second.col_names)
         else:
@@ -737,21 +1394,31 @@ class Matrix(object):
         else:
             # just a pointer to x
             x = self.x
-        try:
-
-            u, s, v = np.linalg.svd(x, full_matrices=True)
-            v = v.transpose()
-        except Exception as e:
-            print("standard SVD failed: {0}".format(str(e)))
+        dtype = x.dtype
+        cache_file = _factor_cache_file(self, "svd")
+        factors = _load_factors(cache_file)
+        if factors is not None:
+            u, s, v = factors
+        else:
+            x = _upcast(x)
             try:
-                v, s, u = np.linalg.svd(x.transpose(), full_matrices=True)
-                u = u.transpose()
+
+                u, s, v = np.linalg.svd(x, full_matrices=True)
+                v = v.transpose()
             except Exception as e:
-                np.savetxt("failed_svd.dat",x,fmt="%15.6E")
-                raise Exception("Matrix.__set_svd(): " +
-                                "unable to compute SVD of self.x, " +
-                                "saved matrix to 'failed_svd.dat' -- {0}".\
-                                format(str(e)))
+                print("standard SVD failed: {0}".format(str(e)))
+                try:
+                    v, s, u = np.linalg.svd(x.transpose(), full_matrices=True)
+                    u = u.transpose()
+                except Exception as e:
+                    np.savetxt("failed_svd.dat",x,fmt="%15.6E")
+                    raise Exception("Matrix.__set_svd(): " +
+                                    "unable to compute SVD of self.x, " +
+                                    "saved matrix to 'failed_svd.dat' -- {0}".\
+                                    format(str(e)))
+            u, s, v = u.astype(dtype, copy=False), s.astype(dtype, copy=False),\
+                      v.astype(dtype, copy=False)
+            _save_factors(cache_file, [u, s, v])
 
         col_names = ["left_sing_vec_" + str(i + 1) for i in range(u.shape[1])]
         self.__u = Matrix(x=u, row_names=self.row_names,
@@ -766,6 +1433,119 @@ class Matrix(object):
         self.__v = Matrix(v, row_names=self.col_names, col_names=col_names,
                           autoalign=False)
 
+    def svd(self, k=None, method="full", oversample=10, n_iter=4, seed=None):
+        """(optionally truncated) singular value decomposition
+
+        Args:
+            k (`int`, optional): number of leading singular components to compute.
+                If None, all components are returned.  Default is None
+            method (`str`): "full", "randomized" or "lanczos".  "full" uses
+                `numpy.linalg.svd` (same as `Matrix.u`, `Matrix.s` and `Matrix.v`).
+                "randomized" uses randomized range finding and "lanczos" uses
+                `scipy.sparse.linalg.svds`, both of which only compute the leading
+                `k` components.  Default is "full"
+            oversample (`int`): extra random samples for the "randomized" method.
+                Default is 10
+            n_iter (`int`): number of power iterations for the "randomized"
+                method.  Default is 4
+            seed (`int`, optional): random seed for the "randomized" method
+
+        Returns:
+            tuple containing
+
+            - **Matrix**: left singular vectors.  Shape is `(Matrix.shape[0], k)`
+            - **Matrix**: singular value (diagonal) matrix.  Shape is `(k, k)`
+            - **Matrix**: right singular vectors.  Shape is `(Matrix.shape[1], k)`
+
+        Note:
+            truncated results are cached by `method`; a later call with
+            the same or a smaller `k` reuses them.  If the full SVD has already
+            been computed, it is sliced instead
+
+        Example::
+
+            jco = pyemu.Jco.from_binary("my.jcb")
+            u,s,v = jco.svd(k=200,method="randomized")
+
+        """
+        method = method.lower()
+        if method not in ["full", "randomized", "lanczos"]:
+            raise Exception("Matrix.svd(): unrecognized method: {0}".format(method))
+        mn = min(self.shape)
+        if k is None:
+            k = mn
+        k = min(int(k), mn)
+        if k < 1:
+            raise Exception("Matrix.svd(): k must be at least 1")
+        if method == "full" or self.__s is not None or \
+                (method == "lanczos" and k >= mn):
+            u, s, v = self.u.x[:, :k], self.s.x[:k, 0], self.v.x[:, :k]
+        elif method in self.__svds and self.__svds[method][1].shape[0] >= k:
+            u, s, v = [c[:, :k] if c.ndim == 2 else c[:k] for c in self.__svds[method]]
+        else:
+            if self.isdiagonal:
+                x = self.as_2d
+            else:
+                x = self.__x
+            dtype = x.dtype
+            x = _upcast(x)
+            if method == "randomized":
+                u, s, v = _randomized_svd(x, k, oversample=oversample,
+                                          n_iter=n_iter, seed=seed)
+            else:
+                u, s, v = _lanczos_svd(x, k)
+            u, s, v = [c.astype(dtype, copy=False) for c in (u, s, v)]
+            self.__svds[method] = (u, s, v)
+        u = Matrix(x=u, row_names=self.row_names,
+                   col_names=["left_sing_vec_" + str(i + 1) for i in range(k)],
+                   autoalign=False)
+        sing_names = ["sing_val_" + str(i + 1) for i in range(k)]
+        s = Matrix(x=np.atleast_2d(s).transpose(), row_names=sing_names,
+                   col_names=sing_names, isdiagonal=True, autoalign=False)
+        v = Matrix(x=v, row_names=self.col_names,
+                   col_names=["right_sing_vec_" + str(i + 1) for i in range(k)],
+                   autoalign=False)
+        return u, s, v
+
+    def fingerprint(self, sample=None):
+        """content fingerprint of `Matrix`: a hash of the names, shape,
+        `isdiagonal` flag, dtype and numeric values
+
+        Args:
+            sample (`int`, optional): number of evenly spaced values to hash.
+                If None, all values are hashed.  Default is None
+
+        Returns:
+            `str`: hex digest that keys `Matrix.factor_cache`
+
+        Note:
+            sampled fingerprints are cheaper for large matrices but do not
+            see changes to values that are not sampled
+
+        Example::
+
+            jco = pyemu.Jco.from_binary("pest.jcb")
+            print(jco.fingerprint())
+
+        """
+        h = hashlib.sha1()
+        for names in [self.row_names, self.col_names]:
+            h.update("\n".join(names).encode())
+            h.update(b"\0")
+        h.update("{0}{1}{2}".format(self.shape, self.isdiagonal,
+                                    np.dtype(self.dtype).str).encode())
+        if self.issparse:
+            x = self.x.tocsr()
+            arrays = [x.data, x.indices, x.indptr]
+        else:
+            arrays = [self.x]
+        for a in arrays:
+            a = np.ascontiguousarray(a).ravel()
+            if sample is not None and a.shape[0] > sample:
+                a = a[np.linspace(0, a.shape[0] - 1, int(sample)).astype(np.int64)]
+            h.update(a)
+        return h.hexdigest()
+
     def mult_isaligned(self, other):
         """check if matrices are aligned for dot product multiplication
 
@@ -836,10 +1616,97 @@ class Matrix(object):
             `numpy.ndarray` : numpy.ndarray
 
         """
+        if self.issparse:
+            return self.x.toarray()
         if not self.isdiagonal:
             return self.x
         return np.diag(self.x.flatten())
 
+    @property
+    def issparse(self):
+        """flag for `scipy.sparse` storage of `Matrix.x`
+
+        Returns:
+            `bool`: True if `Matrix.x` is a `scipy.sparse` matrix
+
+        """
+        return _issparse(self.__x)
+
+    def _sparse_operand(self):
+        """get a `scipy.sparse` representation of `Matrix.x` to combine with
+        a sparse operand.  Diagonal matrices become sparse diagonal matrices
+
+        """
+        sps = _sparse_module()
+        if self.issparse:
+            return self.__x
+        if self.isdiagonal:
+            return sps.diags(self.__x.flatten())
+        return sps.csr_matrix(self.__x)
+
+    def to_sparse(self):
+        """get a copy of `Matrix` that uses `scipy.sparse` (CSR) storage
+
+        Returns:
+            `Matrix`: sparse-storage copy of `Matrix`
+
+        Note:
+            diagonal matrices are expanded to a 2D sparse form
+
+        """
+        sps = _sparse_module()
+        if self.issparse:
+            return self.copy()
+        if self.isdiagonal:
+            x = sps.diags(self.__x.flatten()).tocsr()
+        else:
+            x = sps.csr_matrix(self.__x)
+        return type(self)(x=x, row_names=self.row_names, col_names=self.col_names,
+                          autoalign=self.autoalign)
+
+    def to_dense(self):
+        """get a copy of `Matrix` that uses dense (`numpy.ndarray`) storage
+
+        Returns:
+            `Matrix`: dense-storage copy of `Matrix`
+
+        """
+        if not self.issparse:
+            return self.copy()
+        return type(self)(x=self.__x.toarray(), row_names=self.row_names,
+                          col_names=self.col_names, autoalign=self.autoalign)
+
+    @property
+    def dtype(self):
+        """the numeric dtype of `Matrix.x`
+
+        Returns:
+            `numpy.dtype`: dtype of the numeric values.  None if `Matrix.x` is None
+
+        """
+        if self.__x is None:
+            return None
+        return self.__x.dtype
+
+    def astype(self, dtype):
+        """get a copy of `Matrix` with the numeric values cast to `dtype`
+
+        Args:
+            dtype (`numpy.dtype`): the new dtype, for example `numpy.float32`
+
+        Returns:
+            `Matrix`: copy of `Matrix` with `dtype` values
+
+        Example::
+
+            jco = pyemu.Jco.from_binary("my.jcb")
+            jco32 = jco.astype(np.float32)
+
+        """
+        return type(self)(x=self.__x.astype(dtype), row_names=self.row_names,
+                          col_names=self.col_names, isdiagonal=self.isdiagonal,
+                          autoalign=self.autoalign)
+
 
     def to_2d(self):
         """ get a 2D `Matrix` representation of `Matrix`.  If not `Matrix.isdiagonal`, simply
@@ -910,6 +1777,11 @@ class Matrix(object):
             `Matrix`: transpose of `Matrix`
 
         """
+        if self.issparse:
+            return type(self)(x=self.__x.transpose().tocsr(),
+                              row_names=self.col_names,
+                              col_names=self.row_names,
+                              autoalign=self.autoalign)
         if not self.isdiagonal:
             return type(self)(x=self.__x.copy().transpose(),
                               row_names=self.col_names,
@@ -929,7 +1801,7 @@ class Matrix(object):
             `Matrix`: inverse of `Matrix`
 
         Note:
-            uses `numpy.linalg.inv` for the inversion
+            uses `numpy.linalg.inv` for the inversion, in double precision
 
         Example::
 
@@ -952,7 +1824,8 @@ class Matrix(object):
                               col_names=self.col_names,
                               autoalign=self.autoalign)
         else:
-            return type(self)(x=np.linalg.inv(self.__x), row_names=self.row_names,
+            inv = np.linalg.inv(_upcast(self.__x)).astype(self.__x.dtype, copy=False)
+            return type(self)(x=inv, row_names=self.row_names,
                               col_names=self.col_names,
                               autoalign=self.autoalign)
 
@@ -1008,7 +1881,8 @@ class Matrix(object):
 
         return Matrix.get_maxsing_from_s(self.s.x, eigthresh=eigthresh)
 
-    def pseudo_inv_components(self,maxsing=None,eigthresh=1.0e-5,truncate=True):
+    def pseudo_inv_components(self,maxsing=None,eigthresh=1.0e-5,truncate=True,
+                              method="full"):
         """ Get the (optionally) truncated SVD components
 
         Args:
@@ -1019,6 +1893,9 @@ class Matrix(object):
                 1.0e-5
             truncate (`bool`): flag to truncate components. If False, U, s, and V will be
                 zeroed out at locations greater than `maxsing` instead of truncated. Default is True
+            method (`str`): SVD method, see `Matrix.svd()`.  "randomized" and "lanczos" only
+                compute the leading `maxsing` components, so `maxsing` is required and
+                `truncate` must be True.  Default is "full"
 
         Returns:
             tuple containing
@@ -1035,6 +1912,17 @@ class Matrix(object):
             resolution_matrix.to_ascii("resol.mat")
 
         """
+        if method.lower() != "full":
+            if maxsing is None or not truncate:
+                raise Exception("Matrix.pseudo_inv_components(): 'maxsing' and " +\
+                                "truncate=True are required for method " +\
+                                "'{0}'".format(method))
+            u, s, v = self.svd(k=maxsing, method=method)
+            maxsing = min(Matrix.get_maxsing_from_s(s.x, eigthresh=eigthresh),
+                          maxsing)
+            s = Matrix(x=np.diag(s.x[:maxsing, 0]), row_names=self.row_names[:maxsing],
+                       col_names=self.col_names[:maxsing], autoalign=False)
+            return u[:, :maxsing], s, v[:, :maxsing]
 
         if maxsing is None:
             maxsing = self.get_maxsing(eigthresh=eigthresh)
@@ -1058,7 +1946,7 @@ class Matrix(object):
 
         return u,s,v
 
-    def pseudo_inv(self,maxsing=None,eigthresh=1.0e-5):
+    def pseudo_inv(self,maxsing=None,eigthresh=1.0e-5,method="full"):
         """ The pseudo inverse of self.  Formed using truncated singular
         value decomposition and `Matrix.pseudo_inv_components`
 
@@ -1068,10 +1956,17 @@ class Matrix(object):
             `eigthresh` : (`float`, optional): the ratio of largest to smallest singular
                 components to use for truncation.  Ignored if maxsing is not None.  Default is
                 1.0e-5
+            method (`str`): SVD method, see `Matrix.svd()`.  "randomized" and "lanczos"
+                require `maxsing`.  Default is "full"
 
         Returns:
               `Matrix`: the truncated-SVD pseudo inverse of `Matrix` (V_1 * s_1^-1 * U^T)
         """
+        if method.lower() != "full":
+            u, s, v = self.pseudo_inv_components(maxsing=maxsing, eigthresh=eigthresh,
+                                                 method=method)
+            s.reset_x(np.diag(1.0 / np.diag(s.x)), copy=False)
+            return v * s * u.T
         if maxsing is None:
             maxsing = self.get_maxsing(eigthresh=eigthresh)
         full_s = self.full_s.T
@@ -1196,20 +2091,34 @@ class Matrix(object):
 
         self_row_idxs = {row_names[i]: i for i in range(len(row_names))}
         self_col_idxs = {col_names[i]: i for i in range(len(col_names))}
+        return Matrix._find_indices(names, self_row_idxs, self_col_idxs, axis=axis)
 
-        scol = set(col_names)
-        srow = set(row_names)
-        row_idxs = []
-        col_idxs = []
-        for name in names:
-            name = name.lower()
-            if name not in scol \
-                    and name not in srow:
+    @staticmethod
+    def _find_indices(names, row_idxs_dict, col_idxs_dict, axis=None):
+        """look up name indices using prebuilt name-to-index dicts
+
+        Args:
+            names ([`str`]): list of names to look for
+            row_idxs_dict (`dict`): row name to index lookup
+            col_idxs_dict (`dict`): col name to index lookup
+            axis (`int`, optional): axis to search along.  If None, search both.
+
+        Returns:
+            `numpy.ndarray`: array of (integer) index locations.  If `axis` is
+            `None`, a 2 `numpy.ndarrays` of both row and column name indices is returned
+
+        """
+        row_idxs = []
+        col_idxs = []
+        for name in names:
+            name = name.lower()
+            if name not in col_idxs_dict \
+                    and name not in row_idxs_dict:
                 raise Exception('Matrix.indices(): name not found: ' + name)
-            if name in scol:
-                col_idxs.append(self_col_idxs[name])
-            if name.lower() in srow:
-                row_idxs.append(self_row_idxs[name])
+            if name in col_idxs_dict:
+                col_idxs.append(col_idxs_dict[name])
+            if name in row_idxs_dict:
+                row_idxs.append(row_idxs_dict[name])
         if axis is None:
             return np.array(row_idxs, dtype=np.int32), \
                    np.array(col_idxs, dtype=np.int32)
@@ -1243,10 +2152,11 @@ class Matrix(object):
             `None`, a 2 `numpy.ndarrays` of both row and column name indices is returned
 
         Note:
-            thin wrapper around `Matrix.find_rowcol_indices` static method
+            uses the cached `Matrix.row_idxs` and `Matrix.col_idxs` lookups so the
+            cost scales with `len(names)`, not the size of `Matrix`
 
         """
-        return Matrix.find_rowcol_indices(names,self.row_names,self.col_names,axis=axis)
+        return Matrix._find_indices(names, self.row_idxs, self.col_idxs, axis=axis)
 
 
     def align(self, names, axis=None):
@@ -1292,7 +2202,7 @@ class Matrix(object):
                     raise Exception("Matrix.align(): not all names found in self.col_names")
                 self.__x = self.__x[:, col_idxs]
                 col_names = []
-                _ = [col_names.append(self.col_names[i]) for i in row_idxs]
+                _ = [col_names.append(self.col_names[i]) for i in col_idxs]
                 self.col_names = col_names
             else:
                 raise Exception("Matrix.align(): axis argument to align()" +
@@ -1322,7 +2232,8 @@ class Matrix(object):
         if col_names is not None and not isinstance(col_names, list):
             col_names = [col_names]
 
-        if isinstance(self,Cov) and (row_names is None or col_names is None ):
+        if isinstance(self,Cov) and (row_names is None or col_names is None or
+                                     row_names == col_names):
             if row_names is not None:
                 idxs = self.indices(row_names, axis=0)
                 names = row_names
@@ -1340,23 +2251,32 @@ class Matrix(object):
             return Cov(x=extract, names=names, isdiagonal=self.isdiagonal)
         if self.isdiagonal:
             extract = np.diag(self.__x[:, 0])
+        elif self.issparse:
+            extract = self.__x
         else:
             extract = self.__x.copy()
         if row_names is not None:
             row_idxs = self.indices(row_names, axis=0)
-            extract = np.atleast_2d(extract[row_idxs, :].copy())
+            if self.issparse:
+                extract = extract[row_idxs, :]
+            else:
+                extract = np.atleast_2d(extract[row_idxs, :].copy())
             if drop:
                 self.drop(row_names, axis=0)
         else:
             row_names = self.row_names
         if col_names is not None:
             col_idxs = self.indices(col_names, axis=1)
-            extract = np.atleast_2d(extract[:, col_idxs].copy())
+            if self.issparse:
+                extract = extract.tocsc()[:, col_idxs].tocsr()
+            else:
+                extract = np.atleast_2d(extract[:, col_idxs].copy())
             if drop:
                 self.drop(col_names, axis=1)
         else:
             col_names = copy.deepcopy(self.col_names)
-
+        if _issparse(extract) and extract is self.__x:
+            extract = extract.copy()
         return type(self)(x=extract, row_names=row_names, col_names=col_names)
 
 
@@ -1392,10 +2312,11 @@ class Matrix(object):
                 raise Exception("can't drop all names along axis 0")
 
         idxs = self.indices(names, axis=axis)
+        snames = set([name.lower() for name in names])
 
         if self.isdiagonal:
-            self.__x = np.delete(self.__x, idxs, 0)
-            keep_names = [name for name in self.row_names if name not in names]
+            self.__x = _delete(self.__x, idxs, 0)
+            keep_names = [name for name in self.row_names if name not in snames]
             if len(keep_names) != self.__x.shape[0]:
                 raise Exception("shape-name mismatch:"+\
                    "{0}:{0}".format(len(keep_names),self.__x.shape))
@@ -1406,9 +2327,9 @@ class Matrix(object):
             #     del self.row_names[idx]
             #     del self.col_names[idx]
         elif isinstance(self,Cov):
-            self.__x = np.delete(self.__x, idxs, 0)
-            self.__x = np.delete(self.__x, idxs, 1)
-            keep_names = [name for name in self.row_names if name not in names]
+            self.__x = _delete(self.__x, idxs, 0)
+            self.__x = _delete(self.__x, idxs, 1)
+            keep_names = [name for name in self.row_names if name not in snames]
 
             if len(keep_names) != self.__x.shape[0]:
                 raise Exception("shape-name mismatch:"+\
@@ -1424,8 +2345,8 @@ class Matrix(object):
                 raise Exception("Matrix.drop(): can't drop all rows")
             elif idxs.shape == 0:
                 raise Exception("Matrix.drop(): nothing to drop on axis 0")
-            self.__x = np.delete(self.__x, idxs, 0)
-            keep_names = [name for name in self.row_names if name not in names]
+            self.__x = _delete(self.__x, idxs, 0)
+            keep_names = [name for name in self.row_names if name not in snames]
             if len(keep_names) != self.__x.shape[0]:
                 raise Exception("shape-name mismatch:"+\
                    "{0}:{1}".format(len(keep_names),self.__x.shape))
@@ -1438,8 +2359,8 @@ class Matrix(object):
                 raise Exception("Matrix.drop(): can't drop all cols")
             if idxs.shape == 0:
                 raise Exception("Matrix.drop(): nothing to drop on axis 1")
-            self.__x = np.delete(self.__x, idxs, 1)
-            keep_names = [name for name in self.col_names if name not in names]
+            self.__x = _delete(self.__x, idxs, 1)
+            keep_names = [name for name in self.col_names if name not in snames]
             if len(keep_names) != self.__x.shape[1]:
                 raise Exception("shape-name mismatch:"+\
                    "{0}:{1}".format(len(keep_names),self.__x.shape))
@@ -1511,18 +2432,26 @@ class Matrix(object):
             #raise NotImplementedError()
             self.__x = self.as_2d
             self.isdiagonal = False
+        if self.issparse:
+            coo = self.__x.tocoo()
+            keep = coo.data != 0.0
+            if droptol is not None:
+                keep = np.logical_and(keep, np.abs(coo.data) >= droptol)
+            self._write_binary_records(filename, coo.row[keep], coo.col[keep],
+                                       coo.data[keep], chunk=chunk, coo=True)
+            return
         if droptol is not None:
             self.x[np.abs(self.x) < droptol] = 0.0
+        # get the indices of non-zero entries
+        #print("getting nnz idxs")
+        row_idxs, col_idxs = np.nonzero(self.x)
         f = open(filename, 'wb')
         #print("counting nnz")
-        nnz = np.count_nonzero(self.x) #number of non-zero entries
+        nnz = row_idxs.shape[0] #number of non-zero entries
         # write the header
         header = np.array((self.shape[1], self.shape[0], nnz),
                           dtype=self.binary_header_dt)
         header.tofile(f)
-        # get the indices of non-zero entries
-        #print("getting nnz idxs")
-        row_idxs, col_idxs = np.nonzero(self.x)
 
         if chunk is None:
             flat = self.x[row_idxs, col_idxs].flatten()
@@ -1545,24 +2474,8 @@ class Matrix(object):
                 end = min(row_idxs.shape[0],start + chunk)
 
 
-        for name in self.col_names:
-            if len(name) > self.new_par_length:
-                warnings.warn("par name '{0}' greater than {1} chars"\
-                              .format(name,self.new_par_length))
-                name = name[:self.new_par_length - 1]
-            elif len(name) < self.new_par_length:
-                for _ in range(len(name), self.new_par_length):
-                    name = name + ' '
-            f.write(name.encode())
-        for name in self.row_names:
-            if len(name) > self.new_obs_length:
-                warnings.warn("obs name '{0}' greater than {1} chars"\
-                              .format(name, self.new_obs_length))
-                name = name[:self.new_obs_length - 1]
-            elif len(name) < self.new_obs_length:
-                for _ in range(len(name), self.new_obs_length):
-                    name = name + ' '
-            f.write(name.encode())
+        self._write_binary_names(f, self.col_names, self.new_par_length, "par")
+        self._write_binary_names(f, self.row_names, self.new_obs_length, "obs")
         f.close()
 
 
@@ -1583,29 +2496,39 @@ class Matrix(object):
         #print(self.x)
         #print(type(self.x))
 
-        if np.any(np.isnan(self.x)):
+        if self.issparse:
+            if np.any(np.isnan(self.x.data)):
+                raise Exception("Matrix.to_binary(): nans found")
+        elif np.any(np.isnan(self.x)):
             raise Exception("Matrix.to_binary(): nans found")
         if self.isdiagonal:
             #raise NotImplementedError()
             self.__x = self.as_2d
             self.isdiagonal = False
+        if self.issparse:
+            coo = self.__x.tocoo()
+            keep = coo.data != 0.0
+            if droptol is not None:
+                keep = np.logical_and(keep, np.abs(coo.data) >= droptol)
+            self._write_binary_records(filename, coo.row[keep], coo.col[keep],
+                                       coo.data[keep], chunk=chunk)
+            return
         if droptol is not None:
             self.x[np.abs(self.x) < droptol] = 0.0
+        # get the indices of non-zero entries
+        row_idxs, col_idxs = np.nonzero(self.x)
         f = open(filename, 'wb')
-        nnz = np.count_nonzero(self.x) #number of non-zero entries
+        nnz = row_idxs.shape[0] #number of non-zero entries
         # write the header
         header = np.array((-self.shape[1], -self.shape[0], nnz),
                           dtype=self.binary_header_dt)
         header.tofile(f)
-        # get the indices of non-zero entries
-        row_idxs, col_idxs = np.nonzero(self.x)
         icount = row_idxs + 1 + col_idxs * self.shape[0]
         # flatten the array
         #flat = self.x[row_idxs, col_idxs].flatten()
         # zip up the index position and value pairs
         #data = np.array(list(zip(icount, flat)), dtype=self.binary_rec_dt)
 
-
         if chunk is None:
             flat = self.x[row_idxs, col_idxs].flatten()
             data = np.core.records.fromarrays([icount, flat], dtype=self.binary_rec_dt)
@@ -1626,33 +2549,79 @@ class Matrix(object):
                 end = min(row_idxs.shape[0],start + chunk)
 
 
-        for name in self.col_names:
-            if len(name) > self.par_length:
-                warnings.warn("par name '{0}' greater than {1} chars".format(name, self.par_length))
-                name = name[:self.par_length - 1]
-            elif len(name) < self.par_length:
-                for i in range(len(name), self.par_length):
-                    name = name + ' '
-            f.write(name.encode())
-        for name in self.row_names:
-            if len(name) > self.obs_length:
-                warnings.warn("obs name '{0}' greater than {1} chars".format(name, self.obs_length))
-                name = name[:self.obs_length - 1]
-            elif len(name) < self.obs_length:
-                for i in range(len(name), self.obs_length):
-                    name = name + ' '
-            f.write(name.encode())
+        self._write_binary_names(f, self.col_names, self.par_length, "par")
+        self._write_binary_names(f, self.row_names, self.obs_length, "obs")
+        f.close()
+
 
+    def _write_binary_records(self, filename, row_idxs, col_idxs, vals,
+                              chunk=None, coo=False):
+        """write the (row index, column index, value) triplets of the non-zero
+        entries to a PEST-compatible binary file (extended coo format if `coo`),
+        followed by the column and row names.
+        """
+        nnz = row_idxs.shape[0]
+        step = max(nnz if chunk is None else chunk, 1)
+        chunks = ((row_idxs[start:start + step], col_idxs[start:start + step],
+                   vals[start:start + step]) for start in range(0, nnz, step))
+        self._write_binary_chunks(filename, nnz, chunks, coo=coo)
+
+    def _write_binary_chunks(self, filename, nnz, chunks, coo=False):
+        """write `nnz` records, passed as an iterable of (row index, column
+        index, value) array triplets, to a PEST-compatible binary file
+        (extended coo format if `coo`), followed by the column and row names.
+        """
+        if coo:
+            header = (self.shape[1], self.shape[0], nnz)
+            rec_dt = self.coo_rec_dt
+            lengths = (self.new_par_length, self.new_obs_length)
+        else:
+            header = (-self.shape[1], -self.shape[0], nnz)
+            rec_dt = self.binary_rec_dt
+            lengths = (self.par_length, self.obs_length)
+        f = open(filename, 'wb')
+        np.array(header, dtype=self.binary_header_dt).tofile(f)
+        for row_idxs, col_idxs, vals in chunks:
+            if coo:
+                arrays = [row_idxs, col_idxs, vals]
+            else:
+                arrays = [row_idxs + 1 + col_idxs * self.shape[0], vals]
+            np.core.records.fromarrays(arrays, dtype=rec_dt).tofile(f)
+        for names, length, label in zip([self.col_names, self.row_names], lengths,
+                                        ["par", "obs"]):
+            Matrix._write_binary_names(f, names, length, label)
         f.close()
 
+    @staticmethod
+    def _write_binary_names(f, names, length, label):
+        """write `names` as a single block of fixed-`length` (truncated and
+        space-padded) strings to the open binary file `f`
+        """
+        if len(names) == 0:
+            return
+        names = np.array(names, dtype=str)
+        too_long = np.where(np.char.str_len(names) > length)[0]
+        for i in too_long:
+            warnings.warn("{0} name '{1}' greater than {2} chars".
+                          format(label, names[i], length))
+        if too_long.shape[0] > 0:
+            names = names.astype("U{0}".format(length))
+            names[too_long] = [name[:length - 1] for name in names[too_long]]
+        block = np.char.ljust(np.char.encode(names), length)
+        block.astype("S{0}".format(length)).tofile(f)
 
     @classmethod
-    def from_binary(cls,filename):
+    def from_binary(cls,filename,sparse=False,dtype=None):
         """class method load from PEST-compatible binary file into a
         Matrix instance
 
         Args:
             filename (`str`): filename to read
+            sparse (`bool`): flag to store the numeric values as a
+                `scipy.sparse` (CSR) matrix instead of a dense `numpy.ndarray`.
+                Requires scipy.  Default is False
+            dtype (`numpy.dtype`): dtype of the numeric values.  Default is
+                None (`Matrix.default_dtype`)
 
         Returns:
             `Matrix`: `Matrix` loaded from binary file
@@ -1661,19 +2630,32 @@ class Matrix(object):
 
             mat = pyemu.Matrix.from_binary("my.jco")
             cov = pyemi.Cov.from_binary("large_cov.jcb")
+            jco = pyemu.Jco.from_binary("big.jcb",sparse=True)
+            jco32 = pyemu.Jco.from_binary("big.jcb",dtype=np.float32)
 
         """
-        x,row_names,col_names = Matrix.read_binary(filename)
-        if np.any(np.isnan(x)):
+        x,row_names,col_names = Matrix.read_binary(filename,sparse=sparse,
+                                                   dtype=dtype)
+        if _issparse(x):
+            if np.any(np.isnan(x.data)):
+                warnings.warn("Matrix.from_binary(): nans in matrix",PyemuWarning)
+        elif np.any(np.isnan(x)):
             warnings.warn("Matrix.from_binary(): nans in matrix",PyemuWarning)
-        return cls(x=x, row_names=row_names, col_names=col_names)
+        mat = cls(x=x, row_names=row_names, col_names=col_names)
+        mat.filename = filename
+        return mat
 
     @staticmethod
-    def read_binary(filename):
+    def read_binary(filename,sparse=False,dtype=None):
         """static method to read PEST-format binary files
 
         Args:
             filename (`str`): filename to read
+            sparse (`bool`): flag to return the numeric values as a
+                `scipy.sparse` (CSR) matrix.  The records are never
+                scattered into a dense array.  Default is False
+            dtype (`numpy.dtype`): dtype of the returned numeric values.
+                Default is None (`Matrix.default_dtype`)
 
         Returns:
             tuple containing
@@ -1683,6 +2665,8 @@ class Matrix(object):
             - **[`str`]**: list of col_names
 
         """
+        if dtype is None:
+            dtype = Matrix.default_dtype
         f = open(filename, 'rb')
         # the header datatype
         itemp1, itemp2, icount = np.fromfile(f, Matrix.binary_header_dt, 1)[0]
@@ -1705,22 +2689,17 @@ class Matrix(object):
                 raise Exception("Matrix.from_binary(): 'i' index values less than 0")
             if data['j'].min() < 0:
                 raise Exception("Matrix.from_binary(): 'j' index values less than 0")
-            x = np.zeros((nrow, ncol))
-            x[data['i'], data['j']] = data["dtemp"]
-            data = x
+            if sparse:
+                data = _sparse_module().csr_matrix((data["dtemp"].astype(dtype),
+                                                    (data['i'], data['j'])),
+                                                   shape=(nrow, ncol))
+            else:
+                x = np.zeros((nrow, ncol), dtype=dtype)
+                x[data['i'], data['j']] = data["dtemp"]
+                data = x
             # read obs and parameter names
-            col_names = []
-            row_names = []
-            for j in range(ncol):
-                name = struct.unpack(str(Matrix.new_par_length) + "s",
-                                     f.read(Matrix.new_par_length))[0] \
-                    .strip().lower().decode()
-                col_names.append(name)
-            for i in range(nrow):
-                name = struct.unpack(str(Matrix.new_obs_length) + "s",
-                                     f.read(Matrix.new_obs_length))[0] \
-                    .strip().lower().decode()
-                row_names.append(name)
+            col_names = Matrix._read_binary_names(f, ncol, Matrix.new_par_length)
+            row_names = Matrix._read_binary_names(f, nrow, Matrix.new_obs_length)
             f.close()
         else:
 
@@ -1729,23 +2708,17 @@ class Matrix(object):
             data = np.fromfile(f, Matrix.binary_rec_dt, icount)
             icols = ((data['j'] - 1) // nrow) + 1
             irows = data['j'] - ((icols - 1) * nrow)
-            x = np.zeros((nrow, ncol))
-            x[irows - 1, icols - 1] = data["dtemp"]
-            data = x
+            if sparse:
+                data = _sparse_module().csr_matrix((data["dtemp"].astype(dtype),
+                                                    (irows - 1, icols - 1)),
+                                                   shape=(nrow, ncol))
+            else:
+                x = np.zeros((nrow, ncol), dtype=dtype)
+                x[irows - 1, icols - 1] = data["dtemp"]
+                data = x
             # read obs and parameter names
-            col_names = []
-            row_names = []
-            for j in range(ncol):
-                name = struct.unpack(str(Matrix.par_length) + "s",
-                                     f.read(Matrix.par_length))[0]\
-                                      .strip().lower().decode()
-                col_names.append(name)
-            for i in range(nrow):
-
-                name = struct.unpack(str(Matrix.obs_length) + "s",
-                                     f.read(Matrix.obs_length))[0]\
-                                      .strip().lower().decode()
-                row_names.append(name)
+            col_names = Matrix._read_binary_names(f, ncol, Matrix.par_length)
+            row_names = Matrix._read_binary_names(f, nrow, Matrix.obs_length)
             f.close()
         if len(row_names) != data.shape[0]:
             raise Exception("Matrix.read_binary() len(row_names) (" + str(len(row_names)) +\
@@ -1755,6 +2728,241 @@ class Matrix(object):
           ") != self.shape[1] (" + str(data.shape[1]) + ")")
         return data,row_names,col_names
 
+    @staticmethod
+    def _read_binary_names(f, count, length):
+        """read `count` fixed-`length` names from the open binary file `f`
+        as a single block
+        """
+        block = np.fromfile(f, dtype="S{0}".format(length), count=count)
+        if block.shape[0] != count:
+            raise Exception("Matrix.read_binary(): expected {0} names, found {1}".
+                            format(count, block.shape[0]))
+        return np.char.decode(np.char.lower(np.char.strip(block))).tolist()
+
+
+    @classmethod
+    def open_binary(cls, filename, chunk=1000000, memory=2**28):
+        """open a PEST-compatible binary file for lazy, memory-mapped access
+
+        Args:
+            filename (`str`): filename to open
+            chunk (`int`): number of records to process in a single pass
+                when scanning the numeric records.  Default is 1,000,000
+            memory (`int`): approximate number of bytes of numeric values held
+                in memory at once by the out-of-core operations of
+                `LazyBinaryMatrix`.  Default is 2**28 (256 MB)
+
+        Returns:
+            `LazyBinaryMatrix`: a handle that has read the header and
+            name tables.  Numeric values are only materialized for the rows
+            and columns requested through `LazyBinaryMatrix.get()`
+
+        Example::
+
+            handle = pyemu.Jco.open_binary("big.jcb")
+            jco = handle.get(row_names=pst.nnz_obs_names)
+
+        """
+        return LazyBinaryMatrix(filename, astype=cls, chunk=chunk, memory=memory)
+
+    def to_npz(self, filename, compress=False):
+        """write `Matrix` to a pyemu-native, numpy `.npz` container that stores
+        the numeric values (dense or sparse), the names and the `isdiagonal` flag
+
+        Args:
+            filename (`str`): filename to write.  Written as given, no
+                extension is added
+            compress (`bool`): flag to deflate the container.  Compressed
+                containers are smaller but partial loads have to read the
+                whole numeric block.  Default is False
+
+        Example::
+
+            jco = pyemu.Jco.from_binary("pest.jcb")
+            jco.to_npz("pest.npz")
+
+        Note:
+            names are not truncated and the dtype of `Matrix.x` is kept.
+            Sparse storage is written in CSR form
+
+        """
+        x = self.x if self.issparse else np.ascontiguousarray(self.x)
+        Matrix.write_npz(filename, x, self.row_names, self.col_names,
+                         isdiagonal=self.isdiagonal, compress=compress)
+
+    @staticmethod
+    def write_npz(filename, x, row_names, col_names, isdiagonal=False,
+                  compress=False):
+        """static method to write numeric values and names to a pyemu-native
+        `.npz` container (see `Matrix.to_npz()`)
+
+        Args:
+            filename (`str`): filename to write
+            x (`numpy.ndarray`): the numeric values, dense or `scipy.sparse`.
+                Dense values are written as they are laid out in memory
+                (no copy)
+            row_names ([`str`]): row names
+            col_names ([`str`]): col names
+            isdiagonal (`bool`): `isdiagonal` flag.  Default is False
+            compress (`bool`): flag to deflate the container.  Default is False
+
+        """
+        arrays = {"row_names": np.array(row_names, dtype=str),
+                  "col_names": np.array(col_names, dtype=str),
+                  "isdiagonal": np.array(isdiagonal)}
+        if _issparse(x):
+            x = x.tocsr()
+            arrays["data"] = x.data
+            arrays["indices"] = x.indices
+            arrays["indptr"] = x.indptr
+            arrays["shape"] = np.array(x.shape, dtype=np.int64)
+        else:
+            arrays["x"] = x
+        save = np.savez_compressed if compress else np.savez
+        with open(filename, 'wb') as f:
+            save(f, **arrays)
+
+    @classmethod
+    def from_npz(cls, filename, row_names=None, col_names=None, sparse=None,
+                 dtype=None, mmap=False):
+        """class method to load a container written by `Matrix.to_npz()`
+
+        Args:
+            filename (`str`): filename to read
+            row_names ([`str`]): rows to load.  If None, all rows are loaded
+            col_names ([`str`]): columns to load.  If None, all columns are
+                loaded
+            sparse (`bool`): flag to return `scipy.sparse` (CSR) storage.
+                If None, the storage of the container is kept. Default is None
+            dtype (`numpy.dtype`): dtype of the numeric values.  If None,
+                the dtype of the container is kept.  Default is None
+            mmap (`bool`): flag to memory-map the values instead of reading
+                them (see `Matrix.read_npz()`).  Default is False
+
+        Returns:
+            `Matrix`: `Matrix` loaded from the container
+
+        Example::
+
+            jco = pyemu.Jco.from_npz("pest.npz", row_names=pst.nnz_obs_names)
+
+        """
+        x, row_names, col_names, isdiagonal = Matrix.read_npz(
+            filename, row_names=row_names, col_names=col_names, sparse=sparse,
+            dtype=dtype, mmap=mmap)
+        mat = cls(x=x, row_names=row_names, col_names=col_names,
+                  isdiagonal=isdiagonal)
+        mat.filename = filename
+        return mat
+
+    @staticmethod
+    def read_npz_names(filename):
+        """static method to read only the names of a container written by
+        `Matrix.to_npz()`.  The numeric values are not read
+
+        Args:
+            filename (`str`): filename to read
+
+        Returns:
+            tuple containing
+
+            - **[`str`]**: list of row names
+            - **[`str`]**: list of col names
+
+        """
+        with np.load(filename) as npz:
+            return npz["row_names"].tolist(), npz["col_names"].tolist()
+
+    @staticmethod
+    def read_npz(filename, row_names=None, col_names=None, sparse=None,
+                 dtype=None, mmap=False):
+        """static method to read a container written by `Matrix.to_npz()`
+
+        Args:
+            filename (`str`): filename to read
+            row_names ([`str`]): rows to load.  If None, all rows are loaded
+            col_names ([`str`]): columns to load.  If None, all columns are
+                loaded
+            sparse (`bool`): flag to return `scipy.sparse` (CSR) values.
+                If None, the storage of the container is kept. Default is None
+            dtype (`numpy.dtype`): dtype of the returned numeric values.  If
+                None, the dtype of the container is kept.  Default is None
+            mmap (`bool`): flag to return the dense values of an uncompressed
+                container as a copy-on-write `numpy.memmap` of the file, instead
+                of reading them.  Only used when all rows and columns are loaded
+                without a dtype or storage change.  Default is False
+
+        Returns:
+            tuple containing
+
+            - **numpy.ndarray**: the numeric values in the container
+            - **[`str`]**: list of row names
+            - **[`str`]**: list of col names
+            - **bool**: `isdiagonal` flag
+
+        Note:
+            For an uncompressed container, only the requested rows are read
+            from disk.  Selecting columns of dense values reads every
+            (selected) row
+
+        """
+        with np.load(filename) as npz:
+            all_row_names = npz["row_names"].tolist()
+            all_col_names = npz["col_names"].tolist()
+            isdiagonal = bool(npz["isdiagonal"])
+            if isdiagonal:
+                # diagonal vectors are small, select through Cov.get()
+                mat = Cov(x=np.array(npz["x"], dtype=dtype), names=all_row_names,
+                          isdiagonal=True)
+                if row_names is not None or col_names is not None:
+                    mat = mat.get(row_names=row_names, col_names=col_names)
+                if sparse:
+                    mat = mat.to_sparse()
+                return mat.x, mat.row_names, mat.col_names, mat.isdiagonal
+
+            row_idxs, col_idxs = None, None
+            if row_names is not None:
+                row_idxs = Matrix._find_indices(
+                    row_names, {n: i for i, n in enumerate(all_row_names)}, {}, axis=0)
+                row_names = [all_row_names[i] for i in row_idxs]
+            else:
+                row_names = all_row_names
+            if col_names is not None:
+                col_idxs = Matrix._find_indices(
+                    col_names, {}, {n: j for j, n in enumerate(all_col_names)}, axis=1)
+                col_names = [all_col_names[j] for j in col_idxs]
+            else:
+                col_names = all_col_names
+
+            if "x" in npz.files:
+                x = _npz_member(filename, npz, "x", mode='c' if mmap else 'r')
+                if mmap and isinstance(x, np.memmap) and row_idxs is None and \
+                        col_idxs is None and not sparse and \
+                        (dtype is None or np.dtype(dtype) == x.dtype):
+                    return x, row_names, col_names, isdiagonal
+                if row_idxs is not None:
+                    x = x[row_idxs, :]
+                if col_idxs is not None:
+                    x = x[:, col_idxs]
+                x = np.array(x, dtype=dtype)
+                if sparse:
+                    x = _sparse_module().csr_matrix(x)
+            else:
+                sps = _sparse_module()
+                data, indices, indptr = [_npz_member(filename, npz, name)
+                                         for name in ["data", "indices", "indptr"]]
+                nrow, ncol = npz["shape"]
+                if row_idxs is not None:
+                    data, indices, indptr = _csr_take_rows(data, indices,
+                                                           indptr, row_idxs)
+                    nrow = row_idxs.shape[0]
+                x = sps.csr_matrix((np.array(data, dtype=dtype), np.array(indices),
+                                    np.array(indptr)), shape=(nrow, ncol))
+                if col_idxs is not None:
+                    x = x[:, col_idxs]
+                if sparse is not None and not sparse:
+                    x = x.toarray()
+        return x, row_names, col_names, isdiagonal
 
     @classmethod
     def from_fortranfile(cls, filename):
@@ -1845,12 +3053,14 @@ class Matrix(object):
 
 
     @classmethod
-    def from_ascii(cls,filename):
+    def from_ascii(cls,filename,dtype=None):
         """load a PEST-compatible ASCII matrix/vector file into a
         `Matrix` instance
 
         Args:
             filename (`str`): name of the file to read
+            dtype (`numpy.dtype`): dtype of the numeric values.  Default is
+                None (`Matrix.default_dtype`)
 
         Returns:
             `Matrix`: `Matrix` loaded from ASCII file
@@ -1861,16 +3071,20 @@ class Matrix(object):
             cov = pyemi.Cov.from_ascii("my.cov")
 
         """
-        x,row_names,col_names,isdiag = Matrix.read_ascii(filename)
-        return cls(x=x,row_names=row_names,col_names=col_names,isdiagonal=isdiag)
+        x,row_names,col_names,isdiag = Matrix.read_ascii(filename,dtype=dtype)
+        mat = cls(x=x,row_names=row_names,col_names=col_names,isdiagonal=isdiag)
+        mat.filename = filename
+        return mat
 
 
     @staticmethod
-    def read_ascii(filename):
+    def read_ascii(filename,dtype=None):
         """read a PEST-compatible ASCII matrix/vector file
 
         Args:
             filename (`str`): file to read from
+            dtype (`numpy.dtype`): dtype of the returned numeric values.
+                Default is None (`Matrix.default_dtype`)
 
         Returns:
             tuple containing
@@ -1885,38 +3099,32 @@ class Matrix(object):
         f = open(filename, 'r')
         raw = f.readline().strip().split()
         nrow, ncol = int(raw[0]), int(raw[1])
-        #x = np.fromfile(f, dtype=self.double, count=nrow * ncol, sep=' ')
-        # this painfully slow and ugly read is needed to catch the
-        # fortran floating points that have 3-digit exponents,
-        # which leave out the base (e.g. 'e') : "-1.23455+300"
+        # tokens are accumulated line by line and converted to floats
+        # in bulk, chunk by chunk.  Only chunks that fail the bulk
+        # conversion (fortran 3-digit exponents that leave out the base,
+        # e.g. "-1.23455+300") go through the slow token-by-token path
+        nval = nrow * ncol
+        chunks = []
+        tokens = []
         count = 0
-        x = []
-        while True:
+        while count < nval:
             line = f.readline()
             if line == '':
                 raise Exception("Matrix.from_ascii() error: EOF")
-            raw = line.strip().split()
-            for r in raw:
-                try:
-                    x.append(float(r))
-                except Exception as e:
-                    # overflow
-                    if '+' in r:
-                        x.append(1.0e+30)
-                    # underflow
-                    elif '-' in r:
-                        x.append(0.0)
-                    else:
-                        raise Exception("Matrix.from_ascii() error: " +
-                                        " can't cast " + r + " to float")
-                count += 1
-                if count == (nrow * ncol):
-                    break
-            if count == (nrow * ncol):
-                    break
-
-        x = np.array(x,dtype=Matrix.double)
-        x.resize(nrow, ncol)
+            raw = line.split()
+            tokens.extend(raw)
+            count += len(raw)
+            if count > nval:
+                tokens = tokens[:len(tokens) - (count - nval)]
+            if len(tokens) >= Matrix.ascii_chunk or count >= nval:
+                chunks.append(_ascii_tokens_to_array(tokens))
+                tokens = []
+        if len(chunks) == 1:
+            x = chunks[0]
+        else:
+            x = np.concatenate(chunks)
+        x = x.reshape(nrow, ncol).astype(dtype if dtype is not None else
+                                         Matrix.default_dtype, copy=False)
         line = f.readline().strip().lower()
         if not line.startswith('*'):
             raise Exception('Matrix.from_ascii(): error loading ascii file," +\
@@ -2023,7 +3231,7 @@ class Matrix(object):
         if self.isdiagonal:
             x = np.diag(self.__x[:, 0])
         else:
-            x = self.__x
+            x = self.as_2d
         return pd.DataFrame(data=x,index=self.row_names,columns=self.col_names)
 
 
@@ -2051,160 +3259,830 @@ class Matrix(object):
         new_col_names = copy.copy(self.col_names)
         new_col_names.extend(other.col_names)
 
-        new_x = np.zeros((len(new_row_names),len(new_col_names)))
-        new_x[0:self.shape[0],0:self.shape[1]] = self.as_2d
-        new_x[self.shape[0]:self.shape[0]+other.shape[0],
-              self.shape[1]:self.shape[1]+other.shape[1]] = other.as_2d
         isdiagonal = True
         if not self.isdiagonal or not other.isdiagonal:
             isdiagonal = False
+        dtype = np.result_type(self.dtype, other.dtype)
+        if isdiagonal:
+            new_x = np.concatenate([self.x, other.x]).astype(dtype, copy=False)
+        elif self.issparse or other.issparse:
+            new_x = _sparse_module().block_diag([self._sparse_operand(),
+                                                 other._sparse_operand()],
+                                                format="csr", dtype=dtype)
+        else:
+            new_x = np.zeros((len(new_row_names),len(new_col_names)), dtype=dtype)
+            for mat, block in zip([self, other],
+                                  [new_x[:self.shape[0], :self.shape[1]],
+                                   new_x[self.shape[0]:, self.shape[1]:]]):
+                if mat.isdiagonal:
+                    np.fill_diagonal(block, mat.x[:, 0])
+                else:
+                    block[:] = mat.x
 
         return type(self)(x=new_x,row_names=new_row_names,
                            col_names=new_col_names,isdiagonal=isdiagonal)
 
-class Jco(Matrix):
-    """a thin wrapper class to get more intuitive attribute names.  Functions
-    exactly like `Matrix`
+class _FieldView(object):
+    """minimal sequence view of one field of a record array for `bisect`
     """
-    def __init(self, **kwargs):
-        """ Jco constuctor takes the same arguments as Matrix.
+    def __init__(self, records, field):
+        self.records = records
+        self.field = field
 
-        Args:
-            **kwargs (`dict`): constructor arguments for `Matrix`
+    def __len__(self):
+        return self.records.shape[0]
 
-        Example:
+    def __getitem__(self, i):
+        return self.records[i][self.field]
 
-            jco = pyemu.Jco.from_binary("my.jco")
 
+class LazyBinaryMatrix(object):
+    """lazy, memory-mapped handle to a PEST-compatible binary matrix file.
+    The header and name tables are read once when the handle is created and
+    the numeric records are accessed through `numpy.memmap` so that only the
+    requested rows and columns are ever materialized.
 
-        """
+    Args:
+        filename (`str`): PEST-compatible binary file (jco/jcb/cov)
+        astype (`type`): the `Matrix` type to return from `LazyBinaryMatrix.get()`.
+            Default is `Matrix`
+        chunk (`int`): number of records to process in a single pass when
+            scanning the numeric records.  Default is 1,000,000
+        memory (`int`): approximate number of bytes of numeric values held in
+            memory at once by the out-of-core operations (`LazyBinaryMatrix.tiles()`,
+            `LazyBinaryMatrix.dot()`, `LazyBinaryMatrix.xtqx()`).  Default is
+            2**28 (256 MB)
 
-        super(Jco, self).__init__(kwargs)
+    Example::
+
+        handle = pyemu.Matrix.open_binary("big.jcb")
+        sub = handle.get(row_names=["obs1","obs2"])
+        # form J^T Q J without loading the whole jco
+        xtqx = handle.xtqx(obscov=pyemu.Cov.from_observation_data(pst))
+
+    Note:
+        if the records are sorted (as written by `Matrix.to_coo()` (row major)
+        or by PEST (column major)), only the record ranges of the requested rows
+        (or columns) are touched.  Otherwise the record block is scanned in chunks.
 
+    """
+    def __init__(self, filename, astype=None, chunk=1000000, memory=2**28):
+        if astype is None:
+            astype = Matrix
+        self.filename = filename
+        self.astype = astype
+        self.chunk = int(chunk)
+        self.memory = int(memory)
+        f = open(filename, 'rb')
+        itemp1, itemp2, icount = np.fromfile(f, Matrix.binary_header_dt, 1)[0]
+        if itemp1 > 0 and itemp2 < 0 and icount < 0:
+            f.close()
+            raise Exception("LazyBinaryMatrix: sequential fortran binary files " +
+                            "are not supported, use Matrix.from_fortranfile()")
+        self.ncol, self.nrow = abs(int(itemp1)), abs(int(itemp2))
+        self.nnz = int(icount)
+        self.iscoo = itemp1 >= 0
+        if self.iscoo:
+            self._rec_dt = Matrix.coo_rec_dt
+            par_length, obs_length = Matrix.new_par_length, Matrix.new_obs_length
+        else:
+            self._rec_dt = Matrix.binary_rec_dt
+            par_length, obs_length = Matrix.par_length, Matrix.obs_length
+        self._rec_offset = Matrix.binary_header_dt.itemsize
+        f.seek(self._rec_offset + (self.nnz * self._rec_dt.itemsize))
+        self.col_names = Matrix._read_binary_names(f, self.ncol, par_length)
+        self.row_names = Matrix._read_binary_names(f, self.nrow, obs_length)
+        f.close()
+        self._row_idxs = {name: i for i, name in enumerate(self.row_names)}
+        self._col_idxs = {name: j for j, name in enumerate(self.col_names)}
+        self.__records = None
+        self.__sorted = None
 
     @property
-    def par_names(self):
-        """ thin wrapper around `Matrix.col_names`
+    def shape(self):
+        """the shape of the matrix in the file
 
         Returns:
-            [`str`]: a list of parameter names
+            `tuple`: (nrow, ncol)
 
         """
-        return self.col_names
-
+        return self.nrow, self.ncol
 
     @property
-    def obs_names(self):
-        """ thin wrapper around `Matrix.row_names`
+    def records(self):
+        """memory-mapped view of the numeric records
 
         Returns:
-            ['str']: a list of observation names
+            `numpy.memmap`: the record block of the binary file
 
         """
-        return self.row_names
+        if self.__records is None:
+            if self.nnz == 0:
+                self.__records = np.zeros(0, dtype=self._rec_dt)
+            else:
+                self.__records = np.memmap(self.filename, dtype=self._rec_dt, mode='r',
+                                           offset=self._rec_offset, shape=(self.nnz,))
+        return self.__records
+
+    def _keys(self, start, end):
+        """the (zero-based) flat record keys.  coo records are keyed row-major,
+        PEST dense-format records are keyed column-major
+        """
+        rec = self.records[start:end]
+        if self.iscoo:
+            return (rec['i'].astype(np.int64) * self.ncol) + rec['j']
+        return rec['j'].astype(np.int64) - 1
 
+    def _rowcol(self, rec):
+        """the zero-based row and column indices of a block of records
+        """
+        if self.iscoo:
+            return rec['i'], rec['j']
+        icols = (rec['j'] - 1) // self.nrow
+        irows = (rec['j'] - 1) - (icols * self.nrow)
+        return irows, icols
 
     @property
-    def npar(self):
-        """ number of parameters in the Jco
+    def issorted(self):
+        """flag for records sorted by their flat key.  Evaluated once
+        with a chunked pass over the records
 
         Returns:
-            `int`: number of parameters (columns)
+            `bool`: True if the records are sorted
 
         """
-        return self.shape[1]
+        if self.__sorted is None:
+            self.__sorted = True
+            last = -1
+            for start in range(0, self.nnz, self.chunk):
+                keys = self._keys(start, min(self.nnz, start + self.chunk))
+                if keys[0] < last or np.any(np.diff(keys) < 0):
+                    self.__sorted = False
+                    break
+                last = keys[-1]
+        return self.__sorted
 
+    def indices(self, names, axis):
+        """get the indices of names along an axis
 
-    @property
-    def nobs(self):
-        """ number of observations in the Jco
+        Args:
+            names ([`str`]): names to find
+            axis (`int`): 0 for rows, 1 for columns
 
         Returns:
-            `int`: number of observations (rows)
+            `numpy.ndarray`: integer indices
 
         """
-        return self.shape[0]
+        lookup = self._row_idxs if axis == 0 else self._col_idxs
+        idxs = []
+        missing = []
+        for name in names:
+            name = str(name).lower()
+            if name not in lookup:
+                missing.append(name)
+            else:
+                idxs.append(lookup[name])
+        if len(missing) > 0:
+            raise Exception("LazyBinaryMatrix.indices(): names not found along axis " +
+                            "{0}: {1}".format(axis, ','.join(missing[:10])))
+        return np.array(idxs, dtype=np.int64)
 
+    def _record_ranges(self, row_idxs, col_idxs):
+        """work out the record ranges to visit for the requested indices
+        """
+        if not self.issorted:
+            return [(start, min(self.nnz, start + self.chunk))
+                    for start in range(0, self.nnz, self.chunk)]
+        # the leading index of the flat key
+        if self.iscoo:
+            lead, lead_len = row_idxs, self.ncol
+        else:
+            lead, lead_len = col_idxs, self.nrow
+        lead = np.unique(lead)
+        # bisect through the memmap one element at a time - np.searchsorted
+        # would make a contiguous copy of the whole (strided) field
+        keys = _FieldView(self.records, 'i' if self.iscoo else 'j')
+        ranges = []
+        for l in lead:
+            if self.iscoo:
+                start = bisect.bisect_left(keys, l)
+                end = bisect.bisect_right(keys, l, lo=start)
+            else:
+                start = bisect.bisect_left(keys, (l * lead_len) + 1)
+                end = bisect.bisect_right(keys, (l + 1) * lead_len, lo=start)
+            while start < end:
+                ranges.append((start, min(end, start + self.chunk)))
+                start += self.chunk
+        return ranges
 
-    @classmethod
-    def from_pst(cls, pst, random=False):
-        """construct a new empty Jco from a control file filled
-        with trash
+    def get(self, row_names=None, col_names=None, sparse=False):
+        """materialize a sub-matrix from the file
 
         Args:
-            pst (`pyemu.Pst`): a pest control file instance.  If type is 'str',
-                `pst` is loaded from filename
-            random (`bool`): flag for contents of the trash matrix.
-                If True, fill with random numbers, if False, fill with zeros
+            row_names ([`str`]): row names to load.  If None, all rows are loaded
+            col_names ([`str`]): column names to load.  If None, all columns are loaded
+            sparse (`bool`): flag to return a `scipy.sparse` backed `Matrix`.
                 Default is False
 
         Returns:
-            `Jco`: the new Jco instance
+            `Matrix`: the sub-matrix, ordered by `row_names` and `col_names`
 
         """
+        if row_names is None:
+            row_names = self.row_names
+        elif not isinstance(row_names, list):
+            row_names = [row_names]
+        if col_names is None:
+            col_names = self.col_names
+        elif not isinstance(col_names, list):
+            col_names = [col_names]
+        x = self._values(self.indices(row_names, 0),
+                         self.indices(col_names, 1), sparse=sparse)
+        return self.astype(x=x, row_names=row_names, col_names=col_names)
 
-        if isinstance(pst,str):
-            pst = Pst(pst)
-
-        return Jco.from_names(pst.obs_names, pst.adj_par_names, random=random)
-
-class Cov(Matrix):
-    """Diagonal and/or dense Covariance matrices
+    def _values(self, row_idxs, col_idxs, sparse=False):
+        """materialize the values of the sub-matrix at the (zero-based)
+        `row_idxs` and `col_idxs` as an `numpy.ndarray` (or csr matrix)
+        """
+        row_map = np.zeros(self.nrow, dtype=np.int64) - 1
+        row_map[row_idxs] = np.arange(row_idxs.shape[0])
+        col_map = np.zeros(self.ncol, dtype=np.int64) - 1
+        col_map[col_idxs] = np.arange(col_idxs.shape[0])
+
+        ii, jj, vv = [], [], []
+        for start, end in self._record_ranges(row_idxs, col_idxs):
+            rec = self.records[start:end]
+            irows, icols = self._rowcol(rec)
+            inew, jnew = row_map[irows], col_map[icols]
+            keep = np.logical_and(inew >= 0, jnew >= 0)
+            ii.append(inew[keep])
+            jj.append(jnew[keep])
+            vv.append(np.array(rec["dtemp"][keep]))
+        shape = (row_idxs.shape[0], col_idxs.shape[0])
+        if len(ii) > 0:
+            ii, jj, vv = np.concatenate(ii), np.concatenate(jj), np.concatenate(vv)
+        else:
+            ii, jj, vv = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), \
+                         np.zeros(0, dtype=Matrix.double)
+        if sparse:
+            return _sparse_module().csr_matrix((vv, (ii, jj)), shape=shape)
+        x = np.zeros(shape)
+        x[ii, jj] = vv
+        return x
 
-    Args:
-        x (`numpy.ndarray`): numeric values
-        names ([`str`]): list of row and column names
-        isdigonal (`bool`): flag if the Matrix is diagonal
-        autoalign (`bool`): flag to control the autoalignment of Matrix during
-            linear algebra operations
+    @property
+    def lead_axis(self):
+        """the axis along which the records can be visited in contiguous
+        ranges: 0 (rows) for sorted coo files, 1 (columns) for sorted PEST
+        files and None if the records are not sorted
 
-    Example::
+        Returns:
+            `int`: the leading axis of the record block
+        """
+        if not self.issorted:
+            return None
+        return 0 if self.iscoo else 1
 
-        data = np.random.random((10,10))
-        names = ["par_{0}".format(i) for i in range(10)]
-        mat = pyemu.Cov(x=data,names=names)
-        mat.to_binary("mat.jco")
+    def _tile_size(self, length, memory=None):
+        """number of rows (or columns) of `length` values that fit in
+        `memory` bytes
+        """
+        if memory is None:
+            memory = self.memory
+        return max(1, int(memory) // (np.dtype(Matrix.double).itemsize * max(1, length)))
 
-    Note:
-        `row_names` and `col_names` args are supported in the contructor
-        so support inheritance.  However, users should only pass `names`
+    def _tile_idxs(self, idxs, length, memory=None):
+        """split `idxs` into consecutive blocks that fit in `memory`
+        """
+        step = self._tile_size(length, memory)
+        return [idxs[start:start + step] for start in range(0, idxs.shape[0], step)]
 
-    """
-    def __init__(self, x=None, names=[],row_names=[],col_names=[],
-                 isdiagonal=False, autoalign=True):
+    def tiles(self, axis=None, row_names=None, col_names=None, memory=None,
+              sparse=False):
+        """generator of in-memory tiles of the matrix along an axis.  Each
+        tile holds roughly `memory` bytes of values
 
-        self.__identity = None
-        self.__zero = None
-        #if len(row_names) > 0 and len(col_names) > 0:
-        #    assert row_names == col_names
-        self.__identity = None
-        self.__zero = None
-        # if len(row_names) > 0 and len(col_names) > 0:
-        #    assert row_names == col_names
-        if len(names) != 0 and len(row_names) == 0:
-            row_names = names
-        if len(names) != 0 and len(col_names) == 0:
-            col_names = names
-        super(Cov, self).__init__(x=x, isdiagonal=isdiagonal,
-                                  row_names=row_names,
-                                  col_names=col_names,
-                                  autoalign=autoalign)
-        super(Cov, self).__init__(x=x, isdiagonal=isdiagonal,
-                                  row_names=row_names,
-                                  col_names=col_names,
-                                  autoalign=autoalign)
+        Args:
+            axis (`int`): 0 to tile by rows, 1 to tile by columns.  If None,
+                `LazyBinaryMatrix.lead_axis` is used (rows if unsorted)
+            row_names ([`str`]): row names to include.  If None, all rows
+            col_names ([`str`]): column names to include.  If None, all columns
+            memory (`int`): approximate number of bytes per tile.  If None,
+                `LazyBinaryMatrix.memory` is used
+            sparse (`bool`): flag to yield `scipy.sparse` backed tiles.
+                Default is False
 
+        Yields:
+            `Matrix`: consecutive tiles of the (sub-)matrix
 
-    @property
-    def identity(self):
-        """get an identity `Cov` of the same shape
+        Example::
 
-        Returns:
-            `Cov`: new `Cov` instance with identity matrix
+            handle = pyemu.Matrix.open_binary("big.jcb")
+            for tile in handle.tiles(axis=0):
+                print(tile.shape)
 
         """
-        if self.__identity is None:
-            self.__identity = Cov(x=np.atleast_2d(np.ones(self.shape[0]))
+        if axis is None:
+            axis = self.lead_axis or 0
+        if row_names is None:
+            row_names = self.row_names
+        if col_names is None:
+            col_names = self.col_names
+        row_idxs = self.indices(row_names, 0)
+        col_idxs = self.indices(col_names, 1)
+        if axis == 0:
+            start = 0
+            for idxs in self._tile_idxs(row_idxs, col_idxs.shape[0], memory):
+                names = row_names[start:start + idxs.shape[0]]
+                start += idxs.shape[0]
+                yield self.astype(x=self._values(idxs, col_idxs, sparse=sparse),
+                                  row_names=names, col_names=col_names)
+        elif axis == 1:
+            start = 0
+            for idxs in self._tile_idxs(col_idxs, row_idxs.shape[0], memory):
+                names = col_names[start:start + idxs.shape[0]]
+                start += idxs.shape[0]
+                yield self.astype(x=self._values(row_idxs, idxs, sparse=sparse),
+                                  row_names=row_names, col_names=names)
+        else:
+            raise Exception("LazyBinaryMatrix.tiles(): axis must be 0 or 1, not " +
+                            "{0}".format(axis))
+
+    def transpose(self, filename):
+        """write the transpose of the matrix to a new coo binary file, one
+        chunk of records at a time.  The matrix is never materialized
+
+        Args:
+            filename (`str`): the binary file to write
+
+        Returns:
+            `LazyBinaryMatrix`: a handle to the transposed matrix
+
+        """
+        writer = _CooTileWriter(filename, self.ncol, self.nrow)
+        for start in range(0, self.nnz, self.chunk):
+            rec = self.records[start:min(self.nnz, start + self.chunk)]
+            irows, icols = self._rowcol(rec)
+            writer.write(icols, irows, rec["dtemp"])
+        writer.close(self.col_names, self.row_names)
+        return LazyBinaryMatrix(filename, astype=self.astype, chunk=self.chunk,
+                                memory=self.memory)
+
+    def dot(self, other, filename=None, memory=None):
+        """out-of-core product of the matrix in the file with an in-memory
+        `Matrix` (or `Cov`), aligned on the common names like `Matrix.__mul__`.
+
+        Args:
+            other (`Matrix`): the right-hand operand
+            filename (`str`): optional coo binary file to write the result
+                to tile-by-tile.  If None, the result is returned in memory
+            memory (`int`): approximate number of bytes per tile.  If None,
+                `LazyBinaryMatrix.memory` is used
+
+        Returns:
+            `Matrix` or `LazyBinaryMatrix`: the product, or a handle to it if
+            `filename` was passed
+
+        Note:
+            for sorted PEST (column-major) files, the product is accumulated
+            over column tiles, so the result is always held in memory
+
+        Example::
+
+            handle = pyemu.Jco.open_binary("big.jcb")
+            handle.dot(parcov, filename="jco_x_parcov.jcb")
+
+        """
+        if not isinstance(other, Matrix):
+            raise Exception("LazyBinaryMatrix.dot(): other must be a Matrix, not " +
+                            "{0}".format(type(other)))
+        other_rows = set(other.row_names)
+        common = [name for name in self.col_names if name in other_rows]
+        if len(common) == 0:
+            raise Exception("LazyBinaryMatrix.dot(): no common names between " +
+                            "the columns of the file and the rows of other")
+        if isinstance(other, Cov):
+            other = other.get(common)
+        else:
+            other = other.get(row_names=common)
+        col_names = other.col_names
+
+        if self.lead_axis == 1:
+            ox = other.as_2d
+            x = np.zeros((self.nrow, ox.shape[1]), dtype=ox.dtype)
+            start = 0
+            for tile in self.tiles(axis=1, col_names=common, memory=memory):
+                n = tile.shape[1]
+                x += tile.x.dot(ox[start:start + n, :])
+                start += n
+            prod = Matrix(x=x, row_names=self.row_names, col_names=col_names)
+            if filename is None:
+                return prod
+            prod.to_coo(filename)
+            return LazyBinaryMatrix(filename, astype=Matrix, chunk=self.chunk,
+                                    memory=self.memory)
+
+        if filename is None:
+            xs = [(tile * other).as_2d for tile in
+                  self.tiles(axis=0, col_names=common, memory=memory)]
+            return Matrix(x=np.vstack(xs), row_names=self.row_names, col_names=col_names)
+        writer = _CooTileWriter(filename, self.nrow, len(col_names))
+        offset = 0
+        for tile in self.tiles(axis=0, col_names=common, memory=memory):
+            writer.write_dense((tile * other).as_2d, offset)
+            offset += tile.shape[0]
+        writer.close(self.row_names, col_names)
+        return LazyBinaryMatrix(filename, astype=Matrix, chunk=self.chunk,
+                                memory=self.memory)
+
+    def xtqx(self, obscov=None, memory=None):
+        """out-of-core formation of the normal matrix J^T Q J, where J is
+        the (jco) matrix in the file.  Only `memory` bytes of J are held at once
+
+        Args:
+            obscov (`Cov`): the observation noise covariance.  Q is the inverse
+                of `obscov`.  If None, Q is the identity.  Only the rows of J
+                in `obscov` are used
+            memory (`int`): approximate number of bytes of J held in memory at
+                once.  If None, `LazyBinaryMatrix.memory` is used
+
+        Returns:
+            `Cov`: the normal matrix, named by the columns of J
+
+        Note:
+            with a diagonal (or no) `obscov` and a row-major (or unsorted) file,
+            the records are visited once.  Otherwise the columns of J are
+            visited in pairs of tiles, each pair using `memory` bytes
+
+        Example::
+
+            handle = pyemu.Jco.open_binary("big.jcb")
+            normal = handle.xtqx(obscov=pyemu.Cov.from_observation_data(pst))
+
+        """
+        row_names = self.row_names
+        q = None
+        if obscov is not None:
+            cov_rows = set(obscov.row_names)
+            row_names = [name for name in self.row_names if name in cov_rows]
+            if len(row_names) == 0:
+                raise Exception("LazyBinaryMatrix.xtqx(): no common names between " +
+                                "the rows of the file and obscov")
+            q = obscov.get(row_names).inv
+        x = np.zeros((self.ncol, self.ncol))
+
+        if (q is None or q.isdiagonal) and self.lead_axis != 1:
+            qd = None if q is None else q.x.flatten()
+            start = 0
+            for tile in self.tiles(axis=0, row_names=row_names, memory=memory):
+                tx = tile.as_2d
+                if qd is None:
+                    x += tx.T.dot(tx)
+                else:
+                    x += tx.T.dot(_scale(tx, qd[start:start + tx.shape[0]], 0))
+                start += tx.shape[0]
+            return Cov(x=x, names=self.col_names)
+
+        if memory is None:
+            memory = self.memory
+        row_idxs = self.indices(row_names, 0)
+        col_tiles = self._tile_idxs(np.arange(self.ncol), row_idxs.shape[0],
+                                    memory // 2)
+        bounds = np.cumsum([0] + [idxs.shape[0] for idxs in col_tiles])
+        for a, a_idxs in enumerate(col_tiles):
+            ja = self._values(row_idxs, a_idxs)
+            if q is None:
+                qja = ja
+            elif q.isdiagonal:
+                qja = _scale(ja, q.x.flatten(), 0)
+            else:
+                qja = q.as_2d.dot(ja)
+            for b in range(a, len(col_tiles)):
+                jb = ja if b == a else self._values(row_idxs, col_tiles[b])
+                block = jb.T.dot(qja)
+                x[bounds[b]:bounds[b + 1], bounds[a]:bounds[a + 1]] = block
+                x[bounds[a]:bounds[a + 1], bounds[b]:bounds[b + 1]] = block.T
+        return Cov(x=x, names=self.col_names)
+
+    def close(self):
+        """release the memory map of the numeric records.  The handle can
+        still be used - the records are re-mapped on demand
+        """
+        self.__records = None
+
+    def to_matrix(self, sparse=False):
+        """materialize the entire file
+
+        Args:
+            sparse (`bool`): flag to return a `scipy.sparse` backed `Matrix`.
+                Default is False
+
+        Returns:
+            `Matrix`: the full matrix
+
+        """
+        return self.get(sparse=sparse)
+
+
+class _CooTileWriter(object):
+    """streaming writer of coo (extended) PEST-compatible binary files.  The
+    records are appended block-by-block and the record count in the header
+    is patched when the writer is closed
+    """
+    def __init__(self, filename, nrow, ncol):
+        self.f = open(filename, 'wb')
+        self.nrow, self.ncol = int(nrow), int(ncol)
+        self.nnz = 0
+        np.array((self.ncol, self.nrow, 0),
+                 dtype=Matrix.binary_header_dt).tofile(self.f)
+
+    def write(self, row_idxs, col_idxs, vals):
+        """append the nonzero (zero-based) `row_idxs`, `col_idxs`, `vals` triplets
+        """
+        vals = np.asarray(vals)
+        keep = vals != 0.0
+        data = np.core.records.fromarrays([np.asarray(row_idxs)[keep],
+                                           np.asarray(col_idxs)[keep],
+                                           vals[keep]],
+                                          dtype=Matrix.coo_rec_dt)
+        data.tofile(self.f)
+        self.nnz += data.shape[0]
+
+    def write_dense(self, x, row_offset=0):
+        """append the nonzero entries of the dense tile `x`, which starts at
+        row `row_offset`
+        """
+        ii, jj = np.nonzero(x)
+        self.write(ii + row_offset, jj, x[ii, jj])
+
+    def close(self, row_names, col_names):
+        """write the names and patch the header
+        """
+        Matrix._write_binary_names(self.f, col_names, Matrix.new_par_length, "par")
+        Matrix._write_binary_names(self.f, row_names, Matrix.new_obs_length, "obs")
+        self.f.seek(0)
+        np.array((self.ncol, self.nrow, self.nnz),
+                 dtype=Matrix.binary_header_dt).tofile(self.f)
+        self.f.close()
+
+
+class Jco(Matrix):
+    """a thin wrapper class to get more intuitive attribute names.  Functions
+    exactly like `Matrix`
+    """
+    def __init(self, **kwargs):
+        """ Jco constuctor takes the same arguments as Matrix.
+
+        Args:
+            **kwargs (`dict`): constructor arguments for `Matrix`
+
+        Example:
+
+            jco = pyemu.Jco.from_binary("my.jco")
+
+
+        """
+
+        super(Jco, self).__init__(kwargs)
+
+
+    @property
+    def par_names(self):
+        """ thin wrapper around `Matrix.col_names`
+
+        Returns:
+            [`str`]: a list of parameter names
+
+        """
+        return self.col_names
+
+
+    @property
+    def obs_names(self):
+        """ thin wrapper around `Matrix.row_names`
+
+        Returns:
+            ['str']: a list of observation names
+
+        """
+        return self.row_names
+
+
+    @property
+    def npar(self):
+        """ number of parameters in the Jco
+
+        Returns:
+            `int`: number of parameters (columns)
+
+        """
+        return self.shape[1]
+
+
+    @property
+    def nobs(self):
+        """ number of observations in the Jco
+
+        Returns:
+            `int`: number of observations (rows)
+
+        """
+        return self.shape[0]
+
+
+    @classmethod
+    def from_pst(cls, pst, random=False):
+        """construct a new empty Jco from a control file filled
+        with trash
+
+        Args:
+            pst (`pyemu.Pst`): a pest control file instance.  If type is 'str',
+                `pst` is loaded from filename
+            random (`bool`): flag for contents of the trash matrix.
+                If True, fill with random numbers, if False, fill with zeros
+                Default is False
+
+        Returns:
+            `Jco`: the new Jco instance
+
+        """
+
+        if isinstance(pst,str):
+            pst = Pst(pst)
+
+        return Jco.from_names(pst.obs_names, pst.adj_par_names, random=random)
+
+class Cov(Matrix):
+    """Diagonal and/or dense Covariance matrices
+
+    Args:
+        x (`numpy.ndarray`): numeric values
+        names ([`str`]): list of row and column names
+        isdigonal (`bool`): flag if the Matrix is diagonal
+        autoalign (`bool`): flag to control the autoalignment of Matrix during
+            linear algebra operations
+
+    Example::
+
+        data = np.random.random((10,10))
+        names = ["par_{0}".format(i) for i in range(10)]
+        mat = pyemu.Cov(x=data,names=names)
+        mat.to_binary("mat.jco")
+
+    Note:
+        `row_names` and `col_names` args are supported in the contructor
+        so support inheritance.  However, users should only pass `names`
+
+    """
+    def __init__(self, x=None, names=[],row_names=[],col_names=[],
+                 isdiagonal=False, autoalign=True):
+
+        self.__identity = None
+        self.__zero = None
+        #if len(row_names) > 0 and len(col_names) > 0:
+        #    assert row_names == col_names
+        self.__identity = None
+        self.__zero = None
+        # if len(row_names) > 0 and len(col_names) > 0:
+        #    assert row_names == col_names
+        if len(names) != 0 and len(row_names) == 0:
+            row_names = names
+        if len(names) != 0 and len(col_names) == 0:
+            col_names = names
+        super(Cov, self).__init__(x=x, isdiagonal=isdiagonal,
+                                  row_names=row_names,
+                                  col_names=col_names,
+                                  autoalign=autoalign)
+        super(Cov, self).__init__(x=x, isdiagonal=isdiagonal,
+                                  row_names=row_names,
+                                  col_names=col_names,
+                                  autoalign=autoalign)
+        self.__factors = {}
+        self.__factor_x = None
+
+
+    def _factor(self, method):
+        """get the cached Cholesky factor (`method` = "cholesky", `None` if
+        not positive definite) or eigen decomposition (`method` = "eigh").
+        The cache is reset when the numeric storage is replaced
+        """
+        x = self._Matrix__x
+        if self.__factor_x is not x:
+            self.__factors = {}
+            self.__factor_x = x
+        if method not in self.__factors:
+            if method not in ["cholesky", "eigh"]:
+                raise Exception("Cov._factor(): unrecognized method: {0}".\
+                                format(method))
+            cache_file = _factor_cache_file(self, method)
+            factors = _load_factors(cache_file)
+            if method == "cholesky":
+                if factors is not None:
+                    # an empty array records a Cov that is not positive definite
+                    factor = factors[0] if factors[0].size > 0 else None
+                else:
+                    factor = _cholesky(self.as_2d)
+                    _save_factors(cache_file, [np.zeros(0) if factor is None else factor])
+            elif factors is not None:
+                factor = tuple(factors)
+            else:
+                factor = np.linalg.eigh(_upcast(self.as_2d))
+                _save_factors(cache_file, list(factor))
+            self.__factors[method] = factor
+        return self.__factors[method]
+
+    def factorize(self, method="cholesky"):
+        """get a factor `L` such that `L * L.T` equals this `Cov`.  The
+        factorization is cached and reused by `Cov.inv`, `Cov.logdet`,
+        `Cov.condition_on()` and `Ensemble._gaussian_draw()`
+
+        Args:
+            method (`str`): "cholesky" or "eigh".  "cholesky" gives the
+                lower-triangular Cholesky factor and falls back to "eigh" if
+                `Cov` is not positive definite.  "eigh" gives v * sqrt(w) from the
+                eigen decomposition, with eigen values less than 1.0e-10 treated as zero.
+                Default is "cholesky"
+
+        Returns:
+            `Matrix`: the factor, with `row_names` and `col_names` equal to `Cov.names`
+
+        Note:
+            the cache is reset when the numeric values of `Cov` are replaced (for example
+            `Cov.drop()` or `Cov.replace()`), but not if `Cov.x` is edited in place
+
+        Example::
+
+            cov = pyemu.Cov.from_ascii("prior.cov")
+            l = cov.factorize()
+            print((l * l.T - cov).x.max())
+
+        """
+        method = method.lower()
+        if method not in ["cholesky", "eigh"]:
+            raise Exception("Cov.factorize(): unrecognized method: {0}".\
+                            format(method))
+        if self.isdiagonal:
+            x = np.diag(np.sqrt(self.x[:, 0]))
+        else:
+            x = None
+            if method == "cholesky":
+                x = self._factor("cholesky")
+            if x is None:
+                x = _eigen_factor(*self._factor("eigh"))
+            x = x.astype(self.dtype, copy=False)
+        return Matrix(x=x, row_names=self.row_names, col_names=self.col_names,
+                      autoalign=self.autoalign)
+
+    @property
+    def logdet(self):
+        """natural log of the determinant
+
+        Returns:
+            `float`: log determinant.  Uses the cached Cholesky factor (or
+            eigen decomposition if `Cov` is not positive definite)
+
+        """
+        if self.isdiagonal:
+            return float(np.log(self.x).sum())
+        l = self._factor("cholesky")
+        if l is not None:
+            return 2.0 * float(np.log(np.diag(l)).sum())
+        w, _ = self._factor("eigh")
+        if np.any(w <= 0.0):
+            raise Exception("Cov.logdet: Cov is not positive definite")
+        return float(np.log(w).sum())
+
+    @property
+    def inv(self):
+        """inversion operation of `Cov`
+
+        Returns:
+            `Cov`: inverse of `Cov`
+
+        Note:
+            uses the cached Cholesky factor if `Cov` is positive definite,
+            otherwise `numpy.linalg.inv`
+
+        """
+        if self.isdiagonal or self.issparse:
+            return super(Cov, self).inv
+        l = self._factor("cholesky")
+        if l is None:
+            return super(Cov, self).inv
+        return type(self)(x=_cholesky_inv(l).astype(self.dtype, copy=False),
+                          names=self.row_names, autoalign=self.autoalign)
+
+
+    @property
+    def identity(self):
+        """get an identity `Cov` of the same shape
+
+        Returns:
+            `Cov`: new `Cov` instance with identity matrix
+
+        """
+        if self.__identity is None:
+            self.__identity = Cov(x=np.atleast_2d(np.ones(self.shape[0]))
                                   .transpose(), names=self.row_names,
                                   isdiagonal=True)
         return self.__identity
@@ -2240,17 +4118,15 @@ class Cov(Matrix):
             conditioning_elements = [conditioning_elements]
         for iname, name in enumerate(conditioning_elements):
             conditioning_elements[iname] = name.lower()
-            if name.lower() not in self.col_names:
+            if name.lower() not in self.col_idxs:
                 raise Exception("Cov.condition_on() name not found: " + name)
-        keep_names = []
-        for name in self.col_names:
-            if name not in conditioning_elements:
-                keep_names.append(name)
+        scond = set(conditioning_elements)
+        keep_names = [name for name in self.col_names if name not in scond]
         #C11
         new_Cov = self.get(keep_names)
         if self.isdiagonal:
             return new_Cov
-        #C22^1
+        #C22^1 - uses the Cholesky factor if positive definite
         cond_Cov = self.get(conditioning_elements).inv
         #C12
         upper_off_diag = self.get(keep_names, conditioning_elements)
@@ -2285,13 +4161,14 @@ class Cov(Matrix):
             raise Exception("Cov.replace() other must be Cov, not {0}".\
             format(type(other)))
         # make sure the names of other are in self
-        missing = [n for n in other.names if n not in self.names]
+        missing = [n for n in other.names if n not in self.row_idxs]
         if len(missing) > 0:
             raise Exception("Cov.replace(): the following other names are not" +\
                             " in self names: {0}".format(','.join(missing)))
         self_idxs = self.indices(other.names,0)
         other_idxs = other.indices(other.names,0)
 
+        self.__factor_x = None
         if self.isdiagonal and other.isdiagonal:
             self._Matrix__x[self_idxs] = other.x[other_idxs]
             return
@@ -2308,21 +4185,94 @@ class Cov(Matrix):
         #self.reset_x(self_x)
         #self.isdiagonal = False
 
-    def to_uncfile(self, unc_file, covmat_file="cov.mat", var_mult=1.0, include_path=True):
-        """write a PEST-compatible uncertainty file
+    def to_binary(self, filename, droptol=None, chunk=None, triangle=False):
+        """write a PEST-compatible binary file.  The format is the same
+        as the format used to storage a PEST Jacobian matrix
 
         Args:
-            unc_file (`str`): filename of the uncertainty file
-            covmat_file (`str`): covariance matrix filename. Default is
-                "Cov.mat".  If None, and Cov.isdiaonal, then a standard deviation
-                form of the uncertainty file is written.  Exception raised if `covmat_file` is `None`
-                and not `Cov.isdiagonal`
-            var_mult (`float`): variance multiplier for the covmat_file entry
+            filename (`str`): filename to save binary file
+            droptol (`float`): absolute value tolerance to make values
+                smaller `droptol` than zero.  Default is None (no dropping)
+            chunk (`int`): number of elements to write in a single pass.
+                Default is `None`, which writes the entire numeric part of the
+                `Cov` at once. This is faster but requires more memory.
+            triangle (`bool`): flag to only write the upper triangle.  The
+                file must be read with `Cov.from_binary(triangle=True)` (or
+                `PackedCov.from_binary()`).  Default is False
 
-        Example::
+        """
+        if not triangle or self.isdiagonal:
+            super(Cov, self).to_binary(filename, droptol=droptol, chunk=chunk)
+            return
+        if self.issparse:
+            coo = _sparse_module().triu(self.x).tocoo()
+            row_idxs, col_idxs, vals = coo.row, coo.col, coo.data
+            order = np.lexsort((row_idxs, col_idxs))
+            row_idxs, col_idxs, vals = row_idxs[order], col_idxs[order], vals[order]
+        else:
+            # column-major order of the upper triangle
+            col_idxs, row_idxs = np.nonzero(np.triu(self.x).transpose())
+            vals = self.x[row_idxs, col_idxs]
+        if np.any(np.isnan(vals)):
+            raise Exception("Cov.to_binary(): nans found")
+        keep = vals != 0.0
+        if droptol is not None:
+            keep = np.logical_and(keep, np.abs(vals) >= droptol)
+        self._write_binary_records(filename, row_idxs[keep], col_idxs[keep],
+                                   vals[keep], chunk=chunk)
 
-            cov = pyemu.Cov.from_parameter_data(pst)
-            cov.to_uncfile("my.unc")
+    @classmethod
+    def from_binary(cls, filename, sparse=False, triangle=False, dtype=None):
+        """class method load from PEST-compatible binary file into a
+        Cov instance
+
+        Args:
+            filename (`str`): filename to read
+            sparse (`bool`): flag to store the numeric values as a
+                `scipy.sparse` (CSR) matrix.  Default is False
+            triangle (`bool`): flag that the file holds only one triangle
+                (see `Cov.to_binary()`).  The other triangle is filled by
+                symmetry.  Default is False
+            dtype (`numpy.dtype`): dtype of the numeric values.  Default is
+                None (`Matrix.default_dtype`)
+
+        Returns:
+            `Cov`: `Cov` loaded from binary file
+
+        Example::
+
+            cov = pyemu.Cov.from_binary("prior_upper.jcb",triangle=True)
+
+        """
+        cov = super(Cov, cls).from_binary(filename, sparse=sparse, dtype=dtype)
+        if triangle:
+            x = cov.x
+            if _issparse(x):
+                sps = _sparse_module()
+                x = (sps.triu(x) + sps.triu(x, 1).transpose() +
+                     sps.tril(x, -1) + sps.tril(x, -1).transpose()).tocsr()
+            else:
+                x = np.triu(x) + np.triu(x, 1).transpose() +\
+                    np.tril(x, -1) + np.tril(x, -1).transpose()
+            cov = cls(x=x, names=cov.row_names, autoalign=cov.autoalign)
+            cov.filename = filename
+        return cov
+
+    def to_uncfile(self, unc_file, covmat_file="cov.mat", var_mult=1.0, include_path=True):
+        """write a PEST-compatible uncertainty file
+
+        Args:
+            unc_file (`str`): filename of the uncertainty file
+            covmat_file (`str`): covariance matrix filename. Default is
+                "Cov.mat".  If None, and Cov.isdiaonal, then a standard deviation
+                form of the uncertainty file is written.  Exception raised if `covmat_file` is `None`
+                and not `Cov.isdiagonal`
+            var_mult (`float`): variance multiplier for the covmat_file entry
+
+        Example::
+
+            cov = pyemu.Cov.from_parameter_data(pst)
+            cov.to_uncfile("my.unc")
 
         """
         assert len(self.row_names) == self.shape[0], \
@@ -2508,15 +4458,68 @@ class Cov(Matrix):
 
             cov = pyemu.Cov.from_uncfile("my.unc")
 
+        Note:
+            each referenced covariance matrix file is read once
+            (`Cov.read_uncfile_blocks()`).  The blocks are assembled into
+            a single `Cov` with one allocation
+
         """
+        blocks = Cov.read_uncfile_blocks(filename)
+        return cls._from_blocks(blocks)
 
-        nentries = Cov._get_uncfile_dimensions(filename)
-        x = np.zeros((nentries, nentries))
+    @classmethod
+    def _from_blocks(cls, blocks):
+        """assemble a list of block `Cov` instances (with unique names) into a
+        single block-diagonal `Cov`.  The result is diagonal if all blocks are
+        diagonal
+        """
         row_names = []
-        col_names = []
-        f = open(filename, 'r')
-        isdiagonal = True
+        for block in blocks:
+            row_names.extend(block.row_names)
+        nentries = len(row_names)
+        isdiagonal = all([block.isdiagonal for block in blocks])
+        if isdiagonal:
+            x = np.zeros((nentries, 1))
+        else:
+            x = np.zeros((nentries, nentries))
         idx = 0
+        for block in blocks:
+            n = block.shape[0]
+            if isdiagonal:
+                x[idx:idx + n, :] = block.x
+            elif block.isdiagonal:
+                x[np.arange(idx, idx + n), np.arange(idx, idx + n)] = block.x[:, 0]
+            else:
+                x[idx:idx + n, idx:idx + n] = block.as_2d
+            idx += n
+        return cls(x=x, names=row_names, isdiagonal=isdiagonal)
+
+    @staticmethod
+    def read_uncfile_blocks(filename):
+        """read a PEST-compatible uncertainty file into a list of block `Cov`
+        instances in a single pass.  Each referenced covariance matrix file is
+        read once
+
+        Args:
+            filename (`str`):  uncertainty file name
+
+        Returns:
+            [`Cov`]: one `Cov` per "standard_deviation" or "covariance_matrix" block,
+            in the order they appear in `filename`.  "standard_deviation" blocks are
+            diagonal
+
+        """
+        blocks = []
+        names = set()
+
+        def check_names(block_names):
+            for name in block_names:
+                if name in names:
+                    raise Exception("Cov.from_uncfile():" +
+                                    " duplicate name: " + str(name))
+                names.add(name)
+
+        f = open(filename, 'r')
         while True:
             line = f.readline().lower()
             if len(line) == 0:
@@ -2525,35 +4528,34 @@ class Cov(Matrix):
             if 'start' in line:
                 if 'standard_deviation' in line:
                     std_mult = 1.0
+                    block_names, block_vars = [], []
                     while True:
                         line2 = f.readline().strip().lower()
                         if line2.strip().lower().startswith("end"):
                             break
 
-
                         raw = line2.strip().split()
                         name,val = raw[0], float(raw[1])
                         if name == "std_multiplier":
                             std_mult = val
                         else:
-                            x[idx, idx] = (val*std_mult)**2
-                            if name in row_names:
-                                raise Exception("Cov.from_uncfile():" +
-                                                "duplicate name: " + str(name))
-                            row_names.append(name)
-                            col_names.append(name)
-                            idx += 1
+                            block_vars.append((val*std_mult)**2)
+                            block_names.append(name)
+                    check_names(block_names)
+                    if len(block_names) > 0:
+                        blocks.append(Cov(x=np.atleast_2d(np.array(block_vars)).transpose(),
+                                          names=block_names, isdiagonal=True))
 
                 elif 'covariance_matrix' in line:
-                    isdiagonal = False
                     var = 1.0
+                    cov = None
                     while True:
                         line2 = f.readline().strip().lower()
                         if line2.strip().lower().startswith("end"):
                             break
                         if line2.startswith('file'):
-                            filename = line2.split()[1].replace("'",'').replace('"','')
-                            cov = Matrix.from_ascii(filename)
+                            mat_file = line2.split()[1].replace("'",'').replace('"','')
+                            cov = Cov.from_ascii(mat_file)
 
                         elif line2.startswith('variance_multiplier'):
                             var = float(line2.split()[1])
@@ -2561,29 +4563,23 @@ class Cov(Matrix):
                             raise Exception("Cov.from_uncfile(): " +
                                             "unrecognized keyword in" +
                                             "std block: " + line2)
+                    if cov is None:
+                        raise Exception("Cov.from_uncfile(): covariance_matrix block " +
+                                        "missing 'file' entry")
                     if var != 1.0:
                         cov *= var
-                    for name in cov.row_names:
-                        if name in row_names:
-                            raise Exception("Cov.from_uncfile():" +
-                                            " duplicate name: " + str(name))
-                    row_names.extend(cov.row_names)
-                    col_names.extend(cov.col_names)
-
-                    for i in range(cov.shape[0]):
-                        x[idx + i,idx:idx + cov.shape[0]] = cov.x[i, :].copy()
-                    idx += cov.shape[0]
+                    check_names(cov.row_names)
+                    blocks.append(cov)
                 else:
                     raise Exception('Cov.from_uncfile(): ' +
                                     'unrecognized block:' + str(line))
         f.close()
-        if isdiagonal:
-            x = np.atleast_2d(np.diag(x)).transpose()
-        return cls(x=x,names=row_names,isdiagonal=isdiagonal)
+        return blocks
 
     @staticmethod
     def _get_uncfile_dimensions(filename):
-        """quickly read an uncertainty file to find the dimensions
+        """quickly read an uncertainty file to find the dimensions.  Only the
+        header line of each referenced covariance matrix file is read
         """
         f = open(filename, 'r')
         nentries = 0
@@ -2608,9 +4604,9 @@ class Cov(Matrix):
                         if line2.strip().lower().startswith("end"):
                             break
                         if line2.startswith('file'):
-                            filename = line2.split()[1].replace("'", '').replace('"', '')
-                            cov = Matrix.from_ascii(filename)
-                            nentries += len(cov.row_names)
+                            mat_file = line2.split()[1].replace("'", '').replace('"', '')
+                            with open(mat_file, 'r') as fmat:
+                                nentries += int(fmat.readline().strip().split()[0])
                         elif line2.startswith('variance_multiplier'):
                             pass
                         else:
@@ -2639,35 +4635,46 @@ class Cov(Matrix):
         x = np.identity(other.shape[0])
         return cls(x=x,names=other.row_names,isdiagonal=False)
 
-    def to_pearson(self):
+    def to_pearson(self, sparse=None):
         """ Convert Cov instance to Pearson correlation coefficient
         matrix
 
+        Args:
+            sparse (`bool`): flag to return `scipy.sparse` (CSR) storage.  If
+                None, the storage of `Cov` is kept. Default is None
+
         Returns:
             `Matrix`: A `Matrix` of correlation coefs.  Return type is `Matrix`
             on purpose so that it is clear the returned instance is not a Cov
 
+        Note:
+            computed as D^-1/2 C D^-1/2, where D is the diagonal of C.  Sparse
+            storage is never expanded to a dense array
+
         """
-        std_dict = self.get_diagonal_vector().to_dataframe()["diag"].\
-            apply(np.sqrt).to_dict()
-        pearson = self.identity.as_2d
+        if sparse is None:
+            sparse = self.issparse
         if self.isdiagonal:
-            return Matrix(x=pearson,row_names=self.row_names,
-                          col_names=self.col_names)
-        df = self.to_dataframe()
-        # fill the lower triangle
-        for i,iname in enumerate(self.row_names):
-            for j,jname in enumerate(self.row_names[i+1:]):
-                # cv = df.loc[iname,jname]
-                # std1,std2 = std_dict[iname],std_dict[jname]
-                # cc = cv / (std1*std2)
-                # v1 = np.sqrt(df.loc[iname,iname])
-                # v2 = np.sqrt(df.loc[jname,jname])
-                pearson[i,j+i+1] = df.loc[iname,jname] / (std_dict[iname] * std_dict[jname])
-
-        # replicate across diagonal
-        for i,iname in enumerate(self.row_names[:-1]):
-             pearson[i+1:,i] = pearson[i,i+1:]
+            pearson = self.identity.as_2d
+            if sparse:
+                pearson = _sparse_module().identity(self.shape[0], format="csr")
+        elif self.issparse:
+            sps = _sparse_module()
+            with np.errstate(divide="ignore"):
+                std_inv = sps.diags(1.0 / np.sqrt(self.x.diagonal()))
+            pearson = sps.csr_matrix(std_inv.dot(self.x).dot(std_inv),
+                                     dtype=self.dtype)
+            pearson.setdiag(1.0)
+            if not sparse:
+                pearson = pearson.toarray()
+        else:
+            x = self.as_2d
+            std = np.sqrt(np.diag(x))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pearson = (x / std[:, None]) / std[None, :]
+            np.fill_diagonal(pearson, 1.0)
+            if sparse:
+                pearson = _sparse_module().csr_matrix(pearson)
         return Matrix(x=pearson,row_names=self.row_names,
                       col_names=self.col_names)
 
@@ -2675,3 +4682,1681 @@ class Cov(Matrix):
 
 
 
+
+class BlockDiagonalCov(Cov):
+    """Block-diagonal covariance matrix: a collection of independent dense
+    blocks plus a diagonal remainder.  Only the blocks and the remainder are
+    stored, so memory and factorization costs are the sum of the block costs
+
+    Args:
+        x (`numpy.ndarray`): optional dense (or diagonal) numeric values.  If
+            passed, the instance is stored as a single block.  Supported so
+            that `BlockDiagonalCov` can be used anywhere a `Cov` is expected
+        names ([`str`]): list of row and column names.  If `blocks` and/or
+            `diagonal` are passed, `names` is optional and sets the order of the
+            names; otherwise the names are ordered block-by-block followed by
+            the diagonal remainder
+        row_names ([`str`]): supported for inheritance only
+        col_names ([`str`]): supported for inheritance only
+        isdiagonal (`bool`): flag if `x` is diagonal
+        autoalign (`bool`): flag to control the autoalignment of Matrix during
+            linear algebra operations
+        blocks ([`Cov`]): list of (dense) `Cov` blocks.  Names must be unique
+            across all blocks.  Diagonal blocks are merged into the diagonal remainder
+        diagonal (`Cov`): diagonal `Cov` for names that are not in any block
+
+    Example::
+
+        pst = pyemu.Pst("my.pst")
+        sd = {"struct.dat":["hkpp.dat.tpl","vka.dat.tpl"]}
+        cov = pyemu.helpers.geostatistical_prior_builder(pst,struct_dict=sd,
+                                                         block_diagonal=True)
+        cov.inv.to_binary("prior_inv.jcb")
+        pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst,cov=cov)
+
+    Note:
+        `inv`, `sqrt`, `get()`, `drop()`, `T`, dot products (on either side
+        of `*`), `to_binary()`, `to_coo()`, `to_ascii()` and
+        `ParameterEnsemble.from_gaussian_draw()` operate block by block.
+
+        `BlockDiagonalCov.x` (and any `Matrix` operation that is not
+        specialized here) uses a temporary dense copy; the block structure is
+        never changed in place, so edits to `x` are not kept.  Adding a
+        diagonal `Cov` and `condition_on()` keep the block structure, other
+        additions return a dense `Cov`.  `replace()` is not supported
+
+    """
+    def __init__(self, x=None, names=[], row_names=[], col_names=[],
+                 isdiagonal=False, autoalign=True, blocks=None, diagonal=None):
+        self.__blocks = []
+        self.__diag_idxs = np.array([], dtype=int)
+        self.__diag = np.array([])
+        self.__factors = {}
+        self.__factor_blocks = None
+        if len(names) == 0:
+            names = row_names if len(row_names) > 0 else col_names
+        if len(row_names) > 0 and len(col_names) > 0 and\
+                list(row_names) != list(col_names):
+            raise Exception("BlockDiagonalCov: row_names != col_names")
+        if x is not None:
+            if blocks is not None or diagonal is not None:
+                raise Exception("BlockDiagonalCov: can't pass 'x' with " +\
+                                "'blocks' or 'diagonal'")
+            if _issparse(x):
+                x = x.toarray()
+            if isdiagonal:
+                diagonal = Cov(x=x, names=names, isdiagonal=True)
+            else:
+                blocks = [Cov(x=x, names=names)]
+        if blocks is None:
+            blocks = []
+        if isinstance(blocks, Cov):
+            blocks = [blocks]
+        part_names, dense, diags = [], [], []
+        for block in blocks:
+            if not isinstance(block, Cov):
+                raise Exception("BlockDiagonalCov: blocks must be Cov, not {0}".\
+                                format(type(block)))
+            if block.isdiagonal:
+                diags.append(block)
+            else:
+                dense.append(block)
+        if diagonal is not None:
+            if not diagonal.isdiagonal:
+                raise Exception("BlockDiagonalCov: 'diagonal' must be diagonal")
+            diags.append(diagonal)
+        for block in dense:
+            part_names.extend(block.row_names)
+        for block in diags:
+            part_names.extend(block.row_names)
+        if len(names) == 0:
+            names = part_names
+        names = [str(n).lower() for n in names]
+        snames = set(names)
+        if len(snames) != len(names):
+            raise Exception("BlockDiagonalCov: duplicate names")
+        if len(part_names) != len(names) or len(set(part_names)) != len(names) or\
+                len(snames.symmetric_difference(part_names)) > 0:
+            raise Exception("BlockDiagonalCov: block names must be unique " +\
+                            "and match 'names'")
+        super(BlockDiagonalCov, self).__init__(names=names,
+                                               autoalign=autoalign)
+        for block in dense:
+            self.__blocks.append((self.indices(block.row_names, axis=0),
+                                  block.as_2d))
+        if len(diags) > 0:
+            self.__diag_idxs = np.concatenate([self.indices(d.row_names, axis=0)
+                                               for d in diags])
+            self.__diag = np.concatenate([d.x[:, 0] for d in diags])
+
+    @classmethod
+    def _from_parts(cls, names, blocks, diag_idxs, diag, autoalign=True):
+        """instantiate from (indices, numpy.ndarray) block pairs and
+        the diagonal remainder indices and values without any checking
+        """
+        new = cls.__new__(cls)
+        Cov.__init__(new, names=names, autoalign=autoalign)
+        new.__factors = {}
+        new.__factor_blocks = None
+        new.__blocks = blocks
+        new.__diag_idxs = diag_idxs
+        new.__diag = diag
+        return new
+
+    def _parts(self):
+        """the (indices, numpy.ndarray) block pairs and the diagonal remainder
+        indices and values
+        """
+        return self.__blocks, self.__diag_idxs, self.__diag
+
+    @property
+    def _Matrix__x(self):
+        """a temporary dense copy for inherited `Matrix` methods.  The copy
+        is not kept
+        """
+        if len(self.row_names) == 0:
+            return None
+        return self.as_2d
+
+    @_Matrix__x.setter
+    def _Matrix__x(self, x):
+        if x is None:
+            return
+        if x.ndim != 2 or x.shape[0] != x.shape[1]:
+            raise Exception("BlockDiagonalCov: dense storage must be square, " +\
+                            "not {0}".format(x.shape))
+        self.__blocks = [(np.arange(x.shape[0]), x)]
+        self.__diag_idxs = np.array([], dtype=int)
+        self.__diag = np.array([])
+
+    @property
+    def x(self):
+        """a dense copy.  Edits are not written back, use
+        `BlockDiagonalCov.blocks` and `BlockDiagonalCov.diagonal` instead
+
+        Returns:
+            `numpy.ndarray`: dense copy
+
+        """
+        return self.as_2d
+
+    def to_dataframe(self):
+        """return a (dense) pandas.DataFrame representation
+
+        Returns:
+            `pandas.DataFrame`: a dataframe derived from `BlockDiagonalCov`
+
+        """
+        return pd.DataFrame(data=self.as_2d, index=self.row_names,
+                            columns=self.col_names)
+
+    def __add__(self, other):
+        """addition overload.  A diagonal `Cov` is added block by block,
+        everything else is added to a dense copy
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to add
+
+        Returns:
+            `BlockDiagonalCov` or `Cov`: the result of addition
+
+        """
+        if not isinstance(other, Cov) or not other.isdiagonal or \
+                isinstance(other, (BlockDiagonalCov, PackedCov)):
+            return self.to_dense() + other
+        if self.autoalign and other.autoalign and \
+                not self.element_isaligned(other):
+            if set(other.row_names) != set(self.row_names):
+                return self.to_dense() + other
+            other = other.get(self.row_names)
+        elif self.shape != other.shape:
+            raise Exception("BlockDiagonalCov.__add__(): shape mismatch: " +\
+                            str(self.shape) + ' ' + str(other.shape))
+        d = other.x[:, 0]
+        blocks = []
+        for idxs, x in self.__blocks:
+            x = x.astype(np.result_type(x.dtype, d.dtype))
+            x[np.diag_indices_from(x)] += d[idxs]
+            blocks.append((idxs, x))
+        return type(self)._from_parts(self.row_names, blocks,
+                                      self.__diag_idxs.copy(),
+                                      self.__diag + d[self.__diag_idxs],
+                                      autoalign=self.autoalign)
+
+    def __sub__(self, other):
+        """subtraction overload, see `BlockDiagonalCov.__add__()`
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to subtract
+
+        Returns:
+            `BlockDiagonalCov` or `Cov`: the result of subtraction
+
+        """
+        if isinstance(other, Cov) and other.isdiagonal and \
+                not isinstance(other, (BlockDiagonalCov, PackedCov)):
+            return self + (other * -1.0)
+        return self.to_dense() - other
+
+    def condition_on(self, conditioning_elements):
+        """get a new `BlockDiagonalCov` that is conditional on knowing some
+        elements.  Only the blocks that hold conditioning elements change
+
+        Args:
+            conditioning_elements (['str']): list of names of elements to condition on
+
+        Returns:
+            `BlockDiagonalCov`: new conditional covariance that assumes
+            `conditioning_elements` have become known
+
+        """
+        if not isinstance(conditioning_elements, list):
+            conditioning_elements = [conditioning_elements]
+        conditioning_elements = [name.lower() for name in conditioning_elements]
+        for name in conditioning_elements:
+            if name not in self.col_idxs:
+                raise Exception("BlockDiagonalCov.condition_on() name not found: " +\
+                                name)
+        scond = set(conditioning_elements)
+        keep_names = [name for name in self.col_names if name not in scond]
+        blocks = []
+        for block in self.blocks:
+            if len(scond.intersection(block.row_names)) > 0:
+                cond = [name for name in block.row_names if name in scond]
+                if len(cond) == len(block.row_names):
+                    continue
+                block = block.condition_on(cond)
+                block = Cov(x=block.as_2d, names=block.row_names)
+            blocks.append(block)
+        diagonal = self.diagonal
+        if diagonal is not None:
+            dkeep = [name for name in diagonal.row_names if name not in scond]
+            diagonal = diagonal.get(dkeep) if len(dkeep) > 0 else None
+        return type(self)(names=keep_names, blocks=blocks, diagonal=diagonal,
+                          autoalign=self.autoalign)
+
+    def replace(self, other):
+        """not supported: replacing elements can change the block structure
+
+        """
+        raise Exception("BlockDiagonalCov.replace() not supported, use " +\
+                        "BlockDiagonalCov.to_dense().replace()")
+
+    @property
+    def blocks(self):
+        """the dense blocks
+
+        Returns:
+            [`Cov`]: list of dense block `Cov` instances
+
+        """
+        names = self.row_names
+        return [Cov(x=x, names=[names[i] for i in idxs], autoalign=self.autoalign)
+                for idxs, x in self.__blocks]
+
+    @property
+    def diagonal(self):
+        """the diagonal remainder
+
+        Returns:
+            `Cov`: diagonal `Cov` of names not in any block.  `None` if
+            all names are in a block
+
+        """
+        if self.__diag.shape[0] == 0:
+            return None
+        names = self.row_names
+        return Cov(x=self.__diag.copy().reshape(-1, 1),
+                   names=[names[i] for i in self.__diag_idxs],
+                   isdiagonal=True, autoalign=self.autoalign)
+
+    @property
+    def nblocks(self):
+        """number of dense blocks
+
+        Returns:
+            `int`: number of dense blocks
+
+        """
+        return len(self.__blocks)
+
+    @property
+    def shape(self):
+        """get the implied, 2D shape
+
+        Returns:
+            `int`: length of 2 tuple
+
+        """
+        n = len(self.row_names)
+        return (n, n)
+
+    @property
+    def issparse(self):
+        """`BlockDiagonalCov` is never stored as `scipy.sparse`
+
+        Returns:
+            `bool`: False
+
+        """
+        return False
+
+    @property
+    def as_2d(self):
+        """a dense copy
+
+        Returns:
+            `numpy.ndarray`: dense copy.  The block structure is not changed
+
+        """
+        x = np.zeros(self.shape, dtype=self.dtype)
+        for idxs, bx in self.__blocks:
+            x[np.ix_(idxs, idxs)] = bx
+        x[self.__diag_idxs, self.__diag_idxs] = self.__diag
+        return x
+
+    @property
+    def newx(self):
+        """a dense copy
+
+        Returns:
+            `numpy.ndarray`: dense copy
+
+        """
+        return self.as_2d
+
+    @property
+    def dtype(self):
+        """the numeric dtype of the blocks and the diagonal remainder
+
+        Returns:
+            `numpy.dtype`: dtype of the numeric values
+
+        """
+        parts = [x for _, x in self.__blocks]
+        if self.__diag.shape[0] > 0 or len(parts) == 0:
+            parts.append(self.__diag)
+        return np.result_type(*parts)
+
+    def astype(self, dtype):
+        """get a copy with the numeric values cast to `dtype`
+
+        Args:
+            dtype (`numpy.dtype`): the new dtype, for example `numpy.float32`
+
+        Returns:
+            `BlockDiagonalCov`: copy with `dtype` values
+
+        """
+        return self._map(lambda x: x.astype(dtype))
+
+    def to_dense(self):
+        """get a dense `Cov`
+
+        Returns:
+            `Cov`: dense `Cov`
+
+        """
+        return Cov(x=self.as_2d, names=self.row_names, autoalign=self.autoalign)
+
+    def to_sparse(self):
+        """get a `Cov` that uses `scipy.sparse` (CSR) storage
+
+        Returns:
+            `Cov`: sparse-storage `Cov`
+
+        """
+        sps = _sparse_module()
+        row_idxs, col_idxs, vals = self._triplets()
+        x = sps.csr_matrix((vals, (row_idxs, col_idxs)), shape=self.shape)
+        return Cov(x=x, names=self.row_names, autoalign=self.autoalign)
+
+    def _triplets(self, droptol=None):
+        """the row indices, column indices and values of the non-zero entries
+        in column-major order
+        """
+        rows, cols, vals = [self.__diag_idxs], [self.__diag_idxs], [self.__diag]
+        for idxs, x in self.__blocks:
+            n = idxs.shape[0]
+            rows.append(np.tile(idxs, n))
+            cols.append(np.repeat(idxs, n))
+            vals.append(x.flatten(order='F'))
+        rows, cols, vals = np.concatenate(rows), np.concatenate(cols),\
+                           np.concatenate(vals)
+        keep = vals != 0.0
+        if droptol is not None:
+            keep = np.logical_and(keep, np.abs(vals) >= droptol)
+        rows, cols, vals = rows[keep], cols[keep], vals[keep]
+        order = np.lexsort((rows, cols))
+        return rows[order], cols[order], vals[order]
+
+    def __str__(self):
+        """overload of object.__str__()
+
+        Returns:
+            `str`: string representation
+
+        """
+        return "shape:{0}:{1}".format(*self.shape) + " names: " +\
+               str(self.row_names) + '\n' + "{0} blocks of sizes {1}".\
+               format(self.nblocks, [b[0].shape[0] for b in self.__blocks]) +\
+               " and {0} diagonal elements".format(self.__diag.shape[0])
+
+    def _map(self, func):
+        """a new `BlockDiagonalCov` with `func` applied to each block and
+        to the diagonal remainder
+        """
+        blocks = [(idxs, func(x)) for idxs, x in self.__blocks]
+        return type(self)._from_parts(self.row_names, blocks,
+                                      self.__diag_idxs.copy(),
+                                      func(self.__diag.copy()),
+                                      autoalign=self.autoalign)
+
+    def copy(self):
+        """get a copy
+
+        Returns:
+            `BlockDiagonalCov`: copy
+
+        """
+        return self._map(np.copy)
+
+    @property
+    def transpose(self):
+        """block-wise transpose
+
+        Returns:
+            `BlockDiagonalCov`: transpose
+
+        """
+        return self._map(np.transpose)
+
+    @property
+    def inv(self):
+        """block-wise inversion
+
+        Returns:
+            `BlockDiagonalCov`: inverse
+
+        Note:
+            uses `numpy.linalg.inv` for each block
+
+        """
+        if np.any(self.__diag == 0.0):
+            invalid = [self.row_names[i] for i in self.__diag_idxs[self.__diag == 0.0]]
+            raise Exception("BlockDiagonalCov.inv has produced invalid floating points " +
+                            " for the following elements:" + ','.join(invalid))
+        return self._map(BlockDiagonalCov._block_inv)
+
+    @staticmethod
+    def _block_inv(x):
+        if x.ndim == 1:
+            return 1.0 / x
+        l = _cholesky(x)
+        if l is None:
+            return np.linalg.inv(_upcast(x)).astype(x.dtype, copy=False)
+        return _cholesky_inv(l).astype(x.dtype, copy=False)
+
+    def factorize(self, method="cholesky"):
+        """get a block-wise factor `L` such that `L * L.T` equals this
+        `BlockDiagonalCov`.  The factor is cached
+
+        Args:
+            method (`str`): "cholesky" or "eigh", see `Cov.factorize()`.
+                Default is "cholesky"
+
+        Returns:
+            `BlockDiagonalCov`: the block-wise factor
+
+        """
+        method = method.lower()
+        if method not in ["cholesky", "eigh"]:
+            raise Exception("BlockDiagonalCov.factorize(): unrecognized method: {0}".\
+                            format(method))
+        if self.__factor_blocks is not self.__blocks:
+            self.__factors = {}
+            self.__factor_blocks = self.__blocks
+        if method not in self.__factors:
+            def factor(x):
+                if x.ndim == 1:
+                    return np.sqrt(x)
+                l = _cholesky(x) if method == "cholesky" else None
+                if l is None:
+                    l = _eigen_factor(*np.linalg.eigh(_upcast(x)))
+                return l.astype(x.dtype, copy=False)
+            self.__factors[method] = self._map(factor)
+        return self.__factors[method]
+
+    @property
+    def logdet(self):
+        """natural log of the determinant, the sum over the blocks
+
+        Returns:
+            `float`: log determinant
+
+        """
+        logdet = float(np.log(self.__diag).sum())
+        for _, x in self.__blocks:
+            l = _cholesky(x)
+            if l is not None:
+                logdet += 2.0 * float(np.log(np.diag(l)).sum())
+                continue
+            w = np.linalg.eigvalsh(_upcast(x))
+            if np.any(w <= 0.0):
+                raise Exception("BlockDiagonalCov.logdet: block is not positive definite")
+            logdet += float(np.log(w).sum())
+        return logdet
+
+    @property
+    def sqrt(self):
+        """block-wise (element-wise) square root operation
+
+        Returns:
+            `BlockDiagonalCov`: element-wise square root
+
+        """
+        return self._map(np.sqrt)
+
+    def __pow__(self, power):
+        """overload of numpy.ndarray.__pow__() operator
+
+        Args:
+            power (`float`): see `Matrix.__pow__()`
+
+        Returns:
+            `BlockDiagonalCov`: a new `BlockDiagonalCov`
+
+        """
+        if power > 0 and int(power) == float(power):
+            return self._map(lambda x: x**power)
+        return super(BlockDiagonalCov, self).__pow__(power)
+
+    def _positions(self, names, axis=0):
+        """the position of each element in `names` (-1 if not in `names`)"""
+        pos = np.zeros(self.shape[0], dtype=int) - 1
+        pos[self.indices(names, axis=axis)] = np.arange(len(names))
+        return pos
+
+    def get(self, row_names=None, col_names=None, drop=False):
+        """get a new `BlockDiagonalCov` ordered on `row_names` or `col_names`.
+        If both are passed and they differ, a dense `Matrix` is returned
+
+        Args:
+            row_names (['str'], optional): row_names for the result
+            col_names (['str'], optional): col_names for the result
+            drop (`bool`): flag to remove row_names and/or col_names
+
+        Returns:
+            `BlockDiagonalCov` or `Matrix`: the (sub) matrix
+
+        """
+        if row_names is None and col_names is None:
+            raise Exception("BlockDiagonalCov.get(): must pass at least" +
+                            " row_names or col_names")
+        if row_names is not None and not isinstance(row_names, list):
+            row_names = [row_names]
+        if col_names is not None and not isinstance(col_names, list):
+            col_names = [col_names]
+        if row_names is None or col_names is None or row_names == col_names:
+            names = row_names if row_names is not None else col_names
+            names = [n.lower() for n in names]
+            pos = self._positions(names)
+            blocks = []
+            for idxs, x in self.__blocks:
+                bpos = pos[idxs]
+                keep = bpos >= 0
+                if np.any(keep):
+                    blocks.append((bpos[keep], x[np.ix_(keep, keep)].copy()))
+            dpos = pos[self.__diag_idxs]
+            keep = dpos >= 0
+            extract = type(self)._from_parts(names, blocks, dpos[keep],
+                                             self.__diag[keep].copy(),
+                                             autoalign=self.autoalign)
+            if drop:
+                self.drop(names, 0)
+            return extract
+
+        row_names = [n.lower() for n in row_names]
+        col_names = [n.lower() for n in col_names]
+        rpos = self._positions(row_names, axis=0)
+        cpos = self._positions(col_names, axis=1)
+        x = np.zeros((len(row_names), len(col_names)), dtype=self.dtype)
+        for idxs, bx in self.__blocks:
+            brpos, bcpos = rpos[idxs], cpos[idxs]
+            rkeep, ckeep = brpos >= 0, bcpos >= 0
+            x[np.ix_(brpos[rkeep], bcpos[ckeep])] = bx[np.ix_(rkeep, ckeep)]
+        drpos, dcpos = rpos[self.__diag_idxs], cpos[self.__diag_idxs]
+        keep = np.logical_and(drpos >= 0, dcpos >= 0)
+        x[drpos[keep], dcpos[keep]] = self.__diag[keep]
+        if drop:
+            self.drop(row_names, 0)
+            self.drop(col_names, 1)
+        return Matrix(x=x, row_names=row_names, col_names=col_names,
+                      autoalign=self.autoalign)
+
+    def drop(self, names, axis=None):
+        """drop elements (rows and columns) in place
+
+        Args:
+            names (['str']): list of names to drop
+            axis (`int`): ignored - rows and columns are always dropped together
+
+        """
+        if not isinstance(names, list):
+            names = [names]
+        snames = set([name.lower() for name in names])
+        keep_names = [name for name in self.row_names if name not in snames]
+        if len(keep_names) == 0:
+            raise Exception("can't drop all names")
+        extract = self.get(keep_names)
+        self.__blocks, self.__diag_idxs, self.__diag = extract._parts()
+        self.row_names = keep_names
+        self.col_names = copy.deepcopy(keep_names)
+
+    def align(self, names, axis=None):
+        """reorder in place to follow `names`
+
+        Args:
+            names (['str']): names to align with
+            axis (`int`): ignored
+
+        """
+        if not isinstance(names, list):
+            names = [names]
+        extract = self.get(names)
+        self.__blocks, self.__diag_idxs, self.__diag = extract._parts()
+        self.row_names = extract.row_names
+        self.col_names = copy.deepcopy(extract.row_names)
+
+    def get_diagonal_vector(self, col_name="diag"):
+        """Get a new Matrix instance that is the diagonal
+
+        Args:
+            col_name (`str`): the name of the single column in the new Matrix
+
+        Returns:
+            `Matrix`: vector-shaped `Matrix` instance of the diagonal
+
+        """
+        d = np.zeros(self.shape[0])
+        for idxs, x in self.__blocks:
+            d[idxs] = np.diag(x)
+        d[self.__diag_idxs] = self.__diag
+        return Matrix(x=d.reshape(-1, 1), row_names=self.row_names,
+                      col_names=[col_name])
+
+    def _dot(self, other, left=True):
+        """block-wise dot product with a dense `numpy.ndarray`: self x other
+        if `left`, otherwise other x self
+        """
+        dtype = np.result_type(self.dtype, other.dtype)
+        if left:
+            x = np.zeros((self.shape[0], other.shape[1]), dtype=dtype)
+            for idxs, bx in self.__blocks:
+                x[idxs, :] = np.dot(bx, other[idxs, :])
+            x[self.__diag_idxs, :] = self.__diag[:, None] * other[self.__diag_idxs, :]
+        else:
+            x = np.zeros((other.shape[0], self.shape[1]), dtype=dtype)
+            for idxs, bx in self.__blocks:
+                x[:, idxs] = np.dot(other[:, idxs], bx)
+            x[:, self.__diag_idxs] = other[:, self.__diag_idxs] * self.__diag[None, :]
+        return x
+
+    @staticmethod
+    def _dense_operand(mat):
+        if mat.issparse:
+            return mat.x.toarray()
+        return mat.as_2d
+
+    def __mul__(self, other):
+        """block-wise dot product multiplication overload
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to dot product
+
+        Returns:
+            `BlockDiagonalCov` (scalar `other`), `Cov` (`Cov` `other`) or `Matrix`:
+            the result of dot product
+
+        """
+        if isinstance(other, pd.DataFrame):
+            other = Matrix.from_dataframe(other)
+        if np.isscalar(other):
+            return self._map(lambda x: x * other)
+        elif isinstance(other, np.ndarray):
+            if self.shape[1] != other.shape[0]:
+                raise Exception("BlockDiagonalCov.__mul__(): matrices are not aligned: " +\
+                                str(self.shape) + ' ' + str(other.shape))
+            return Matrix(x=self._dot(other))
+        elif isinstance(other, Matrix):
+            first, second = self, other
+            if self.autoalign and other.autoalign \
+                    and not self.mult_isaligned(other):
+                common, _, other_idxs = get_alignment_plan(self, 1, other, 0)
+                if len(common) == 0:
+                    raise Exception("BlockDiagonalCov.__mul__():self.col_names " +\
+                                    "and other.row_names " +\
+                                    "don't share any common elements")
+                first = self.get(common)
+                if isinstance(other, BlockDiagonalCov):
+                    second = other.get(common)
+                elif isinstance(other, Cov):
+                    second = other._take(other_idxs, other_idxs, common, common)
+                else:
+                    second = other._take(row_idxs=other_idxs, row_names=common)
+            elif self.shape[1] != other.shape[0]:
+                raise Exception("BlockDiagonalCov.__mul__(): matrices are not aligned: " +\
+                                str(self.shape) + ' ' + str(other.shape))
+            x = first._dot(BlockDiagonalCov._dense_operand(second))
+            if isinstance(other, Cov):
+                return Cov(x=x, row_names=first.row_names,
+                           col_names=second.col_names)
+            return Matrix(x=x, row_names=first.row_names,
+                          col_names=second.col_names)
+        else:
+            raise Exception("BlockDiagonalCov.__mul__(): unrecognized " +
+                            "other arg type in __mul__: " + str(type(other)))
+
+    def __rmul__(self, other):
+        """block-wise reverse order dot product multiplication overload
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to dot product
+
+        Returns:
+            `BlockDiagonalCov` (scalar `other`), `type(other)` or `Matrix`:
+            the result of dot product
+
+        """
+        if np.isscalar(other):
+            return self._map(lambda x: x * other)
+        elif isinstance(other, np.ndarray):
+            if self.shape[0] != other.shape[1]:
+                raise Exception("BlockDiagonalCov.__rmul__(): matrices are not aligned: " +\
+                                str(other.shape) + ' ' + str(self.shape))
+            return Matrix(x=self._dot(other, left=False))
+        elif isinstance(other, Matrix):
+            first, second = other, self
+            if self.autoalign and other.autoalign \
+                    and not other.mult_isaligned(self):
+                common, other_idxs, _ = get_alignment_plan(other, 1, self, 0)
+                if len(common) == 0:
+                    raise Exception("BlockDiagonalCov.__rmul__():self.row_names " +\
+                                    "and other.col_names " +\
+                                    "don't share any common elements")
+                second = self.get(common)
+                if isinstance(other, BlockDiagonalCov):
+                    first = other.get(common)
+                elif isinstance(other, Cov):
+                    first = other._take(other_idxs, other_idxs, common, common)
+                else:
+                    first = other._take(col_idxs=other_idxs, col_names=common)
+            elif other.shape[1] != self.shape[0]:
+                raise Exception("BlockDiagonalCov.__rmul__(): matrices are not aligned: " +\
+                                str(other.shape) + ' ' + str(self.shape))
+            x = second._dot(BlockDiagonalCov._dense_operand(first), left=False)
+            if isinstance(other, BlockDiagonalCov):
+                return Cov(x=x, row_names=first.row_names,
+                           col_names=second.col_names)
+            return type(other)(x=x, row_names=first.row_names,
+                               col_names=second.col_names)
+        else:
+            raise Exception("BlockDiagonalCov.__rmul__(): unrecognized " +
+                            "other arg type in __rmul__: " + str(type(other)))
+
+    def to_binary(self, filename, droptol=None, chunk=None):
+        """write a PEST-compatible binary file block by block (no dense
+        intermediate)
+
+        Args:
+            filename (`str`): filename to save binary file
+            droptol (`float`): absolute value tolerance to make values
+                smaller `droptol` than zero.  Default is None (no dropping)
+            chunk (`int`): number of elements to write in a single pass.
+                Default is `None`
+
+        """
+        row_idxs, col_idxs, vals = self._triplets(droptol=droptol)
+        if np.any(np.isnan(vals)):
+            raise Exception("BlockDiagonalCov.to_binary(): nans found")
+        self._write_binary_records(filename, row_idxs, col_idxs, vals, chunk=chunk)
+
+    def to_coo(self, filename, droptol=None, chunk=None):
+        """write an extended PEST-format binary file block by block (no dense
+        intermediate)
+
+        Args:
+            filename (`str`): filename to save binary file
+            droptol (`float`): absolute value tolerance to make values
+                smaller `droptol` than zero.  Default is None (no dropping)
+            chunk (`int`): number of elements to write in a single pass.
+                Default is `None`
+
+        """
+        row_idxs, col_idxs, vals = self._triplets(droptol=droptol)
+        self._write_binary_records(filename, row_idxs, col_idxs, vals, chunk=chunk,
+                                   coo=True)
+
+    def to_ascii(self, filename, icode=2):
+        """write a PEST-compatible ASCII Matrix file.  The dense form is formed
+        temporarily
+
+        Args:
+            filename (`str`): filename to write to
+            icode (`int`, optional): PEST-style info code for matrix style.
+                Default is 2
+
+        """
+        self.to_dense().to_ascii(filename, icode=icode)
+
+    @classmethod
+    def from_uncfile(cls, filename):
+        """instaniates a `BlockDiagonalCov` from a PEST-compatible uncertainty
+        file.  Each block of the uncertainty file becomes a block (or part of
+        the diagonal remainder)
+
+        Args:
+            filename (`str`):  uncertainty file name
+
+        Returns:
+            `BlockDiagonalCov`: `BlockDiagonalCov` instance from uncertainty file
+
+        """
+        return cls(blocks=Cov.read_uncfile_blocks(filename))
+
+
+def _packed_offsets(n):
+    """offset of the diagonal element of each row in the packed upper
+    triangle (row-major) of an `n` x `n` symmetric matrix
+    """
+    i = np.arange(n, dtype=np.int64)
+    return i * n - (i * (i - 1)) // 2
+
+
+def _pack(x):
+    """the upper triangle (row-major) of the square array `x` as a 1-D array
+    """
+    return np.concatenate([x[i, i:] for i in range(x.shape[0])])\
+        if x.shape[0] > 0 else np.array([])
+
+
+def _packed_lapack():
+    """the scipy.linalg (blas, lapack) modules or (None, None)
+    """
+    try:
+        from scipy.linalg import blas, lapack
+    except Exception as e:
+        return None, None
+    return blas, lapack
+
+
+class PackedCov(Cov):
+    """Dense symmetric covariance matrix that only stores the upper triangle.
+    Memory use is about half of a dense `Cov`
+
+    Args:
+        x (`numpy.ndarray`): optional dense (or diagonal) numeric values.
+            Only the upper triangle is used
+        names ([`str`]): list of row and column names
+        row_names ([`str`]): supported for inheritance only
+        col_names ([`str`]): supported for inheritance only
+        isdiagonal (`bool`): flag if `x` is diagonal
+        autoalign (`bool`): flag to control the autoalignment of Matrix during
+            linear algebra operations
+        packed (`numpy.ndarray`): the upper triangle, row by row, as a 1-D array
+            of length n * (n + 1) / 2.  This is the LAPACK "lower" packed
+            storage.  If passed, `x` must be None
+
+    Example::
+
+        gs = pyemu.geostats.read_struct_file("struct.dat")[0]
+        cov = gs.covariance_matrix(pp_df.x,pp_df.y,pp_df.name,packed=True)
+        cov.to_binary("prior_upper.jcb",triangle=True)
+        cov = pyemu.PackedCov.from_binary("prior_upper.jcb")
+
+    Note:
+        `inv`, `logdet`, `get()`, `drop()`, `T`, dot products (on either side
+        of `*`), addition of diagonal or packed `Cov`, `to_binary()` and
+        `to_coo()` work on the packed storage.  Dot products use BLAS
+        `dspmv` for vectors and row tiles of `PackedCov.tile_size` elements
+        otherwise; `inv` and `logdet` use the LAPACK packed Cholesky routines
+        (through scipy if available).
+
+        `PackedCov.x` (and any `Matrix` operation that is not specialized
+        here) uses a temporary dense copy; the packed storage is never
+        converted in place, so edits to `x` are not kept.  Assigning dense
+        values (for example with `reset_x()`) packs them
+
+    """
+    tile_size = 2**22
+
+    def __init__(self, x=None, names=[], row_names=[], col_names=[],
+                 isdiagonal=False, autoalign=True, packed=None):
+        self.__ap = None
+        self.__dense = None
+        self.__factors = {}
+        self.__factor_ap = None
+        if len(names) == 0:
+            names = row_names if len(row_names) > 0 else col_names
+        if len(row_names) > 0 and len(col_names) > 0 and\
+                list(row_names) != list(col_names):
+            raise Exception("PackedCov: row_names != col_names")
+        n = len(names)
+        if x is not None:
+            if packed is not None:
+                raise Exception("PackedCov: can't pass 'x' and 'packed'")
+            if _issparse(x):
+                x = x.toarray()
+            if isdiagonal:
+                packed = np.zeros(n * (n + 1) // 2, dtype=x.dtype)
+                packed[_packed_offsets(n)] = x.flatten()
+            else:
+                if x.ndim != 2 or x.shape[0] != x.shape[1]:
+                    raise Exception("PackedCov: x must be square, not {0}".\
+                                    format(x.shape))
+                packed = _pack(x)
+        if packed is not None:
+            packed = np.asarray(packed)
+            if packed.dtype.kind != 'f':
+                packed = packed.astype(float)
+            if packed.ndim != 1 or packed.shape[0] != n * (n + 1) // 2:
+                raise Exception("PackedCov: packed length {0} doesn't match {1} names".\
+                                format(packed.shape, n))
+        super(PackedCov, self).__init__(names=names, autoalign=autoalign)
+        self.__ap = packed
+
+    @classmethod
+    def _from_packed(cls, names, packed, autoalign=True):
+        """instantiate from the packed upper triangle without any checking
+        """
+        new = cls.__new__(cls)
+        Cov.__init__(new, names=names, autoalign=autoalign)
+        new.__factors = {}
+        new.__factor_ap = None
+        new.__dense = None
+        new.__ap = packed
+        return new
+
+    @property
+    def _Matrix__x(self):
+        """a temporary dense copy for inherited `Matrix` methods.  The copy
+        is not kept
+        """
+        if self.__ap is None and self.__dense is None:
+            return None
+        return self.as_2d
+
+    @_Matrix__x.setter
+    def _Matrix__x(self, x):
+        if x is None:
+            return
+        if x.ndim != 2 or x.shape[0] != x.shape[1]:
+            raise Exception("PackedCov: dense storage must be square, " +\
+                            "not {0}".format(x.shape))
+        self.__ap = _pack(x)
+        self.__dense = None
+
+    @property
+    def x(self):
+        """a dense copy.  Edits are not written back, use `PackedCov.packed`
+        or `PackedCov.reset_x()` instead
+
+        Returns:
+            `numpy.ndarray`: dense copy
+
+        """
+        return self.as_2d
+
+    def to_dataframe(self):
+        """return a (dense) pandas.DataFrame representation
+
+        Returns:
+            `pandas.DataFrame`: a dataframe derived from `PackedCov`
+
+        """
+        return pd.DataFrame(data=self.as_2d, index=self.row_names,
+                            columns=self.col_names)
+
+    def replace(self, other):
+        """replace elements with elements from other, see `Cov.replace()`.
+        The result is packed again
+
+        Args:
+            `Cov`: the Cov to replace elements in this `PackedCov` with
+
+        Note:
+            operates in place.  Uses a temporary dense copy
+
+        """
+        dense = Cov(x=self.as_2d, names=self.row_names)
+        dense.replace(other)
+        self._Matrix__x = dense.as_2d
+
+    @property
+    def packed(self):
+        """the packed upper triangle.  Converts dense storage (see `PackedCov.x`)
+        back to packed storage
+
+        Returns:
+            `numpy.ndarray`: the upper triangle, row by row
+
+        """
+        if self.__ap is None and self.__dense is not None:
+            self.__ap = _pack(self.__dense)
+            self.__dense = None
+        return self.__ap
+
+    @property
+    def shape(self):
+        """get the implied, 2D shape
+
+        Returns:
+            `int`: length of 2 tuple
+
+        """
+        n = len(self.row_names)
+        return (n, n)
+
+    @property
+    def issparse(self):
+        """`PackedCov` is never stored as `scipy.sparse`
+
+        Returns:
+            `bool`: False
+
+        """
+        return False
+
+    def _rows(self, idxs):
+        """dense rows `idxs` of the full symmetric matrix
+        """
+        ap, n = self.packed, self.shape[0]
+        offs = _packed_offsets(n)
+        x = np.empty((len(idxs), n), dtype=ap.dtype)
+        for k, i in enumerate(idxs):
+            x[k, i:] = ap[offs[i]:offs[i] + n - i]
+            x[k, :i] = ap[offs[:i] + i - np.arange(i)]
+        return x
+
+    def _row_tiles(self):
+        """(start, end, rows) tiles of about `PackedCov.tile_size` elements
+        """
+        n = self.shape[0]
+        step = max(1, self.tile_size // max(n, 1))
+        for start in range(0, n, step):
+            end = min(n, start + step)
+            yield start, end, self._rows(np.arange(start, end))
+
+    @property
+    def as_2d(self):
+        """a dense copy
+
+        Returns:
+            `numpy.ndarray`: dense copy.  The packed storage is not changed
+
+        """
+        if self.__ap is None:
+            return self.__dense.copy()
+        ap, n = self.__ap, self.shape[0]
+        offs = _packed_offsets(n)
+        x = np.empty((n, n), dtype=ap.dtype)
+        for i in range(n):
+            x[i, i:] = ap[offs[i]:offs[i] + n - i]
+            x[i:, i] = x[i, i:]
+        return x
+
+    @property
+    def newx(self):
+        """a dense copy
+
+        Returns:
+            `numpy.ndarray`: dense copy
+
+        """
+        return self.as_2d
+
+    @property
+    def dtype(self):
+        """the numeric dtype of the packed storage
+
+        Returns:
+            `numpy.dtype`: dtype of the numeric values
+
+        """
+        if self.__ap is None and self.__dense is not None:
+            return self.__dense.dtype
+        return self.packed.dtype
+
+    def astype(self, dtype):
+        """get a copy with the numeric values cast to `dtype`
+
+        Args:
+            dtype (`numpy.dtype`): the new dtype, for example `numpy.float32`
+
+        Returns:
+            `PackedCov`: copy with `dtype` values
+
+        """
+        return type(self)._from_packed(self.row_names, self.packed.astype(dtype),
+                                       autoalign=self.autoalign)
+
+    def to_dense(self):
+        """get a dense `Cov`
+
+        Returns:
+            `Cov`: dense `Cov`
+
+        """
+        return Cov(x=self.as_2d, names=self.row_names, autoalign=self.autoalign)
+
+    def __str__(self):
+        """overload of object.__str__()
+
+        Returns:
+            `str`: string representation
+
+        """
+        return "shape:{0}:{1}".format(*self.shape) + " names: " +\
+               str(self.row_names) + '\n' + "packed upper triangle of " +\
+               "{0} elements".format(self.packed.shape[0])
+
+    def copy(self):
+        """get a copy
+
+        Returns:
+            `PackedCov`: copy
+
+        """
+        return type(self)._from_packed(self.row_names, self.packed.copy(),
+                                       autoalign=self.autoalign)
+
+    @property
+    def transpose(self):
+        """transpose - a copy since `PackedCov` is symmetric
+
+        Returns:
+            `PackedCov`: transpose
+
+        """
+        return self.copy()
+
+    def _factor(self, method):
+        """see `Cov._factor()`.  The cache is reset when the packed storage
+        is replaced
+        """
+        ap = self.packed
+        if self.__factor_ap is not ap:
+            self.__factors = {}
+            self.__factor_ap = ap
+        if method not in self.__factors:
+            if method == "cholesky":
+                self.__factors[method] = _cholesky(self.as_2d)
+            elif method == "eigh":
+                self.__factors[method] = np.linalg.eigh(_upcast(self.as_2d))
+            else:
+                raise Exception("PackedCov._factor(): unrecognized method: {0}".\
+                                format(method))
+        return self.__factors[method]
+
+    def _packed_cholesky(self):
+        """the (double precision) packed Cholesky factor from LAPACK dpptrf.
+        `None` if scipy is not available or `PackedCov` is not positive definite
+        """
+        _, lapack = _packed_lapack()
+        if lapack is None or self.shape[0] == 0:
+            return None
+        ul, info = lapack.dpptrf(self.shape[0], _upcast(self.packed), lower=1)
+        if info != 0:
+            return None
+        return ul
+
+    @property
+    def inv(self):
+        """inversion operation of `PackedCov`
+
+        Returns:
+            `PackedCov`: inverse of `PackedCov`
+
+        Note:
+            uses the LAPACK packed Cholesky routines dpptrf and dpptri if
+            `PackedCov` is positive definite, otherwise `Cov.inv`
+
+        """
+        ul = self._packed_cholesky()
+        if ul is not None:
+            _, lapack = _packed_lapack()
+            inv, info = lapack.dpptri(self.shape[0], ul, lower=1)
+            if info == 0:
+                return type(self)._from_packed(self.row_names,
+                                               inv.astype(self.dtype, copy=False),
+                                               autoalign=self.autoalign)
+        inv = self.to_dense().inv
+        return type(self)(x=inv.x, names=self.row_names, autoalign=self.autoalign)
+
+    @property
+    def logdet(self):
+        """natural log of the determinant
+
+        Returns:
+            `float`: log determinant
+
+        """
+        ul = self._packed_cholesky()
+        if ul is not None:
+            return 2.0 * float(np.log(ul[_packed_offsets(self.shape[0])]).sum())
+        return super(PackedCov, self).logdet
+
+    @property
+    def sqrt(self):
+        """element-wise square root operation
+
+        Returns:
+            `PackedCov`: element-wise square root
+
+        """
+        return type(self)._from_packed(self.row_names, np.sqrt(self.packed),
+                                       autoalign=self.autoalign)
+
+    def __pow__(self, power):
+        """overload of numpy.ndarray.__pow__() operator
+
+        Args:
+            power (`float`): see `Matrix.__pow__()`
+
+        Returns:
+            `PackedCov` or `Cov`: the result.  Only `power` = -1 keeps the
+            packed storage
+
+        """
+        if power == -1:
+            return self.inv
+        return self.to_dense() ** power
+
+    def _positions(self, names, axis=0):
+        """the indices of `names`"""
+        return self.indices([n.lower() for n in names], axis=axis)
+
+    def get(self, row_names=None, col_names=None, drop=False):
+        """get a new `PackedCov` ordered on `row_names` or `col_names`.
+        If both are passed and they differ, a dense `Matrix` is returned
+
+        Args:
+            row_names (['str'], optional): row_names for the result
+            col_names (['str'], optional): col_names for the result
+            drop (`bool`): flag to remove row_names and/or col_names
+
+        Returns:
+            `PackedCov` or `Matrix`: the (sub) matrix
+
+        """
+        if row_names is None and col_names is None:
+            raise Exception("PackedCov.get(): must pass at least" +
+                            " row_names or col_names")
+        if row_names is not None and not isinstance(row_names, list):
+            row_names = [row_names]
+        if col_names is not None and not isinstance(col_names, list):
+            col_names = [col_names]
+        if row_names is None or col_names is None or row_names == col_names:
+            names = row_names if row_names is not None else col_names
+            names = [n.lower() for n in names]
+            pos = self._positions(names)
+            ap, n = self.packed, self.shape[0]
+            offs = _packed_offsets(n)
+            parts = []
+            for a in range(pos.shape[0]):
+                lo = np.minimum(pos[a], pos[a:])
+                hi = np.maximum(pos[a], pos[a:])
+                parts.append(ap[offs[lo] + hi - lo])
+            packed = np.concatenate(parts) if len(parts) > 0 else np.array([])
+            extract = type(self)._from_packed(names, packed,
+                                              autoalign=self.autoalign)
+            if drop:
+                self.drop(names, 0)
+            return extract
+        row_names = [n.lower() for n in row_names]
+        col_names = [n.lower() for n in col_names]
+        x = self._rows(self._positions(row_names, axis=0))
+        x = x[:, self._positions(col_names, axis=1)]
+        if drop:
+            self.drop(row_names, 0)
+            self.drop(col_names, 1)
+        return Matrix(x=x, row_names=row_names, col_names=col_names,
+                      autoalign=self.autoalign)
+
+    def drop(self, names, axis=None):
+        """drop elements (rows and columns) in place
+
+        Args:
+            names (['str']): list of names to drop
+            axis (`int`): ignored - rows and columns are always dropped together
+
+        """
+        if not isinstance(names, list):
+            names = [names]
+        snames = set([name.lower() for name in names])
+        keep_names = [name for name in self.row_names if name not in snames]
+        if len(keep_names) == 0:
+            raise Exception("can't drop all names")
+        self.align(keep_names)
+
+    def align(self, names, axis=None):
+        """reorder in place to follow `names`
+
+        Args:
+            names (['str']): names to align with
+            axis (`int`): ignored
+
+        """
+        if not isinstance(names, list):
+            names = [names]
+        extract = self.get(names)
+        self.__ap = extract.packed
+        self.__dense = None
+        self.row_names = extract.row_names
+        self.col_names = copy.deepcopy(extract.row_names)
+
+    def get_diagonal_vector(self, col_name="diag"):
+        """Get a new Matrix instance that is the diagonal
+
+        Args:
+            col_name (`str`): the name of the single column in the new Matrix
+
+        Returns:
+            `Matrix`: vector-shaped `Matrix` instance of the diagonal
+
+        """
+        d = self.packed[_packed_offsets(self.shape[0])]
+        return Matrix(x=d.reshape(-1, 1), row_names=self.row_names,
+                      col_names=[col_name])
+
+    def _packed_operand(self, other):
+        """the packed increment for adding `other` (a scalar, a diagonal `Cov`
+        or a `PackedCov` with the same names) or `None` if `other` can't be
+        added to the packed storage
+        """
+        if np.isscalar(other):
+            return other
+        if not isinstance(other, Cov) or not (other.isdiagonal or
+                                              isinstance(other, PackedCov)) or\
+                set(other.row_names) != set(self.row_names):
+            return None
+        if other.row_names != self.row_names:
+            other = other.get(self.row_names)
+        if isinstance(other, PackedCov):
+            return other.packed
+        inc = np.zeros_like(self.packed)
+        inc[_packed_offsets(self.shape[0])] = other.x[:, 0]
+        return inc
+
+    def __add__(self, other):
+        """addition overload.  Scalars, diagonal `Cov` and `PackedCov`
+        keep the packed storage, everything else uses a dense copy
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to add
+
+        Returns:
+            `PackedCov` or `Matrix`: the result of addition
+
+        """
+        inc = self._packed_operand(other)
+        if inc is None:
+            return self.to_dense() + other
+        return type(self)._from_packed(self.row_names, self.packed + inc,
+                                       autoalign=self.autoalign)
+
+    def __iadd__(self, other):
+        """in-place addition overload.  Scalars, diagonal `Cov` and `PackedCov`
+        are added to the packed storage in place
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to add
+
+        Returns:
+            `PackedCov` or `Matrix`: the result of addition
+
+        """
+        inc = self._packed_operand(other)
+        if inc is None:
+            return self + other
+        self.packed[:] += inc
+        self.__factor_ap = None
+        return self
+
+    def __sub__(self, other):
+        """subtraction overload, see `PackedCov.__add__()`
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to subtract
+
+        Returns:
+            `PackedCov` or `Matrix`: the result of subtraction
+
+        """
+        if np.isscalar(other) or (isinstance(other, Cov) and
+                                  (other.isdiagonal or isinstance(other, PackedCov))):
+            return self + (other * -1.0)
+        return self.to_dense() - other
+
+    def _dot(self, other, left=True):
+        """dot product with a dense `numpy.ndarray`: self x other if `left`,
+        otherwise other x self
+        """
+        if not left:
+            return self._dot(other.transpose()).transpose()
+        n = self.shape[0]
+        blas, _ = _packed_lapack()
+        if blas is not None and other.shape[1] == 1 and n > 0:
+            # dspmv (or sspmv for single precision)
+            spmv = blas.get_blas_funcs("spmv", (self.packed, other))
+            y = spmv(n, 1.0, self.packed, other[:, 0], lower=1)
+            return y.reshape(-1, 1)
+        x = np.zeros((n, other.shape[1]), dtype=np.result_type(self.dtype, other.dtype))
+        for start, end, rows in self._row_tiles():
+            x[start:end, :] = np.dot(rows, other)
+        return x
+
+    def __mul__(self, other):
+        """dot product multiplication overload
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to dot product
+
+        Returns:
+            `PackedCov` (scalar `other`), `Cov` (`Cov` `other`) or `Matrix`:
+            the result of dot product
+
+        """
+        if isinstance(other, pd.DataFrame):
+            other = Matrix.from_dataframe(other)
+        if np.isscalar(other):
+            return type(self)._from_packed(self.row_names, self.packed * other,
+                                           autoalign=self.autoalign)
+        elif isinstance(other, np.ndarray):
+            if self.shape[1] != other.shape[0]:
+                raise Exception("PackedCov.__mul__(): matrices are not aligned: " +\
+                                str(self.shape) + ' ' + str(other.shape))
+            return Matrix(x=self._dot(other))
+        elif isinstance(other, Matrix):
+            first, second = self, other
+            if self.autoalign and other.autoalign \
+                    and not self.mult_isaligned(other):
+                common, _, other_idxs = get_alignment_plan(self, 1, other, 0)
+                if len(common) == 0:
+                    raise Exception("PackedCov.__mul__():self.col_names " +\
+                                    "and other.row_names " +\
+                                    "don't share any common elements")
+                first = self.get(common)
+                if isinstance(other, (BlockDiagonalCov, PackedCov)):
+                    second = other.get(common)
+                elif isinstance(other, Cov):
+                    second = other._take(other_idxs, other_idxs, common, common)
+                else:
+                    second = other._take(row_idxs=other_idxs, row_names=common)
+            elif self.shape[1] != other.shape[0]:
+                raise Exception("PackedCov.__mul__(): matrices are not aligned: " +\
+                                str(self.shape) + ' ' + str(other.shape))
+            x = first._dot(BlockDiagonalCov._dense_operand(second))
+            if isinstance(other, Cov):
+                return Cov(x=x, row_names=first.row_names,
+                           col_names=second.col_names)
+            return Matrix(x=x, row_names=first.row_names,
+                          col_names=second.col_names)
+        else:
+            raise Exception("PackedCov.__mul__(): unrecognized " +
+                            "other arg type in __mul__: " + str(type(other)))
+
+    def __rmul__(self, other):
+        """reverse order dot product multiplication overload
+
+        Args:
+            other : (`int`,`float`,`numpy.ndarray`,`Matrix`): the thing to dot product
+
+        Returns:
+            `PackedCov` (scalar `other`), `type(other)` or `Matrix`:
+            the result of dot product
+
+        """
+        if np.isscalar(other):
+            return self * other
+        elif isinstance(other, np.ndarray):
+            if self.shape[0] != other.shape[1]:
+                raise Exception("PackedCov.__rmul__(): matrices are not aligned: " +\
+                                str(other.shape) + ' ' + str(self.shape))
+            return Matrix(x=self._dot(other, left=False))
+        elif isinstance(other, Matrix):
+            first, second = other, self
+            if self.autoalign and other.autoalign \
+                    and not other.mult_isaligned(self):
+                common, other_idxs, _ = get_alignment_plan(other, 1, self, 0)
+                if len(common) == 0:
+                    raise Exception("PackedCov.__rmul__():self.row_names " +\
+                                    "and other.col_names " +\
+                                    "don't share any common elements")
+                second = self.get(common)
+                if isinstance(other, Cov):
+                    first = other._take(other_idxs, other_idxs, common, common)
+                else:
+                    first = other._take(col_idxs=other_idxs, col_names=common)
+            elif other.shape[1] != self.shape[0]:
+                raise Exception("PackedCov.__rmul__(): matrices are not aligned: " +\
+                                str(other.shape) + ' ' + str(self.shape))
+            x = second._dot(BlockDiagonalCov._dense_operand(first), left=False)
+            return type(other)(x=x, row_names=first.row_names,
+                               col_names=second.col_names)
+        else:
+            raise Exception("PackedCov.__rmul__(): unrecognized " +
+                            "other arg type in __rmul__: " + str(type(other)))
+
+    def _column_chunks(self, chunk=None, triangle=False, droptol=None):
+        """(row index, column index, value) triplets of the non-zero entries in
+        column-major order, generated a few columns at a time.  Only the upper
+        triangle if `triangle`
+        """
+        n = self.shape[0]
+        tile = self.tile_size if chunk is None else chunk
+        step = max(1, tile // max(n, 1))
+        for start in range(0, n, step):
+            end = min(n, start + step)
+            # by symmetry, rows start:end are columns start:end
+            cols = self._rows(np.arange(start, end))
+            col_idxs, row_idxs = np.nonzero(cols)
+            vals = cols[col_idxs, row_idxs]
+            col_idxs += start
+            keep = np.ones(vals.shape[0], dtype=bool)
+            if triangle:
+                keep = row_idxs <= col_idxs
+            if droptol is not None:
+                keep = np.logical_and(keep, np.abs(vals) >= droptol)
+            yield row_idxs[keep], col_idxs[keep], vals[keep]
+
+    def _nnz(self, triangle=False, droptol=None):
+        """number of non-zero entries (in the upper triangle if `triangle`)
+        """
+        ap = self.packed
+        nz = ap != 0.0
+        if droptol is not None:
+            nz = np.logical_and(nz, np.abs(ap) >= droptol)
+        nnz = int(nz.sum())
+        if triangle:
+            return nnz
+        ndiag = int(nz[_packed_offsets(self.shape[0])].sum())
+        return 2 * nnz - ndiag
+
+    def to_binary(self, filename, droptol=None, chunk=None, triangle=False):
+        """write a PEST-compatible binary file a few columns at a time (no
+        dense intermediate)
+
+        Args:
+            filename (`str`): filename to save binary file
+            droptol (`float`): absolute value tolerance to make values
+                smaller `droptol` than zero.  Default is None (no dropping)
+            chunk (`int`): approximate number of elements to write in a single pass.
+                Default is `None` (`PackedCov.tile_size`)
+            triangle (`bool`): flag to only write the upper triangle.  The
+                file must be read with `PackedCov.from_binary()` or
+                `Cov.from_binary(triangle=True)`.  Default is False
+
+        """
+        if np.any(np.isnan(self.packed)):
+            raise Exception("PackedCov.to_binary(): nans found")
+        self._write_binary_chunks(filename, self._nnz(triangle, droptol),
+                                  self._column_chunks(chunk, triangle, droptol))
+
+    def to_coo(self, filename, droptol=None, chunk=None):
+        """write an extended PEST-format binary file a few columns at a time (no
+        dense intermediate)
+
+        Args:
+            filename (`str`): filename to save binary file
+            droptol (`float`): absolute value tolerance to make values
+                smaller `droptol` than zero.  Default is None (no dropping)
+            chunk (`int`): approximate number of elements to write in a single pass.
+                Default is `None` (`PackedCov.tile_size`)
+
+        """
+        self._write_binary_chunks(filename, self._nnz(False, droptol),
+                                  self._column_chunks(chunk, False, droptol),
+                                  coo=True)
+
+    def to_ascii(self, filename, icode=2):
+        """write a PEST-compatible ASCII Matrix file.  The dense form is formed
+        temporarily
+
+        Args:
+            filename (`str`): filename to write to
+            icode (`int`, optional): PEST-style info code for matrix style.
+                Default is 2
+
+        """
+        self.to_dense().to_ascii(filename, icode=icode)
+
+    @classmethod
+    def from_binary(cls, filename, sparse=False, triangle=True, dtype=None):
+        """class method load from PEST-compatible binary file directly
+        into packed storage, reading the records a tile at a time.  Works
+        for full and upper- or lower-triangle files (see `Cov.to_binary()`)
+
+        Args:
+            filename (`str`): filename to read
+            sparse (`bool`): not supported, must be False
+            triangle (`bool`): ignored - either triangle (or both) is used
+            dtype (`numpy.dtype`): dtype of the numeric values.  Default is
+                None (`Matrix.default_dtype`)
+
+        Returns:
+            `PackedCov`: `PackedCov` loaded from binary file
+
+        Example::
+
+            cov = pyemu.PackedCov.from_binary("prior_upper.jcb")
+
+        """
+        if sparse:
+            raise Exception("PackedCov.from_binary(): sparse not supported")
+        f = open(filename, 'rb')
+        itemp1, itemp2, icount = np.fromfile(f, Matrix.binary_header_dt, 1)[0]
+        if itemp1 > 0 and itemp2 < 0 and icount < 0:
+            f.close()
+            mat = Matrix.from_binary(filename, dtype=dtype)
+            return cls(x=mat.x, names=mat.row_names)
+        ncol, nrow = abs(itemp1), abs(itemp2)
+        if ncol != nrow:
+            f.close()
+            raise Exception("PackedCov.from_binary(): not square: {0},{1}".\
+                            format(nrow, ncol))
+        coo = itemp1 >= 0
+        rec_dt = Matrix.coo_rec_dt if coo else Matrix.binary_rec_dt
+        offs = _packed_offsets(nrow)
+        ap = np.zeros(nrow * (nrow + 1) // 2,
+                      dtype=Matrix.default_dtype if dtype is None else dtype)
+        remaining = icount
+        while remaining > 0:
+            data = np.fromfile(f, rec_dt, min(remaining, cls.tile_size))
+            if data.shape[0] == 0:
+                break
+            remaining -= data.shape[0]
+            if coo:
+                irows, icols = data['i'].astype(np.int64), data['j'].astype(np.int64)
+            else:
+                j = data['j'].astype(np.int64) - 1
+                icols = j // nrow
+                irows = j - icols * nrow
+            lo, hi = np.minimum(irows, icols), np.maximum(irows, icols)
+            ap[offs[lo] + hi - lo] = data["dtemp"]
+        if remaining > 0:
+            f.close()
+            raise Exception("PackedCov.from_binary(): file ended after {0} of {1} records".\
+                            format(icount - remaining, icount))
+        if coo:
+            col_names = Matrix._read_binary_names(f, ncol, Matrix.new_par_length)
+            row_names = Matrix._read_binary_names(f, nrow, Matrix.new_obs_length)
+        else:
+            col_names = Matrix._read_binary_names(f, ncol, Matrix.par_length)
+            row_names = Matrix._read_binary_names(f, nrow, Matrix.obs_length)
+        f.close()
+        if row_names != col_names:
+            raise Exception("PackedCov.from_binary(): row names != col names")
+        if np.any(np.isnan(ap)):
+            warnings.warn("PackedCov.from_binary(): nans in matrix", PyemuWarning)
+        return cls._from_packed(row_names, ap)
@@ -93,7 +93,7 @@ class MonteCarlo(LinearAnalysis):
             nsing = None
         return nsing
 
-    def get_null_proj(self,nsing=None):
+    def get_null_proj(self,nsing=None,svd_method="full",factored=False):
         """ get a null-space projection matrix of XTQX
 
         Parameters
@@ -102,14 +102,28 @@ class MonteCarlo(LinearAnalysis):
             optional number of singular components to use
             If Nonte, then nsing is determined from
             call to MonteCarlo.get_nsing()
+        svd_method: str
+            SVD method (see pyemu.Matrix.svd()).  If "randomized" or
+            "lanczos", only the leading nsing singular components are
+            computed and the projection is formed as I - V1V1^T.
+            Requires nsing.  Default is "full"
+        factored: bool
+            flag to return the basis the projection matrix is formed from,
+            and its kind, instead of the projection matrix.  The basis is
+            V2 ("null") if svd_method is "full", otherwise V1 ("solution").
+            Default is False
         
         Returns
         -------
         v2_proj : pyemu.Matrix
-            the null-space projection matrix (V2V2^T)
+            the null-space projection matrix (V2V2^T), or if factored, a
+            (basis, kind) pair to pass to ParameterEnsemble.project()
         
         """
         if nsing is None:
+            if svd_method != "full":
+                raise Exception("nsing is required for svd_method " +\
+                                "'{0}'".format(svd_method))
             nsing = self.get_nsing()
         if nsing is None:
             raise Exception("nsing is None")
@@ -117,7 +131,19 @@ class MonteCarlo(LinearAnalysis):
         self.log("forming null space projection matrix with " +\
                  "{0} of {1} singular components".format(nsing,self.jco.shape[1]))
 
-        v2_proj = (self.xtqx.v[:,nsing:] * self.xtqx.v[:,nsing:].T)
+        if svd_method == "full":
+            v2_proj = self.xtqx.v[:,nsing:]
+            if factored:
+                v2_proj = v2_proj, "null"
+            else:
+                v2_proj = v2_proj * v2_proj.T
+        else:
+            _, _, v2_proj = self.xtqx.svd(k=nsing, method=svd_method)
+            if factored:
+                v2_proj = v2_proj, "solution"
+            else:
+                v2_proj = v2_proj * v2_proj.T
+                v2_proj.reset_x(np.identity(v2_proj.shape[0]) - v2_proj.x, copy=False)
         self.log("forming null space projection matrix with " +\
                  "{0} of {1} singular components".format(nsing,self.jco.shape[1]))
 
@@ -246,8 +272,13 @@ class MonteCarlo(LinearAnalysis):
 
         # project the ensemble
         self.log("projecting parameter ensemble")
-        en = self.parensemble.project(self.get_null_proj(nsing),inplace=inplace,log=self.log)
+        basis, kind = self.get_null_proj(nsing,factored=True)
+        en = self.parensemble.project(basis,log=self.log,
+                                      enforce_bounds=enforce_bounds,factored=kind)
         self.log("projecting parameter ensemble")
+        if inplace:
+            self.parensemble = en
+            return None
         return en
 
     def write_psts(self,prefix,existing_jco=None,noptmax=None):
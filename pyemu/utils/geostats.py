@@ -8,7 +8,7 @@ import multiprocessing as mp
 import warnings
 import numpy as np
 import pandas as pd
-from pyemu.mat.mat_handler import Cov
+from pyemu.mat.mat_handler import Cov, PackedCov, _packed_offsets
 from pyemu.utils.pp_utils import pp_file_to_dataframe
 from ..pyemu_warnings import PyemuWarning
 
@@ -102,7 +102,7 @@ class GeoStruct(object):
         for v in self.variograms:
             v.to_struct_file(f)
 
-    def covariance_matrix(self,x,y,names=None,cov=None):
+    def covariance_matrix(self,x,y,names=None,cov=None,packed=False):
         """build a `pyemu.Cov` instance from `GeoStruct`
 
         Args:
@@ -113,6 +113,8 @@ class GeoStruct(object):
             cov (`pyemu.Cov`): an existing Cov instance.  The contribution
                 of this GeoStruct is added to cov.  If cov is None,
                 names must not be None. Default is None
+            packed (`bool`): flag to build a `pyemu.PackedCov` that only stores
+                the upper triangle.  Only used if `names` is passed.  Default is False
 
         Returns:
             `pyemu.Cov`: the covariance matrix implied by this
@@ -141,9 +143,13 @@ class GeoStruct(object):
 
         if names is not None:
             assert x.shape[0] == len(names)
-            c = np.zeros((len(names),len(names)))
-            np.fill_diagonal(c,self.nugget)
-            cov = Cov(x=c,names=names)
+            if packed:
+                c = np.zeros((len(names),1)) + self.nugget
+                cov = PackedCov(x=c,names=names,isdiagonal=True)
+            else:
+                c = np.zeros((len(names),len(names)))
+                np.fill_diagonal(c,self.nugget)
+                cov = Cov(x=c,names=names)
         elif cov is not None:
             assert cov.shape[0] == x.shape[0]
             names = cov.row_names
@@ -1292,7 +1298,7 @@ class Vario2d(object):
         ax.plot(x,y,**kwargs)
         return ax
 
-    def covariance_matrix(self,x,y,names=None,cov=None):
+    def covariance_matrix(self,x,y,names=None,cov=None,packed=False):
         """build a pyemu.Cov instance implied by Vario2d
 
         Args:
@@ -1301,6 +1307,8 @@ class Vario2d(object):
             names ([`str`]): names of locations. If None, cov must not be None
             cov (`pyemu.Cov`): an existing Cov instance.  Vario2d contribution is added to cov
             in place
+            packed (`bool`): flag to build a `pyemu.PackedCov` that only stores
+                the upper triangle.  Only used if `names` is passed.  Default is False
 
         Returns:
             `pyemu.Cov`: the covariance matrix for `x`, `y` implied by `Vario2d`
@@ -1317,9 +1325,13 @@ class Vario2d(object):
 
         if names is not None:
             assert x.shape[0] == len(names)
-            c = np.zeros((len(names),len(names)))
-            np.fill_diagonal(c,self.contribution)
-            cov = Cov(x=c,names=names)
+            if packed:
+                c = np.zeros((len(names),1)) + self.contribution
+                cov = PackedCov(x=c,names=names,isdiagonal=True)
+            else:
+                c = np.zeros((len(names),len(names)))
+                np.fill_diagonal(c,self.contribution)
+                cov = Cov(x=c,names=names)
         elif cov is not None:
             assert cov.shape[0] == x.shape[0]
             names = cov.row_names
@@ -1330,20 +1342,35 @@ class Vario2d(object):
         else:
             raise Exception("Vario2d.covariance_matrix() requires either" +
                             "names or cov arg")
-        rc = self.rotation_coefs
-        for i1,(n1,x1,y1) in enumerate(zip(names,x,y)):
-            dx = x1 - x[i1+1:]
-            dy = y1 - y[i1+1:]
+        # blocks of rows against all (or, if packed, the upper triangle
+        # of) the columns
+        n = len(names)
+        ispacked = isinstance(cov,PackedCov)
+        if ispacked:
+            ap = cov.packed
+            offs = _packed_offsets(n)
+        step = max(1,PackedCov.tile_size // max(n,1))
+        for start in range(0,n,step):
+            end = min(n,start + step)
+            c0 = start if ispacked else 0
+            dx = x[start:end,None] - x[None,c0:]
+            dy = y[start:end,None] - y[None,c0:]
             dxx,dyy = self._apply_rotation(dx,dy)
             h = np.sqrt(dxx*dxx + dyy*dyy)
 
             h[h<0.0] = 0.0
             h = self._h_function(h)
             if np.any(np.isnan(h)):
+                i1 = start + np.where(np.isnan(h))[0][0]
                 raise Exception("nans in h for i1 {0}".format(i1))
-            cov.x[i1,i1+1:] += h
-        for i in range(len(names)):
-            cov.x[i+1:,i] = cov.x[i,i+1:]
+            rows = np.arange(end - start)
+            if ispacked:
+                for k in rows:
+                    i1 = start + k
+                    ap[offs[i1] + 1:offs[i1] + n - i1] += h[k,k + 1:]
+            else:
+                h[rows,rows + start] = 0.0
+                cov.x[start:end,:] += h
         return cov
 
     def _specsim_grid_contrib(self,grid):
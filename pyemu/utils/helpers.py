@@ -168,7 +168,8 @@ def geostatistical_draws(pst, struct_dict,num_reals=100,sigma_range=4,verbose=Tr
 
 
 def geostatistical_prior_builder(pst, struct_dict,sigma_range=4,
-                                 verbose=False,scale_offset=False):
+                                 verbose=False,scale_offset=False,
+                                 block_diagonal=False):
     """construct a full prior covariance matrix using geostastical structures
     and parameter bounds information.
 
@@ -186,10 +187,13 @@ def geostatistical_prior_builder(pst, struct_dict,sigma_range=4,
         scale_offset (`bool`): a flag to apply scale and offset to parameter upper and lower bounds
             before applying log transform.  Passed to pyemu.Cov.from_parameter_data().  Default
             is False
+        block_diagonal (`bool`): flag to return a `pyemu.BlockDiagonalCov` that stores each
+            geostatistical (zone) covariance matrix as a separate block and the remaining
+            parameters as a diagonal, rather than a full (dense) `pyemu.Cov`. Default is False
 
     Returns:
         `pyemu.Cov`: a covariance matrix that includes all adjustable parameters in the control
-        file.
+        file.  A `pyemu.BlockDiagonalCov` if `block_diagonal` is True.
 
     Note:
         The covariance of parameters associated with geostatistical structures is defined
@@ -217,6 +221,7 @@ def geostatistical_prior_builder(pst, struct_dict,sigma_range=4,
 
     full_cov_dict = {n:float(v) for n,v in zip(full_cov.col_names,full_cov.x)}
     #full_cov = None
+    blocks = []
     par = pst.parameter_data
     for gs,items in struct_dict.items():
         if verbose: print("processing ",gs)
@@ -287,11 +292,32 @@ def geostatistical_prior_builder(pst, struct_dict,sigma_range=4,
                                     format(cov.row_names[:3]))
 
                     if verbose: print('replace in full cov')
-                full_cov.replace(cov)
+                if block_diagonal:
+                    blocks.append(cov)
+                else:
+                    full_cov.replace(cov)
                 # d = np.diag(full_cov.x)
                 # idx = np.argwhere(d==0.0)
                 # for i in idx:
                 #     print(full_cov.names[i])
+    if block_diagonal:
+        # parameters in more than one zone take the values from the last zone,
+        # as with Cov.replace()
+        block_names = set()
+        unique_blocks = []
+        for cov in blocks[::-1]:
+            keep = [n for n in cov.row_names if n not in block_names]
+            if len(keep) == 0:
+                continue
+            if len(keep) < cov.shape[0]:
+                cov = cov.get(keep)
+            unique_blocks.insert(0, cov)
+            block_names.update(keep)
+        blocks = unique_blocks
+        diag_names = [n for n in full_cov.row_names if n not in block_names]
+        diagonal = full_cov.get(diag_names) if len(diag_names) > 0 else None
+        return pyemu.BlockDiagonalCov(names=full_cov.row_names, blocks=blocks,
+                                      diagonal=diagonal)
     return full_cov
 
 
@@ -338,7 +364,7 @@ def _condition_on_par_knowledge(cov,par_knowledge_dict):
 def kl_setup(num_eig,sr,struct,prefixes,
              factors_file="kl_factors.dat",
              islog=True, basis_file=None,
-             tpl_dir="."):
+             tpl_dir=".", svd_method="full"):
 
     """setup a karhuenen-Loeve based parameterization for a given
     geostatistical structure.
@@ -360,6 +386,10 @@ def kl_setup(num_eig,sr,struct,prefixes,
             file to write the reduced basis vectors to.  Default is None (not saved).
         tpl_dir (`str`, optional): the directory to write the resulting
             template files to.  Default is "." (current directory).
+        svd_method (`str`, optional): SVD method for the covariance matrix (see
+            `pyemu.Matrix.svd()`).  "randomized" or "lanczos" only compute the leading
+            `num_eig` basis vectors, in which case only these are written to `basis_file`.
+            Default is "full".
 
     Returns:
         `pandas.DataFrame`: a dataframe of parameter information.
@@ -400,8 +430,11 @@ def kl_setup(num_eig,sr,struct,prefixes,
                                sr.ycentergrid.flatten(),
                                names=names)
 
-    eig_names = ["eig_{0:04d}".format(i) for i in range(cov.shape[0])]
-    trunc_basis = cov.u
+    if svd_method == "full":
+        trunc_basis = cov.u
+    else:
+        trunc_basis, _, _ = cov.svd(k=num_eig, method=svd_method)
+    eig_names = ["eig_{0:04d}".format(i) for i in range(trunc_basis.shape[1])]
     trunc_basis.col_names = eig_names
     #trunc_basis.col_names = [""]
     if basis_file is not None:
@@ -624,6 +657,9 @@ def first_order_pearson_tikhonov(pst,cov,reset=True,abs_drop_tol=1.0e-3):
         The weights on the prior information equations are the Pearson
         correlation coefficients implied by covariance matrix.
 
+        A `cov` with `scipy.sparse` storage is processed without forming
+        a dense correlation matrix.
+
     Example::
 
         pst = pyemu.Pst("my.pst")
@@ -641,33 +677,30 @@ def first_order_pearson_tikhonov(pst,cov,reset=True,abs_drop_tol=1.0e-3):
     except:
         ptrans = pst.parameter_data.partrans.to_dict()
     pi_num = pst.prior_information.shape[0] + 1
-    pilbl, obgnme, weight, equation = [], [], [], []
+    names = cc_mat.row_names
     sadj_names = set(pst.adj_par_names)
+    isadj = np.array([name in sadj_names for name in names], dtype=bool)
+    tnames = np.array([name if str(ptrans.get(name)) != "log" else
+                       "log(" + name + ")" for name in names], dtype=object)
     print("processing")
-    for i,iname in enumerate(cc_mat.row_names):
-        if iname not in sadj_names:
-            continue
-        for j,jname in enumerate(cc_mat.row_names[i+1:]):
-            if jname not in sadj_names:
-                continue
-            #print(i,iname,i+j+1,jname)
-            cc = cc_mat.x[i,j+i+1]
-            if cc < abs_drop_tol:
-                continue
-            pilbl.append("pcc_{0}".format(pi_num))
-            iiname = str(iname)
-            if str(ptrans[iname]) == "log":
-                iiname = "log("+iname+")"
-            jjname = str(jname)
-            if str(ptrans[jname]) == "log":
-                jjname = "log("+jname+")"
-            equation.append("1.0 * {0} - 1.0 * {1} = 0.0".\
-                            format(iiname,jjname))
-            weight.append(cc)
-            obgnme.append("regul_cc")
-            pi_num += 1
-    df = pd.DataFrame({"pilbl": pilbl,"equation": equation,
-                       "obgnme": obgnme,"weight": weight})
+    # upper triangle pairs of adjustable parameters, in row-major order
+    if cc_mat.issparse:
+        import scipy.sparse as sps
+        triu = sps.triu(cc_mat.x, k=1).tocoo()
+        keep = (triu.data >= abs_drop_tol) & isadj[triu.row] & isadj[triu.col]
+        ii, jj, cc = triu.row[keep], triu.col[keep], triu.data[keep]
+        order = np.lexsort((jj, ii))
+        ii, jj, cc = ii[order], jj[order], cc[order]
+    else:
+        mask = np.triu(cc_mat.x >= abs_drop_tol, k=1)
+        mask &= isadj[:, None]
+        mask &= isadj[None, :]
+        ii, jj = np.nonzero(mask)
+        cc = cc_mat.x[ii, jj]
+    pilbl = ["pcc_{0}".format(num) for num in range(pi_num, pi_num + ii.shape[0])]
+    equation = "1.0 * " + tnames[ii] + " - 1.0 * " + tnames[jj] + " = 0.0"
+    df = pd.DataFrame({"pilbl": pilbl,"equation": list(equation),
+                       "obgnme": "regul_cc","weight": cc})
     df.index = df.pilbl
     if reset:
         pst.prior_information = df
@@ -2226,7 +2259,7 @@ class PstFromFlopyModel(object):
         return pe
 
     def build_prior(self, fmt="ascii",filename=None,droptol=None, chunk=None,
-                    sigma_range=6):
+                    sigma_range=6, block_diagonal=False):
         """ build and optionally save the prior parameter covariance matrix.
 
         Args:
@@ -2240,10 +2273,13 @@ class PstFromFlopyModel(object):
                 is None (no chunking).
             sigma_range (`float`): number of standard deviations represented by the parameter bounds.  Default
                 is 6.
+            block_diagonal (`bool`): flag to build a `pyemu.BlockDiagonalCov` that only stores the
+                per-group geostatistical covariance matrices and a diagonal for the remaining parameters.
+                Default is False
 
         Returns:
             `pyemu.Cov`: the full prior parameter covariance matrix, generated by processing parameters by
-            groups
+            groups.  A `pyemu.BlockDiagonalCov` if `block_diagonal` is True
 
         """
 
@@ -2306,7 +2342,8 @@ class PstFromFlopyModel(object):
         if len(struct_dict) > 0:
             cov = pyemu.helpers.geostatistical_prior_builder(self.pst,
                                                              struct_dict=struct_dict,
-                                                             sigma_range=sigma_range)
+                                                             sigma_range=sigma_range,
+                                                             block_diagonal=block_diagonal)
         else:
             cov = pyemu.Cov.from_parameter_data(self.pst,sigma_range=sigma_range)
 